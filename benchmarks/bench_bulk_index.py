@@ -0,0 +1,85 @@
+# benchmarks/bench_bulk_index.py
+# Compara a indexação página a página (add_document) com a indexação em lote (add_documents),
+# e a Trie preenchida token a token com a inserção ordenada em lote (insert_sorted).
+# O lote só economiza o trabalho por posting da Trie e das PostingLists: guardar as páginas,
+# codificar as posições e anotar a forma original dos termos novos custa o mesmo nos dois
+# caminhos, então o ganho do índice inteiro é bem menor que o da Trie sozinha (a linha
+# "trabalho comum" mostra esse custo).
+# Uso (na raiz do projeto): python -m benchmarks.bench_bulk_index [documentos] [tamanho_do_lote]
+import sys
+import time
+
+from benchmarks.synthetic import SyntheticCorpus
+from src.page import Page
+from src.positions import encode_positions
+from src.search_engine import SearchEngine
+from src.tokenizer import term_positions, tokenize
+from src.tree import SearchTrie
+
+
+def timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main():
+    num_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    # A tokenização é igual nos dois caminhos e fica fora da medição
+    tokens = []
+    batch = []
+    for url, title, content in SyntheticCorpus(50000).documents(num_docs):
+        terms = tokenize(content)
+        tokens.append(terms)
+        batch.append((Page(url, title, content), term_positions(terms)))
+    num_tokens = sum(len(terms) for terms in tokens)
+    num_pairs = sum(len(positions) for _, positions in batch)
+    print(f"Documentos: {num_docs}  Tokens: {num_tokens}  Pares (termo, doc): {num_pairs}  Lote: {batch_size}")
+
+    def per_page():
+        engine = SearchEngine()
+        for page, positions in batch:
+            engine.add_document(page, {term: len(p) for term, p in positions.items()}, positions)
+
+    def bulk():
+        engine = SearchEngine()
+        for start in range(0, len(batch), batch_size):
+            engine.add_documents(batch[start:start + batch_size])
+
+    def common_work():
+        engine = SearchEngine()
+        for page, positions in batch:
+            engine._record_surface_forms(page.content, positions)
+            engine.docs.add(page.url, page.title, page.content, sum(map(len, positions.values())))
+            for occurrences in positions.values():
+                encode_positions(occurrences)
+
+    single, batched, common = timed(per_page), timed(bulk), timed(common_work)
+    print(f"Indice, pagina a pagina : {single:8.2f} s  ({num_tokens / single / 1e6:.2f} M tokens/s)")
+    print(f"Indice, em lote         : {batched:8.2f} s  ({num_tokens / batched / 1e6:.2f} M tokens/s)  {single / batched:.1f}x")
+    print(f"  trabalho comum        : {common:8.2f} s  (paginas, posicoes e formas; fora dele, {(single - common) / (batched - common):.1f}x)")
+
+    def per_token():
+        trie = SearchTrie()
+        for terms in tokens:
+            for term in terms:
+                trie.insert(term)
+
+    def sorted_batch():
+        trie = SearchTrie()
+        for start in range(0, len(batch), batch_size):
+            counts = {}
+            for _, positions in batch[start:start + batch_size]:
+                for term in positions:
+                    counts[term] = counts.get(term, 0) + 1
+            trie.insert_sorted(sorted(counts.items()))
+
+    single, batched = timed(per_token), timed(sorted_batch)
+    print(f"Trie, token a token     : {single:8.2f} s  ({num_tokens / single / 1e6:.2f} M tokens/s)")
+    print(f"Trie, lote ordenado     : {batched:8.2f} s  ({num_tokens / batched / 1e6:.2f} M tokens/s)  {single / batched:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
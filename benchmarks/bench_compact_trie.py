@@ -0,0 +1,62 @@
+# benchmarks/bench_compact_trie.py
+# Compara memória e latência de busca da SearchTrie (dicionários por nó) com a FrozenTrie compacta.
+# Uso (na raiz do projeto): python -m benchmarks.bench_compact_trie [quantidade_de_palavras]
+import random
+import sys
+import time
+import tracemalloc
+
+from src.compact_trie import FrozenTrie
+from src.page import Page
+from src.tree import SearchTrie
+
+
+def build_words(n: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    alphabet = 'abcdefghijklmnopqrstuvwxyzçãéó'
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(3, 12))) for _ in range(n)]
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def time_searches(trie, prefixes) -> float:
+    start = time.perf_counter()
+    for prefix in prefixes:
+        trie.search(prefix)
+    return (time.perf_counter() - start) / len(prefixes)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    words = build_words(n)
+    pages = [Page(f'https://exemplo.com/{i}', f'Pagina {i}', '') for i in range(1000)]
+    rng = random.Random(7)
+
+    def build_dict_trie():
+        trie = SearchTrie()
+        for word in words:
+            trie.insert(word, rng.choice(pages))
+        return trie
+
+    trie, dict_bytes = measure(build_dict_trie)
+    frozen, frozen_bytes = measure(lambda: FrozenTrie.from_trie(trie))
+
+    prefixes = [word[:rng.randint(2, 5)] for word in rng.sample(words, 2000)]
+    dict_latency = time_searches(trie, prefixes)
+    frozen_latency = time_searches(frozen, prefixes)
+
+    print(f"Palavras: {n}  Nos: {len(frozen)}")
+    print(f"SearchTrie  : {dict_bytes / 1e6:8.1f} MB ({dict_bytes / len(frozen):6.1f} bytes/no)  busca media {dict_latency * 1e6:8.1f} us")
+    print(f"FrozenTrie  : {frozen_bytes / 1e6:8.1f} MB ({frozen_bytes / len(frozen):6.1f} bytes/no)  busca media {frozen_latency * 1e6:8.1f} us")
+    print(f"Reducao de memoria: {dict_bytes / max(frozen_bytes, 1):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_fuzzy.py
+# Custo da busca aproximada (Levenshtein com poda na Trie) comparado à força bruta sobre o vocabulário inteiro.
+# Uso (na raiz do projeto): python -m benchmarks.bench_fuzzy [quantidade_de_palavras] [consultas]
+import random
+import sys
+import time
+
+from src.tree import SearchTrie
+
+SYLLABLES = ['a', 'e', 'o', 'ca', 'co', 'de', 'do', 'di', 'ma', 'me', 'mi', 'na', 'no', 'pa', 'po', 'pro',
+             'ra', 're', 'ri', 'sa', 'se', 'si', 'ta', 'te', 'ti', 'to', 'va', 'ver', 'li', 'lo', 'gra', 'tra',
+             'cao', 'men', 'dor', 'cia', 'ção', 'ões', 'es', 'is', 'al', 'an', 'en', 'in', 'or', 'ur', 'bi', 'fu']
+
+
+def build_words(n: int, seed: int = 42) -> list[str]:
+    """Vocabulário sintético com palavras formadas por sílabas (compartilham prefixos como um vocabulário real)."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < n:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 6))))
+    return sorted(words)
+
+
+def typo(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word))
+    kind = rng.choice('sid')
+    if kind == 's':
+        return word[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz') + word[i + 1:]
+    if kind == 'i':
+        return word[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz') + word[i:]
+    return word[:i] + word[i + 1:]
+
+
+def levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Distância de edição com parada antecipada (linha inteira acima do limite)."""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        row = [i]
+        for j, char_b in enumerate(b, 1):
+            row.append(min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(row) > max_distance:
+            return max_distance + 1
+        previous = row
+    return previous[-1]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(7)
+
+    words = build_words(n)
+    start = time.perf_counter()
+    trie = SearchTrie()
+    for word in words:
+        trie.insert(word)
+    build_time = time.perf_counter() - start
+    print(f"Vocabulario: {n} palavras  (Trie montada em {build_time:.1f} s)")
+
+    queries = [typo(word, rng) for word in rng.sample(words, num_queries)]
+    for max_distance in (1, 2):
+        start = time.perf_counter()
+        found = sum(len(trie.fuzzy(query, max_distance)) for query in queries)
+        elapsed = (time.perf_counter() - start) / num_queries
+        print(f"Trie, distancia {max_distance}: {elapsed * 1e3:8.2f} ms/consulta  ({found / num_queries:.1f} termos por consulta)")
+
+    # Força bruta: compara com todas as palavras (medida em poucas consultas, pois é lenta)
+    brute_queries = queries[:max(1, num_queries // 50)]
+    start = time.perf_counter()
+    for query in brute_queries:
+        [word for word in words if abs(len(word) - len(query)) <= 2 and levenshtein(query, word, 2) <= 2]
+    elapsed = (time.perf_counter() - start) / len(brute_queries)
+    print(f"Forca bruta, distancia 2: {elapsed * 1e3:8.2f} ms/consulta")
+
+
+if __name__ == '__main__':
+    main()
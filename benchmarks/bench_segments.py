@@ -0,0 +1,65 @@
+# benchmarks/bench_segments.py
+# Vazão de escrita ao longo do crescimento do índice: SearchEngine monolítico x SegmentedEngine,
+# e a latência de consulta ao final (o segmentado precisa juntar as postings dos segmentos).
+# Uso (na raiz do projeto): python -m benchmarks.bench_segments [documentos] [tamanho_do_segmento]
+import random
+import sys
+import time
+
+from benchmarks.suite import percentiles
+from benchmarks.synthetic import SyntheticCorpus
+from src.page import Page
+from src.query_cache import QueryCache
+from src.search_engine import SearchEngine
+from src.segments import SegmentedEngine
+from src.tokenizer import term_positions, tokenize
+
+
+def run(engine, batch, chunk: int) -> list[float]:
+    rates = []
+    for start in range(0, len(batch), chunk):
+        began = time.perf_counter()
+        for page, positions in batch[start:start + chunk]:
+            engine.add_document(page, {term: len(p) for term, p in positions.items()}, positions)
+        rates.append(chunk / (time.perf_counter() - began))
+    return rates
+
+
+def query_latency(engine, vocabulary, num_queries: int = 300) -> dict:
+    rng = random.Random(3)
+    engine.cache = QueryCache(0)
+    samples = []
+    for _ in range(num_queries):
+        query = ' '.join(rng.choice(vocabulary) for _ in range(2))
+        start = time.perf_counter()
+        engine.ranked_search(query, prefix=False, fuzzy=False)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    num_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    segment_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    chunk = max(1, num_docs // 10)
+
+    corpus = SyntheticCorpus(50000)
+    batch = [(Page(url, title, content), term_positions(tokenize(content)))
+             for url, title, content in corpus.documents(num_docs)]
+    vocabulary = corpus.vocabulary[:2000]
+
+    engines = {'monolitico': SearchEngine(), 'segmentado': SegmentedEngine(segment_size=segment_size)}
+    for name, engine in engines.items():
+        rates = run(engine, batch, chunk)
+        print(f"{name:>11}: documentos/s a cada {chunk} -> " + ' '.join(f"{rate:.0f}" for rate in rates))
+
+    segmented = engines['segmentado']
+    segmented.merge_now()
+    print(f"Segmentos: {segmented.segment_sizes()}  merges: {segmented.merges}")
+    for name, engine in engines.items():
+        latency = query_latency(engine, vocabulary)
+        print(f"{name:>11}: consulta p50 {latency['p50_us']:.0f} us  p99 {latency['p99_us']:.0f} us")
+    segmented.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# benchmarks/bench_server.py
+# Teste de carga do servidor HTTP (src.server) em localhost: conexões keep-alive simultâneas fazendo
+# /search com termos do corpus sintético, primeiro com o índice parado e depois com outro processo
+# indexando e salvando versões novas do arquivo (o servidor as recarrega sem bloquear as buscas).
+# Uso (na raiz do projeto): python -m benchmarks.bench_server [documentos] [conexoes] [segundos]
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+from benchmarks.suite import percentiles
+from benchmarks.synthetic import SyntheticCorpus
+from src.page import Page
+from src.search_engine import SearchEngine
+from src.storage import save_index
+from src.tokenizer import term_positions, tokenize
+
+
+async def request(reader, writer, target: str) -> tuple[int, dict]:
+    writer.write(f'GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode('latin-1'))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(port: int, queries: list[str], deadline: float, samples: list[float], statuses: dict, seed: int):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        while time.perf_counter() < deadline:
+            target = f'/search?q={quote(rng.choice(queries))}&page={rng.randint(1, 3)}&size=10'
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, target)
+            samples.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def load(port: int, queries: list[str], connections: int, seconds: float) -> dict:
+    samples, statuses = [], {}
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client(port, queries, deadline, samples, statuses, seed) for seed in range(connections)))
+    result = {'requests_per_second': len(samples) / seconds, 'statuses': statuses}
+    result.update(percentiles(samples))
+    return result
+
+
+async def server_stats(port: int) -> dict:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        return (await request(reader, writer, '/stats'))[1]
+    finally:
+        writer.close()
+
+
+def report(name: str, result: dict):
+    print(f"{name:>22}: {result['requests_per_second']:7.1f} req/s  p50 {result['p50_us'] / 1000:6.2f} ms  "
+          f"p99 {result['p99_us'] / 1000:7.2f} ms  status {result['statuses']}")
+
+
+def main():
+    num_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+
+    corpus = SyntheticCorpus(50000)
+    documents = list(corpus.documents(num_docs * 2))
+    rng = random.Random(3)
+    vocabulary = corpus.vocabulary[:2000]
+    queries = [' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 3))) for _ in range(500)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        index_path = os.path.join(directory, 'indice.bin')
+        engine = SearchEngine()
+        engine.add_documents([(Page(url, title, content), term_positions(tokenize(content)))
+                              for url, title, content in documents[:num_docs]])
+        save_index(engine, index_path)
+
+        # A segunda metade do corpus vira arquivos de texto, indexados por outro processo durante a segunda rodada
+        pending = os.path.join(directory, 'novos')
+        os.mkdir(pending)
+        for i, (_, _, content) in enumerate(documents[num_docs:]):
+            with open(os.path.join(pending, f'{i:06d}.txt'), 'w', encoding='utf-8') as f:
+                f.write(content)
+
+        server = subprocess.Popen([sys.executable, '-m', 'src.cli', '--index', index_path, 'serve', '--port', '0',
+                                   '--reload-interval', '0.5'], stdout=subprocess.PIPE, text=True)
+        try:
+            port = int(server.stdout.readline().split('http://127.0.0.1:')[1].split('/')[0])
+            print(f"Documentos: {num_docs}  Conexoes: {connections}  Duracao: {seconds:.0f} s por rodada  Porta: {port}")
+            report('indice parado', asyncio.run(load(port, queries, connections, seconds)))
+
+            # Outro processo indexa os arquivos novos em lotes pequenos, salvando o índice após cada lote
+            files = sorted(os.listdir(pending))
+            batches = [files[i:i + max(1, len(files) // 5)] for i in range(0, len(files), max(1, len(files) // 5))]
+            script = ('import sys\nfrom src import api\n'
+                      'for batch in sys.argv[2:]:\n'
+                      '    engine = api.open_engine(sys.argv[1])\n'
+                      '    api.index_paths(engine, batch.split(","))\n'
+                      '    api.save_engine(engine, sys.argv[1])\n')
+            indexer = subprocess.Popen([sys.executable, '-c', script, index_path] +
+                                       [','.join(os.path.join(pending, name) for name in batch) for batch in batches])
+            report('indexando em paralelo', asyncio.run(load(port, queries, connections, seconds)))
+            indexer.wait()
+            for _ in range(50): # Espera o servidor recarregar a última versão salva
+                stats = asyncio.run(server_stats(port))
+                if stats['index']['pages'] == len(documents):
+                    break
+                time.sleep(0.2)
+            print(f"Recarregamentos: {stats['reloads']}  Paginas servidas agora: {stats['index']['pages']}  "
+                  f"Rejeitadas (503): {stats['rejected']}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
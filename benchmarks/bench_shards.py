@@ -0,0 +1,51 @@
+# benchmarks/bench_shards.py
+# Indexação e consultas por segundo com o índice num processo só x dividido em shards (um processo por shard).
+# Uso (na raiz do projeto): python -m benchmarks.bench_shards [documentos] [shards separados por vírgula]
+import os
+import random
+import sys
+import time
+
+from benchmarks.synthetic import SyntheticCorpus
+from src.page import Page
+from src.query_cache import QueryCache
+from src.search_engine import SearchEngine
+from src.shards import ShardedEngine
+from src.tokenizer import term_positions, tokenize
+
+
+def measure(engine, batch, queries, batch_size: int = 2000) -> tuple[float, float]:
+    start = time.perf_counter()
+    for first in range(0, len(batch), batch_size):
+        engine.add_documents(batch[first:first + batch_size])
+    build = time.perf_counter() - start
+
+    engine.cache = QueryCache(0) # Sem acertos de cache: mede a consulta de verdade
+    start = time.perf_counter()
+    for query in queries:
+        engine.ranked_search(query, k=10, prefix=False, fuzzy=False)
+    return build, len(queries) / (time.perf_counter() - start)
+
+
+def main():
+    num_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    levels = [int(level) for level in sys.argv[2].split(',')] if len(sys.argv) > 2 else [2, 4, os.cpu_count() or 1]
+
+    corpus = SyntheticCorpus(50000)
+    batch = [(Page(url, title, content), term_positions(tokenize(content)))
+             for url, title, content in corpus.documents(num_docs)]
+    rng = random.Random(3)
+    frequent = corpus.vocabulary[:200] # As palavras mais frequentes do Zipf: consultas com listas longas
+    queries = [' '.join(rng.choice(frequent) for _ in range(3)) for _ in range(300)]
+    print(f"Documentos: {num_docs}  Consultas: {len(queries)} (3 termos frequentes, OR)")
+
+    build, qps = measure(SearchEngine(), batch, queries)
+    print(f"{'1 processo':>12}: indexacao {build:6.2f} s  {qps:7.1f} consultas/s")
+    for num_shards in levels:
+        with ShardedEngine(num_shards) as engine:
+            build, qps = measure(engine, batch, queries)
+        print(f"{f'{num_shards} shards':>12}: indexacao {build:6.2f} s  {qps:7.1f} consultas/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+# benchmarks/suite.py
+# Suíte de benchmarks do buscador: indexação, memória da Trie, latência de consultas e vazão do crawler.
+# O resultado sai em JSON para comparar commits:
+#   python -m benchmarks.suite --output resultados.json
+#   python -m benchmarks.suite --quick --skip-crawl
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks.synthetic import SyntheticCorpus, SyntheticSite
+from src.compact_trie import FrozenTrie
+from src.page import Page
+from src.query_cache import QueryCache
+from src.search_engine import SearchEngine
+from src.tokenizer import tokenize
+from src.tree import SearchTrie
+
+
+def percentiles(samples: list[float]) -> dict:
+    """Latências em microssegundos: média e percentis 50/90/99."""
+    ordered = sorted(samples)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1e6
+
+    return {'mean_us': sum(ordered) / len(ordered) * 1e6, 'p50_us': pick(50), 'p90_us': pick(90), 'p99_us': pick(99)}
+
+
+def bench_indexing(documents) -> tuple[SearchEngine, dict]:
+    engine = SearchEngine()
+    words = 0
+    tokenize_time = index_time = 0.0
+    for url, title, content in documents:
+        start = time.perf_counter()
+        terms = tokenize(content)
+        middle = time.perf_counter()
+        engine.add_page(Page(url, title, content), terms)
+        end = time.perf_counter()
+        words += len(terms)
+        tokenize_time += middle - start
+        index_time += end - middle
+
+    total = tokenize_time + index_time
+    return engine, {
+        'documents': len(engine),
+        'words': words,
+        'terms': len(engine.vocabulary()),
+        'words_per_second': words / total,
+        'documents_per_second': len(engine) / total,
+        'tokenize_share': tokenize_time / total,
+    }
+
+
+def _traced_bytes(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def bench_trie_memory(vocabulary: list[str]) -> dict:
+    def build_trie():
+        trie = SearchTrie()
+        for term in vocabulary:
+            trie.insert(term)
+        return trie
+
+    trie, trie_bytes = _traced_bytes(build_trie)
+    frozen, frozen_bytes = _traced_bytes(lambda: FrozenTrie.from_trie(trie))
+    return {
+        'terms': len(vocabulary),
+        'nodes': len(frozen),
+        'search_trie_bytes_per_term': trie_bytes / len(vocabulary),
+        'frozen_trie_bytes_per_term': frozen_bytes / len(vocabulary),
+    }
+
+
+def bench_queries(engine: SearchEngine, num_queries: int, seed: int = 3) -> dict:
+    rng = random.Random(seed)
+    vocabulary = engine.vocabulary()
+    # Termos frequentes aparecem mais nas consultas reais; sorteia metade entre os 1000 mais comuns
+    frequent = sorted(vocabulary, key=lambda term: -len(engine.get_postings(term)))[:1000]
+
+    def term():
+        return rng.choice(frequent) if rng.random() < 0.5 else rng.choice(vocabulary)
+
+    workloads = {
+        'exact': ([term() for _ in range(num_queries)], False),
+        'prefix': ([term()[:3] for _ in range(num_queries)], True),
+        'multi_term_or': ([' '.join(term() for _ in range(3)) for _ in range(num_queries)], False),
+        'multi_term_and': ([f'{rng.choice(frequent)} AND {rng.choice(frequent)}' for _ in range(num_queries)], False),
+    }
+
+    cache = engine.cache
+    engine.cache = QueryCache(0) # Mede o custo real da consulta, sem acertos de cache
+    results = {}
+    try:
+        for name, (queries, prefix) in workloads.items():
+            samples = []
+            for query in queries:
+                start = time.perf_counter()
+                engine.ranked_search(query, k=10, prefix=prefix, fuzzy=False)
+                samples.append(time.perf_counter() - start)
+            results[name] = percentiles(samples)
+    finally:
+        engine.cache = cache
+    return results
+
+
+def bench_crawl(num_pages: int, concurrency_levels: list[int], latency: float) -> dict:
+    from src.crawler import CrawlEngine
+    from src.http_client import HttpClient
+    from src.pipeline import CrawlPipeline
+
+    results = {}
+    with SyntheticSite(num_pages, latency=latency) as site:
+        for workers in concurrency_levels:
+            http_client = HttpClient(per_host=workers)
+            crawl_engine = CrawlEngine(workers=workers, per_host=workers, max_frontier=num_pages * 2,
+                                       http_client=http_client, rate=None, obey_robots=False)
+            pipeline = CrawlPipeline(SearchEngine(), crawl_engine, parse_processes=min(4, os.cpu_count() or 1))
+            start = time.perf_counter()
+            pipeline.start(site.start_url, max_depth=num_pages)
+            while pipeline.events.get()[0] != 'done':
+                pass
+            elapsed = time.perf_counter() - start
+            http_client.close()
+            results[str(workers)] = {
+                'pages': crawl_engine.pages_processed,
+                'pages_indexed': pipeline.pages_indexed,
+                'seconds': elapsed,
+                'pages_per_second': crawl_engine.pages_processed / elapsed,
+            }
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks do buscador (saida em JSON).')
+    parser.add_argument('--docs', type=int, default=5000, help='documentos do corpus sintetico')
+    parser.add_argument('--vocabulary', type=int, default=50000, help='tamanho do vocabulario sintetico')
+    parser.add_argument('--queries', type=int, default=2000, help='consultas por tipo')
+    parser.add_argument('--crawl-pages', type=int, default=300, help='paginas do site sintetico')
+    parser.add_argument('--concurrency', default='1,4,16', help='niveis de concorrencia do crawler, separados por virgula')
+    parser.add_argument('--latency', type=float, default=0.01, help='latencia simulada do site (segundos)')
+    parser.add_argument('--skip-crawl', action='store_true')
+    parser.add_argument('--quick', action='store_true', help='tamanhos reduzidos (para testar a suite)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='arquivo JSON de saida (padrao: stdout)')
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.docs, args.vocabulary, args.queries, args.crawl_pages = 500, 5000, 200, 60
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'params': vars(args),
+        },
+    }
+
+    corpus = SyntheticCorpus(args.vocabulary, args.seed)
+    engine, report['indexing'] = bench_indexing(corpus.documents(args.docs))
+    report['trie_memory'] = bench_trie_memory(engine.vocabulary())
+    report['queries'] = bench_queries(engine, args.queries)
+    if not args.skip_crawl:
+        levels = [int(level) for level in args.concurrency.split(',')]
+        report['crawl'] = bench_crawl(args.crawl_pages, levels, args.latency)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
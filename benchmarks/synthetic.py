@@ -0,0 +1,108 @@
+# benchmarks/synthetic.py
+# Geradores de dados sintéticos para os benchmarks: corpus de texto com vocabulário Zipf
+# e um site local com páginas ligadas entre si, servido por http.server.
+import random
+import threading
+import time
+from bisect import bisect
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import accumulate
+
+SYLLABLES = ['a', 'e', 'o', 'ca', 'co', 'de', 'do', 'di', 'ma', 'me', 'mi', 'na', 'no', 'pa', 'po', 'pro',
+             'ra', 're', 'ri', 'sa', 'se', 'si', 'ta', 'te', 'ti', 'to', 'va', 'ver', 'li', 'lo', 'gra', 'tra',
+             'ção', 'ções', 'men', 'dor', 'cia', 'es', 'is', 'al', 'an', 'en', 'in', 'or', 'ur', 'bi', 'fu', 'á', 'é']
+
+
+class SyntheticCorpus:
+    """Documentos com palavras sorteadas de um vocabulário com distribuição de Zipf (como texto real)."""
+
+    def __init__(self, vocabulary_size: int = 20000, seed: int = 42, zipf_s: float = 1.1):
+        self.rng = random.Random(seed)
+        words = set()
+        while len(words) < vocabulary_size:
+            words.add(''.join(self.rng.choice(SYLLABLES) for _ in range(self.rng.randint(2, 5))))
+        self.vocabulary = sorted(words)
+        self.rng.shuffle(self.vocabulary) # A posição no Zipf não depende da ordem alfabética
+        self._cumulative = list(accumulate(1 / (rank ** zipf_s) for rank in range(1, vocabulary_size + 1)))
+
+    def word(self) -> str:
+        return self.vocabulary[bisect(self._cumulative, self.rng.random() * self._cumulative[-1])]
+
+    def text(self, num_words: int) -> str:
+        return ' '.join(self.word() for _ in range(num_words))
+
+    def documents(self, count: int, min_words: int = 50, max_words: int = 400):
+        for i in range(count):
+            yield f'https://exemplo.com/doc{i}', f'Documento {i}', self.text(self.rng.randint(min_words, max_words))
+
+
+class SyntheticSite:
+    """Site local com `num_pages` páginas HTML; cada uma aponta para `fanout` outras.
+
+    A página 0 alcança todas as demais (árvore de largura `fanout`) e há links extras
+    aleatórios, para o crawler ter duplicatas a descartar. `latency` simula o tempo de
+    resposta de um servidor real, o que torna visível o ganho de concorrência.
+    """
+
+    def __init__(self, num_pages: int = 200, fanout: int = 4, latency: float = 0.01, words_per_page: int = 150, seed: int = 7):
+        corpus = SyntheticCorpus(5000, seed)
+        rng = random.Random(seed)
+        self.num_pages = num_pages
+        self.latency = latency
+        self.pages = []
+        for n in range(num_pages):
+            targets = [m for m in range(fanout * n + 1, fanout * n + fanout + 1) if m < num_pages]
+            targets += [rng.randrange(num_pages) for _ in range(2)]
+            links = ''.join(f'<a href="/p{m}.html">pagina {m}</a> ' for m in targets)
+            body = f'<html><head><title>Pagina {n}</title></head><body><p>{corpus.text(words_per_page)}</p>{links}</body></html>'
+            self.pages.append(body.encode('utf-8'))
+        self._server = None
+
+    @property
+    def start_url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_address[1]}/p0.html'
+
+    def start(self) -> 'SyntheticSite':
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1' # keep-alive, como um servidor real
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if site.latency:
+                    time.sleep(site.latency)
+                body = None
+                if self.path.startswith('/p') and self.path.endswith('.html'):
+                    number = self.path[2:-5]
+                    if number.isdigit() and int(number) < site.num_pages:
+                        body = site.pages[int(number)]
+                if body is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='synthetic-site', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
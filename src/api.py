@@ -0,0 +1,189 @@
+# src/api.py
+"""API do buscador sem interface gráfica (para scripts, jobs em lote e servidores sem display).
+
+Nada aqui importa tkinter; o crawler (requests) e o parse de HTML (bs4) só são
+importados pelas funções que precisam deles.
+"""
+import os
+
+from src.page import Page
+from src.search_engine import SearchEngine
+from src.segments import SegmentedEngine
+from src.shards import ShardedEngine, saved_num_shards, shard_path
+from src.storage import DEFAULT_INDEX_PATH, load_index, save_index
+
+INDEX_BATCH_SIZE = 1000 # Páginas por lote na indexação de arquivos locais
+
+
+def open_engine(path: str = DEFAULT_INDEX_PATH, segmented: bool = False, shards: int = 0) -> SearchEngine:
+    """Carrega o índice salvo em `path`, ou cria um vazio se o arquivo não existir.
+
+    Com `segmented`, o índice é um SegmentedEngine (melhor para crawlings longos com buscas ao mesmo tempo).
+    Com `shards`, é um ShardedEngine com esse número de processos, cada um com seu arquivo ao lado de `path`;
+    um índice salvo em shards é aberto assim mesmo sem `shards`, com o número com que foi salvo.
+    """
+    shards = shards or (saved_num_shards(path) if path else 0)
+    if shards and segmented:
+        raise ValueError("Um indice em shards nao pode ser segmentado")
+    if shards:
+        return ShardedEngine(shards, path)
+    if path and os.path.exists(path):
+        return load_index(path, segmented=segmented)
+    return SegmentedEngine() if segmented else SearchEngine()
+
+
+def save_engine(engine: SearchEngine, path: str = DEFAULT_INDEX_PATH):
+    if isinstance(engine, ShardedEngine):
+        engine.save(path)
+    else:
+        save_index(engine, path)
+
+
+def index_files(path: str = DEFAULT_INDEX_PATH, shards: int = 0) -> list[str]:
+    """Arquivos em que o índice é salvo (um por shard, com `shards` ou se ele foi salvo em shards)."""
+    shards = saved_num_shards(path) or shards
+    return [shard_path(path, shard) for shard in range(shards)] if shards else [path]
+
+
+def index_exists(path: str = DEFAULT_INDEX_PATH, shards: int = 0) -> bool:
+    return all(os.path.exists(file_path) for file_path in index_files(path, shards))
+
+
+def load_fetch_cache(index_path: str = DEFAULT_INDEX_PATH):
+    """FetchCache salvo junto do índice (vazio se o índice ainda não existe)."""
+    from src.http_client import FetchCache, fetch_cache_path
+
+    if not os.path.exists(index_path):
+        return FetchCache()
+    return FetchCache.load(fetch_cache_path(index_path))
+
+
+def save_fetch_cache(fetch_cache, index_path: str = DEFAULT_INDEX_PATH):
+    from src.http_client import fetch_cache_path
+
+    fetch_cache.save(fetch_cache_path(index_path))
+
+
+def crawl(engine: SearchEngine, start_url: str, max_depth: int = 1, workers: int = 8, per_host: int = 4,
+          max_frontier: int = 10000, parse_processes: int = None, fetch_cache=None, on_event=None,
+          rate: float = 2.0, max_pages: int = None, max_bytes: int = None, obey_robots: bool = True,
+          checkpoint=None, checkpoint_interval: float = 30.0, resume: bool = False) -> dict:
+    """Executa um crawling completo, indexando em `engine`, e devolve a vazão de cada estágio.
+
+    Com `fetch_cache`, páginas que não mudaram desde o último crawling (HTTP 304) não são reprocessadas.
+    `rate` limita as requisições por segundo a cada host (None = sem limite); o Crawl-delay do
+    robots.txt pode reduzi-lo. `max_pages`/`max_bytes` encerram o crawling ao serem atingidos.
+    Com um `checkpoint` (CrawlCheckpoint), o progresso é salvo periodicamente; com `resume`, o
+    diário é reaplicado em `engine` e o crawling salvo continua (`start_url` e `max_depth` são ignorados).
+    `on_event(kind, *payload)` recebe os mesmos eventos do pipeline ('log', 'progress', 'done').
+    """
+    from src.crawler import CrawlEngine
+    from src.http_client import HttpClient
+    from src.pipeline import CrawlPipeline
+
+    http_client = HttpClient(per_host=per_host, cache=fetch_cache)
+    crawl_engine = CrawlEngine(workers=workers, per_host=per_host, max_frontier=max_frontier, http_client=http_client,
+                               rate=rate, max_pages=max_pages, max_bytes=max_bytes, obey_robots=obey_robots)
+    pipeline = CrawlPipeline(engine, crawl_engine, parse_processes=parse_processes,
+                             checkpoint=checkpoint, checkpoint_interval=checkpoint_interval)
+    if resume:
+        checkpoint.replay(engine)
+        pipeline.resume(checkpoint.load())
+    else:
+        pipeline.start(start_url, max_depth)
+    try:
+        while True:
+            kind, *payload = pipeline.events.get()
+            if on_event is not None:
+                on_event(kind, *payload)
+            if kind == 'done':
+                return payload[0]
+    except KeyboardInterrupt: # Ctrl+C: grava o checkpoint antes de sair
+        pipeline.cancel()
+        pipeline.join()
+        raise
+    finally:
+        http_client.close()
+
+
+def index_paths(engine: SearchEngine, paths, on_page=None, batch_size: int = INDEX_BATCH_SIZE) -> int:
+    """Indexa arquivos locais (.html/.htm pelo parser de HTML, os demais como texto). Diretórios são percorridos.
+
+    As páginas são indexadas em lotes de `batch_size` (`SearchEngine.add_documents`).
+    """
+    from src.parser import parse_document
+    from src.tokenizer import term_positions, tokenize
+
+    indexed = 0
+    batch = []
+    for file_path in _iter_files(paths):
+        url = 'file://' + os.path.abspath(file_path)
+        with open(file_path, 'rb') as f:
+            data = f.read()
+
+        if file_path.lower().endswith(('.html', '.htm')):
+            parsed = parse_document(url, 0, data)
+            page, positions = Page(url, parsed.title, parsed.content), parsed.term_positions
+        else:
+            content = data.decode('utf-8', errors='replace')
+            page, positions = Page(url, os.path.basename(file_path), content), term_positions(tokenize(content))
+
+        if not positions:
+            continue
+        batch.append((page, positions))
+        if len(batch) >= batch_size:
+            indexed += _index_batch(engine, batch, on_page)
+            batch = []
+    return indexed + _index_batch(engine, batch, on_page)
+
+
+def _index_batch(engine: SearchEngine, batch, on_page) -> int:
+    if batch:
+        engine.add_documents(batch)
+        if on_page is not None:
+            for page, _ in batch:
+                on_page(page)
+    return len(batch)
+
+
+def _iter_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def search(engine: SearchEngine, query: str, k: int = 10, prefix: bool = True) -> list[tuple[Page, float]]:
+    return engine.ranked_search(query, k=k, prefix=prefix)
+
+
+def suggest(engine: SearchEngine, prefix: str, n: int = 10) -> list[tuple[str, int]]:
+    """Autocompletar: as palavras mais frequentes que começam com `prefix` (como aparecem no texto), com sua frequência nos documentos."""
+    return engine.suggest(prefix, n)
+
+
+def index_stats(engine: SearchEngine) -> dict:
+    if isinstance(engine, ShardedEngine):
+        return engine.index_stats()
+    vocabulary = engine.vocabulary()
+    num_postings = sum(len(engine.get_postings(term)) for term in vocabulary)
+    num_pages = len(engine)
+    stats = {
+        'pages': num_pages,
+        'terms': len(vocabulary),
+        'postings': num_postings,
+        'total_length': engine.docs.total_length,
+        'avg_page_length': engine.docs.total_length / num_pages if num_pages else 0.0,
+    }
+    if isinstance(engine, SegmentedEngine):
+        stats['segments'] = len(engine.segments)
+        stats['merges'] = engine.merges
+    return stats
+
+
+def cache_stats(engine: SearchEngine) -> dict:
+    """Acertos, falhas e ocupação do cache de resultados (para dimensionar `cache_size`)."""
+    return engine.cache.stats()
@@ -0,0 +1,107 @@
+# src/checkpoint.py
+import json
+import os
+import threading
+
+from src.page import Page
+from src.storage import atomic_write
+
+
+def checkpoint_paths(index_path: str) -> tuple[str, str, str]:
+    """(estado, diário, URLs vistas) do checkpoint de crawling que acompanha um snapshot do índice."""
+    return index_path + '.crawl.json', index_path + '.crawl.journal', index_path + '.crawl.seen'
+
+
+class CrawlCheckpoint:
+    """Checkpoint de um crawling longo, para retomá-lo depois de fechar o programa.
+
+    São três arquivos ao lado do índice:
+    - o estado (fronteira, contadores), regravado de forma atômica a cada
+      checkpoint;
+    - o diário: uma linha JSON por página indexada durante o crawling (o delta
+      do índice desde o último snapshot salvo), só de acréscimo;
+    - as URLs vistas, uma por linha, também só de acréscimo: cada checkpoint
+      grava apenas as novas, e o estado guarda até que tamanho o arquivo vale.
+    Ao retomar, o diário é reaplicado sobre o índice salvo e a fronteira volta
+    de onde parou; páginas que estavam sendo baixadas ou processadas voltam
+    para a fila. Reindexar uma página repetida não muda o índice.
+    """
+
+    def __init__(self, index_path: str):
+        self.state_path, self.journal_path, self.seen_path = checkpoint_paths(index_path)
+        self._journal = None
+        self._seen_size = 0 # Bytes do arquivo de URLs vistas que o último estado gravado cobre
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.state_path)
+
+    def record(self, page: Page, term_positions: dict):
+        """Acrescenta uma página indexada (com as posições dos termos) ao diário; chamado pelo estágio de indexação."""
+        line = json.dumps({'url': page.url, 'title': page.title, 'content': page.content, 'positions': term_positions},
+                          ensure_ascii=False)
+        with self._lock:
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            self._journal.write(line + '\n')
+
+    def save(self, state: dict):
+        """Grava o estado do crawling; o diário e as URLs novas (`state['seen_new']`) são sincronizados antes,
+        para o estado nunca citar páginas ou URLs perdidas."""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+        state = dict(state)
+        new_urls = state.pop('seen_new', ())
+        with open(self.seen_path, 'ab') as f:
+            f.truncate(self._seen_size) # Descarta o que uma gravação anterior que falhou deixou no fim
+            f.write(''.join(url + '\n' for url in new_urls).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+            state['seen_size'] = f.tell()
+        with atomic_write(self.state_path) as f:
+            f.write(json.dumps(state, ensure_ascii=False).encode('utf-8'))
+        self._seen_size = state['seen_size']
+
+    def load(self) -> dict:
+        """Estado salvo, com as URLs vistas em `state['seen']['urls']` (como `UrlSeenSet.from_state` espera)."""
+        with open(self.state_path, 'rb') as f:
+            state = json.loads(f.read().decode('utf-8'))
+        size = state.pop('seen_size', None)
+        if size is not None:
+            with open(self.seen_path, 'rb') as f:
+                state['seen']['urls'] = f.read(size).decode('utf-8').splitlines()
+            self._seen_size = size
+        return state
+
+    def replay(self, engine) -> int:
+        """Reaplica o diário em `engine` e devolve quantas páginas foram reindexadas."""
+        if not os.path.exists(self.journal_path):
+            return 0
+        replayed = 0
+        with open(self.journal_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError: # Última linha cortada por uma queda no meio da escrita
+                    break
+                positions = entry['positions']
+                engine.add_document(Page(entry['url'], entry['title'], entry['content']),
+                                    {term: len(p) for term, p in positions.items()}, positions)
+                replayed += 1
+        return replayed
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def clear(self):
+        """Apaga o checkpoint (depois que o crawling terminou e o índice completo foi salvo)."""
+        self.close()
+        for path in (self.state_path, self.journal_path, self.seen_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._seen_size = 0
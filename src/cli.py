@@ -0,0 +1,196 @@
+# src/cli.py
+"""Linha de comando do buscador (sem tkinter).
+
+Uso (na raiz do projeto):
+    python -m src.cli crawl https://ifpe.edu.br --depth 2
+    python -m src.cli crawl --resume
+    python -m src.cli index paginas/ notas.txt
+    python -m src.cli search "estrutura de dados" -k 5
+    python -m src.cli suggest estr
+    python -m src.cli --shards 4 index paginas/
+    python -m src.cli stats
+    python -m src.cli serve --port 8080
+"""
+import argparse
+import json
+import os
+import sys
+
+from src import api
+from src.shards import saved_num_shards
+from src.storage import DEFAULT_INDEX_PATH, snapshot_files
+
+
+def _cmd_crawl(args) -> int:
+    from src.checkpoint import CrawlCheckpoint
+
+    checkpoint = CrawlCheckpoint(args.index)
+    if args.resume and not checkpoint.exists():
+        print(f"Nenhum crawling interrompido para '{args.index}'.", file=sys.stderr)
+        return 1
+    if not args.resume and not args.url:
+        print("Informe a URL de inicio (ou --resume).", file=sys.stderr)
+        return 1
+    if not args.resume:
+        checkpoint.clear()
+
+    engine = api.open_engine(args.index, segmented=args.segmented, shards=args.shards)
+    fetch_cache = api.load_fetch_cache(args.index)
+
+    def on_event(kind, *payload):
+        if kind == 'log' and not args.quiet:
+            print(payload[0])
+        elif kind == 'done':
+            print("Vazao por estagio: " + ', '.join(f"{name} {rate:.1f}/s" for name, rate in payload[0].items()))
+
+    api.crawl(engine, args.url, args.depth, workers=args.workers, per_host=args.per_host,
+              max_frontier=args.max_frontier, parse_processes=args.processes, fetch_cache=fetch_cache, on_event=on_event,
+              rate=args.rate or None, max_pages=args.max_pages, max_bytes=args.max_bytes, obey_robots=not args.ignore_robots,
+              checkpoint=checkpoint, checkpoint_interval=args.checkpoint_interval, resume=args.resume)
+    api.save_engine(engine, args.index)
+    api.save_fetch_cache(fetch_cache, args.index)
+    checkpoint.clear()
+    print(f"Indice salvo em '{args.index}' ({len(engine)} paginas).")
+    return 0
+
+
+def _cmd_index(args) -> int:
+    engine = api.open_engine(args.index, segmented=args.segmented, shards=args.shards)
+    indexed = api.index_paths(engine, args.paths, on_page=None if args.quiet else lambda page: print(f"Indexado: {page.url}"))
+    api.save_engine(engine, args.index)
+    print(f"{indexed} arquivos indexados. Indice salvo em '{args.index}' ({len(engine)} paginas).")
+    return 0
+
+
+def _cmd_search(args) -> int:
+    if not api.index_exists(args.index, args.shards):
+        print(f"Indice '{args.index}' nao encontrado.", file=sys.stderr)
+        return 1
+
+    engine = api.open_engine(args.index, shards=args.shards)
+    results = api.search(engine, args.query, k=args.k, prefix=not args.exact)
+    if args.json:
+        print(json.dumps([{'url': page.url, 'title': page.title, 'score': score} for page, score in results], ensure_ascii=False))
+    elif not results:
+        print("Nenhum resultado encontrado para sua busca.")
+    else:
+        for page, score in results:
+            print(f"{score:8.3f}  {page.title}  ({page.url})")
+    return 0
+
+
+def _cmd_suggest(args) -> int:
+    if not api.index_exists(args.index, args.shards):
+        print(f"Indice '{args.index}' nao encontrado.", file=sys.stderr)
+        return 1
+
+    suggestions = api.suggest(api.open_engine(args.index, shards=args.shards), args.prefix, args.n)
+    if args.json:
+        print(json.dumps([{'term': term, 'doc_freq': doc_freq} for term, doc_freq in suggestions], ensure_ascii=False))
+    else:
+        for term, doc_freq in suggestions:
+            print(f"{doc_freq:6d}  {term}")
+    return 0
+
+
+def _cmd_stats(args) -> int:
+    if not api.index_exists(args.index, args.shards):
+        print(f"Indice '{args.index}' nao encontrado.", file=sys.stderr)
+        return 1
+
+    stats = api.index_stats(api.open_engine(args.index, shards=args.shards))
+    stats['file_bytes'] = sum(os.path.getsize(file_path) for path in api.index_files(args.index, args.shards)
+                              for file_path in snapshot_files(path))
+    if args.json:
+        print(json.dumps(stats))
+    else:
+        for key, value in stats.items():
+            print(f"{key:>16}: {value:.2f}" if isinstance(value, float) else f"{key:>16}: {value}")
+    return 0
+
+
+def _cmd_serve(args) -> int:
+    from src.server import serve
+
+    if args.shards or saved_num_shards(args.index):
+        print("O servidor ainda nao serve indices em shards.", file=sys.stderr)
+        return 1
+    serve(args.index, args.host, args.port, max_concurrent=args.max_concurrent, max_pending=args.max_pending,
+          reload_interval=args.reload_interval,
+          on_ready=lambda server: print(f"Servindo '{args.index}' em http://{server.host}:{server.port}/ (Ctrl+C encerra)",
+                                        flush=True))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='buscador', description='Buscador Web IFPE sem interface grafica.')
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help=f'arquivo do indice (padrao: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--shards', type=int, default=0,
+                        help='divide o indice entre N processos (um arquivo por shard, ao lado de --index)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    crawl = commands.add_parser('crawl', help='faz crawling a partir de uma URL e indexa as paginas')
+    crawl.add_argument('url', nargs='?')
+    crawl.add_argument('--resume', action='store_true', help='continua o crawling interrompido salvo junto do indice')
+    crawl.add_argument('--checkpoint-interval', type=float, default=30.0, help='segundos entre checkpoints')
+    crawl.add_argument('--depth', type=int, default=1, help='profundidade maxima (0 = so a pagina inicial)')
+    crawl.add_argument('--workers', type=int, default=8, help='downloads simultaneos')
+    crawl.add_argument('--per-host', type=int, default=4, help='conexoes simultaneas por host')
+    crawl.add_argument('--max-frontier', type=int, default=10000, help='maximo de URLs aguardando na fila')
+    crawl.add_argument('--rate', type=float, default=2.0, help='requisicoes por segundo a cada host (0 = sem limite)')
+    crawl.add_argument('--max-pages', type=int, default=None, help='para depois de baixar esta quantidade de paginas')
+    crawl.add_argument('--max-bytes', type=int, default=None, help='para depois de baixar esta quantidade de bytes')
+    crawl.add_argument('--ignore-robots', action='store_true', help='nao consulta o robots.txt')
+    crawl.add_argument('--processes', type=int, default=None, help='processos de parse (padrao: numero de CPUs)')
+    crawl.add_argument('--segmented', action='store_true', help='indice segmentado, com merges em segundo plano')
+    crawl.add_argument('-q', '--quiet', action='store_true', help='nao imprime o log de cada pagina')
+    crawl.set_defaults(func=_cmd_crawl)
+
+    index = commands.add_parser('index', help='indexa arquivos locais (HTML ou texto)')
+    index.add_argument('paths', nargs='+', help='arquivos ou diretorios')
+    index.add_argument('--segmented', action='store_true', help='indice segmentado, com merges em segundo plano')
+    index.add_argument('-q', '--quiet', action='store_true')
+    index.set_defaults(func=_cmd_index)
+
+    search = commands.add_parser('search', help='busca no indice')
+    search.add_argument('query')
+    search.add_argument('-k', type=int, default=10, help='quantidade de resultados')
+    search.add_argument('--exact', action='store_true', help='termos exatos em vez de prefixos')
+    search.add_argument('--json', action='store_true', help='saida em JSON')
+    search.set_defaults(func=_cmd_search)
+
+    suggest = commands.add_parser('suggest', help='termos mais frequentes que comecam com um prefixo')
+    suggest.add_argument('prefix')
+    suggest.add_argument('-n', type=int, default=10, help='quantidade de sugestoes')
+    suggest.add_argument('--json', action='store_true', help='saida em JSON')
+    suggest.set_defaults(func=_cmd_suggest)
+
+    stats = commands.add_parser('stats', help='estatisticas do indice')
+    stats.add_argument('--json', action='store_true', help='saida em JSON')
+    stats.set_defaults(func=_cmd_stats)
+
+    serve = commands.add_parser('serve', help='servidor HTTP/JSON com /search, /suggest e /stats')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8080, help='porta (0 = uma livre)')
+    serve.add_argument('--max-concurrent', type=int, default=8, help='buscas executando ao mesmo tempo')
+    serve.add_argument('--max-pending', type=int, default=64, help='buscas esperando antes de responder 503')
+    serve.add_argument('--reload-interval', type=float, default=2.0,
+                       help='segundos entre as conferencias do arquivo do indice (recarregado se mudar)')
+    serve.set_defaults(func=_cmd_serve)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'segmented', False) and args.shards:
+        print("--segmented e --shards nao podem ser usados juntos.", file=sys.stderr)
+        return 1
+    try:
+        return args.func(args)
+    except ValueError as e: # Índice inválido ou salvo com outro número de shards
+        print(e, file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
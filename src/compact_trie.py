@@ -0,0 +1,109 @@
+# src/compact_trie.py
+from array import array
+
+from src.page import Page
+from src.tree import SearchTrie
+
+
+class FrozenTrie:
+    """Trie imutável e compacta, construída a partir de uma SearchTrie.
+
+    Os nós ficam em pré-ordem (DFS) em arrays paralelos, então a subárvore de
+    um nó i ocupa exatamente as posições [i, i + subtree_size[i]). Com isso,
+    as páginas de um prefixo são um único intervalo contíguo de `page_ids`,
+    sem recursão nem objetos por nó. Responde a mesma API `search(prefix)`.
+    """
+
+    def __init__(self):
+        self.labels = '' # Caractere de cada nó (a raiz usa '\0')
+        self.subtree_size = array('I')
+        self.is_word = bytearray() # 1 se o nó marca o fim de uma palavra
+        self.page_start = array('I') # Início das páginas do nó em page_ids (com sentinela no final)
+        self.page_ids = array('I')
+        self.page_table = [] # id -> objeto Page (cada página aparece uma vez)
+
+    @classmethod
+    def from_trie(cls, trie: SearchTrie) -> 'FrozenTrie':
+        frozen = cls()
+        labels = []
+        page_index = {}
+
+        # DFS iterativa; os filhos são visitados em ordem alfabética
+        stack = [('\0', trie.root, None)]
+        parents = [] # (posição do nó, posição do último filho visitado) para calcular os tamanhos
+        while stack:
+            label, node, parent_pos = stack.pop()
+            pos = len(labels)
+            labels.append(label)
+            frozen.subtree_size.append(1)
+            frozen.is_word.append(1 if node.is_end_of_word else 0)
+            frozen.page_start.append(len(frozen.page_ids))
+            for page in node.pages:
+                page_id = page_index.get(page)
+                if page_id is None:
+                    page_id = page_index[page] = len(frozen.page_table)
+                    frozen.page_table.append(page)
+                frozen.page_ids.append(page_id)
+
+            # Fecha os ancestrais cuja subárvore terminou antes deste nó
+            while parents and parents[-1] != parent_pos:
+                finished = parents.pop()
+                if parents:
+                    frozen.subtree_size[parents[-1]] += frozen.subtree_size[finished]
+            parents.append(pos)
+
+            for char_key in sorted(node.children, reverse=True):
+                stack.append((char_key, node.children[char_key], pos))
+
+        while parents:
+            finished = parents.pop()
+            if parents:
+                frozen.subtree_size[parents[-1]] += frozen.subtree_size[finished]
+
+        frozen.page_start.append(len(frozen.page_ids))
+        frozen.labels = ''.join(labels)
+        return frozen
+
+    def _find(self, prefix: str) -> int:
+        node = 0
+        for char in prefix.lower():
+            child = node + 1
+            end = node + self.subtree_size[node]
+            while child < end and self.labels[child] != char:
+                child += self.subtree_size[child] # Pula a subárvore inteira do irmão
+            if child >= end:
+                return -1
+            node = child
+        return node
+
+    def search(self, word: str) -> list[Page]:
+        node = self._find(word)
+        if node < 0:
+            return []
+        start = self.page_start[node]
+        end = self.page_start[node + self.subtree_size[node]]
+        return [self.page_table[page_id] for page_id in set(self.page_ids[start:end])]
+
+    def words_with_prefix(self, prefix: str) -> list[str]:
+        prefix = prefix.lower()
+        node = self._find(prefix)
+        if node < 0:
+            return []
+
+        words = []
+        stack = [(node, prefix)]
+        while stack:
+            pos, path = stack.pop()
+            if self.is_word[pos]:
+                words.append(path)
+            child = pos + 1
+            end = pos + self.subtree_size[pos]
+            children = []
+            while child < end:
+                children.append((child, path + self.labels[child]))
+                child += self.subtree_size[child]
+            stack.extend(reversed(children))
+        return words
+
+    def __len__(self):
+        return len(self.subtree_size)
@@ -0,0 +1,203 @@
+# src/crawler.py
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+from src.http_client import HttpClient
+from src.indexer import UrlSeenSet, canonicalize_url
+from src.scheduler import PolitenessScheduler, RobotsCache
+
+
+class FetchResult:
+    def __init__(self, url: str, depth: int, content: bytes = None, encoding: str = None, error: Exception = None,
+                 etag: str = None, last_modified: str = None, not_modified: bool = False, links: list[str] = None):
+        self.url = url
+        self.depth = depth
+        self.content = content # Corpo bruto da resposta; o parse decodifica (em outro processo)
+        self.encoding = encoding
+        self.error = error
+        self.etag = etag
+        self.last_modified = last_modified
+        self.not_modified = not_modified # 304: a página não mudou desde o último crawling
+        self.links = links # Links guardados no FetchCache (só para respostas 304)
+
+    def __repr__(self):
+        status = 'erro' if self.error else '304' if self.not_modified else 'ok'
+        return f"FetchResult(url='{self.url}', depth={self.depth}, {status})"
+
+
+class CrawlEngine:
+    """Motor de crawling concorrente em largura (BFS).
+
+    Os downloads rodam num pool de threads; quem usa o motor chama `poll()`
+    periodicamente (ex.: via `root.after`) para receber as páginas baixadas,
+    processá-las e devolver os links encontrados com `add_links()`.
+
+    A fronteira é um PolitenessScheduler: respeita o robots.txt, limita a taxa
+    de requisições por host (`rate` por segundo, ou sem limite se None) e para
+    ao atingir `max_pages` páginas ou `max_bytes` baixados.
+    """
+
+    def __init__(self, workers: int = 8, per_host: int = 2, max_frontier: int = 10000, timeout: float = 5, bloom_capacity: int = None,
+                 http_client: HttpClient = None, rate: float = 2.0, max_pages: int = None, max_bytes: int = None,
+                 obey_robots: bool = True):
+        self.workers = workers
+        self.per_host = per_host # Máximo de downloads simultâneos por host
+        self.max_frontier = max_frontier # Tamanho máximo da fronteira (fila de URLs)
+        self.timeout = timeout
+        self.http_client = http_client or HttpClient(per_host=per_host, timeout=timeout) # Conexões reaproveitadas entre crawlings
+
+        # Filas por host com as tuplas (url, profundidade) ainda não despachadas
+        self.frontier = PolitenessScheduler(rate, burst=per_host, per_host=per_host, max_pages=max_pages, max_bytes=max_bytes,
+                                            robots=RobotsCache() if obey_robots else None)
+        self.seen = UrlSeenSet(bloom_capacity) # URLs já enfileiradas ou visitadas (canonicalizadas)
+        self.pages_processed = 0
+        self.pages_discovered = 0
+        self.links_dropped = 0 # Links descartados por fronteira cheia
+        self.in_progress = {} # url -> profundidade dos downloads despachados e ainda não entregues por `poll()`
+        self.track_seen = False # Anota as URLs novas de `seen` para checkpoints incrementais (ligado pelo pipeline)
+
+        self._start_netloc = None
+        self._max_depth = 0
+        self._results = queue.Queue()
+        self._pending = 0 # Downloads despachados cujo resultado ainda não foi entregue
+        self._executor = None
+
+    def start(self, start_url: str, max_depth: int):
+        start_url = canonicalize_url(start_url)
+        self._reset(urlparse(start_url).netloc, max_depth)
+        self.pages_discovered = 1
+        self.seen.add(start_url)
+        self.frontier.append((start_url, 0))
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='crawler')
+
+    def resume(self, state: dict):
+        """Retoma um crawling a partir de um `checkpoint_state()`."""
+        self._reset(state['netloc'], state['max_depth'])
+        self.seen = UrlSeenSet.from_state(state['seen'])
+        self.seen.track_new(self.track_seen)
+        for url, depth in state['frontier']:
+            self.frontier.append((url, depth))
+        self.pages_processed = state['pages_processed']
+        self.pages_discovered = state['pages_discovered']
+        self.frontier.pages_dispatched = state['pages_dispatched'] # Os orçamentos valem para o crawling inteiro
+        self.frontier.bytes_downloaded = state['bytes_downloaded']
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='crawler')
+
+    def checkpoint_state(self, unfinished=()) -> dict:
+        """Estado serializável do crawling. `unfinished` são (url, profundidade) já entregues por `poll()`
+        cujo processamento ainda não terminou; eles e os downloads em andamento serão refeitos ao retomar.
+
+        Das URLs vistas, só vão as adicionadas desde o último `checkpoint_saved()` (em 'seen_new').
+        """
+        redo = list(self.in_progress.items()) + list(unfinished)
+        return {
+            'netloc': self._start_netloc,
+            'max_depth': self._max_depth,
+            'frontier': redo + list(self.frontier),
+            'seen': self.seen.to_state(),
+            'seen_new': list(self.seen.new_urls or ()),
+            'pages_processed': self.pages_processed - len(unfinished),
+            'pages_discovered': self.pages_discovered,
+            'pages_dispatched': self.frontier.pages_dispatched - len(redo),
+            'bytes_downloaded': self.frontier.bytes_downloaded,
+        }
+
+    def checkpoint_saved(self, state: dict):
+        """O estado de `checkpoint_state()` foi gravado: suas URLs novas já estão no checkpoint."""
+        if self.seen.new_urls:
+            del self.seen.new_urls[:len(state['seen_new'])]
+
+    def _reset(self, netloc: str, max_depth: int):
+        self.shutdown()
+        self.frontier.clear()
+        self.seen.clear()
+        self.seen.track_new(self.track_seen)
+        self.in_progress.clear()
+        self.pages_processed = 0
+        self.pages_discovered = 0
+        self.links_dropped = 0
+        self._pending = 0
+        self._results = queue.Queue()
+        self._start_netloc = netloc
+        self._max_depth = max_depth
+
+    def add_links(self, base_url: str, depth: int, hrefs):
+        """Enfileira os links de uma página na profundidade `depth + 1`, respeitando o limite de profundidade e o mesmo host."""
+        if depth >= self._max_depth:
+            return 0
+
+        added = 0
+        for href in hrefs:
+            full_url = urljoin(base_url, href)
+            if not re.match(r'^https?:\/\/', full_url):
+                continue
+            full_url = canonicalize_url(full_url)
+            if urlparse(full_url).netloc != self._start_netloc or full_url in self.seen:
+                continue
+            if len(self.frontier) >= self.max_frontier:
+                self.links_dropped += 1
+                continue
+            self.seen.add(full_url)
+            self.frontier.append((full_url, depth + 1))
+            self.pages_discovered += 1
+            added += 1
+        return added
+
+    def poll(self) -> list[FetchResult]:
+        """Despacha novos downloads e devolve (sem bloquear) os que já terminaram."""
+        self._dispatch()
+
+        finished = []
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self.in_progress.pop(result.url, None)
+            finished.append(result)
+        self._pending -= len(finished)
+        self.pages_processed += len(finished)
+        return finished
+
+    @property
+    def finished(self) -> bool:
+        return (not self.frontier or self.frontier.exhausted) and self._pending == 0
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _dispatch(self):
+        if self._executor is None:
+            return
+
+        # O scheduler só libera URLs de hosts com vaga, token disponível e permissão do robots.txt
+        while self._pending < self.workers:
+            item = self.frontier.pop_ready()
+            if item is None:
+                break
+            url, depth = item
+            self.in_progress[url] = depth
+            self._pending += 1
+            self._executor.submit(self._fetch, url, depth, urlparse(url).netloc)
+
+    def _fetch(self, url: str, depth: int, host: str):
+        num_bytes = 0
+        try:
+            if not self.frontier.check_robots(self.http_client, url):
+                raise PermissionError('bloqueada pelo robots.txt')
+            response = self.http_client.get(url)
+            if response.not_modified:
+                result = FetchResult(url, depth, not_modified=True, links=self.http_client.cache.links(url))
+            else:
+                num_bytes = len(response.content)
+                result = FetchResult(url, depth, content=response.content, encoding=response.encoding,
+                                     etag=response.etag, last_modified=response.last_modified)
+        except Exception as e:
+            result = FetchResult(url, depth, error=e)
+        finally:
+            self.frontier.release(host, num_bytes)
+        self._results.put(result)
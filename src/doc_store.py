@@ -0,0 +1,130 @@
+# src/doc_store.py
+import os
+import zlib
+from array import array
+
+from src.page import Page
+
+_FROM_BASE = 0xFFFFFFFFFFFFFFFF # Offset que indica "conteúdo ainda está no snapshot mapeado"
+
+
+class DocStore:
+    """Tabela de documentos com doc IDs inteiros e densos.
+
+    Os metadados ficam em listas e arrays paralelos (url, título, tamanho em
+    termos) em vez de um objeto por página. O conteúdo completo pode ficar
+    comprimido com zlib em memória ou, com `content_path`, ser despejado num
+    arquivo em disco; objetos Page só são montados quando alguém pede por eles.
+    """
+
+    def __init__(self, content_path: str = None, compress: bool = True):
+        self.urls = [] # doc_id -> url (None se o documento foi removido)
+        self.titles = []
+        self.lengths = array('I') # doc_id -> quantidade de termos indexados
+        self.total_length = 0
+        self.num_docs = 0 # Documentos existentes (sem contar os removidos)
+        self.compress = compress
+        self.base = None # MappedIndex de onde vêm os conteúdos ainda não regravados
+
+        self._ids = {} # url -> doc_id
+        self._contents = [] # Em memória: conteúdo (bytes comprimidos ou str) ou None se está no snapshot
+        self._content_file = None
+        self._content_offsets = array('Q')
+        self._content_sizes = array('I')
+        if content_path is not None:
+            self._content_file = open(content_path, 'w+b')
+
+    def attach_base(self, base):
+        """Carrega os metadados de um snapshot mapeado; os conteúdos continuam no arquivo e são lidos sob demanda."""
+        self.base = base
+        for doc_id in range(base.num_docs):
+            url, title = base.doc_meta(doc_id)
+            if url is not None:
+                self.add(url, title, None, base.doc_lengths[doc_id])
+                continue
+            # Documento removido no snapshot: mantém o slot vago para os doc IDs continuarem estáveis
+            self.urls.append(None)
+            self.titles.append(None)
+            self.lengths.append(0)
+            self._content_offsets.append(_FROM_BASE)
+            self._content_sizes.append(0)
+            self._contents.append(None)
+
+    def add(self, url: str, title: str, content: str, length: int) -> int:
+        doc_id = len(self.urls)
+        self.urls.append(url)
+        self.titles.append(title)
+        self.lengths.append(length)
+        self._ids[url] = doc_id
+        self.total_length += length
+        self.num_docs += 1
+        self._content_offsets.append(_FROM_BASE)
+        self._content_sizes.append(0)
+        self._contents.append(None)
+        self._store_content(doc_id, content)
+        return doc_id
+
+    def update(self, doc_id: int, title: str, content: str, length: int):
+        self.titles[doc_id] = title
+        self.total_length += length - self.lengths[doc_id]
+        self.lengths[doc_id] = length
+        self._store_content(doc_id, content)
+
+    def remove(self, doc_id: int):
+        del self._ids[self.urls[doc_id]]
+        self.urls[doc_id] = None
+        self.titles[doc_id] = None
+        self.total_length -= self.lengths[doc_id]
+        self.lengths[doc_id] = 0
+        self.num_docs -= 1
+        self._store_content(doc_id, '')
+
+    def id_of(self, url: str) -> int:
+        return self._ids.get(url)
+
+    def content(self, doc_id: int) -> str:
+        if self._content_file is not None:
+            offset = self._content_offsets[doc_id]
+            if offset == _FROM_BASE:
+                return self.base.content(doc_id) if self.base is not None else ''
+            self._content_file.seek(offset)
+            data = self._content_file.read(self._content_sizes[doc_id])
+        else:
+            data = self._contents[doc_id]
+            if data is None:
+                return self.base.content(doc_id) if self.base is not None else ''
+            if isinstance(data, str):
+                return data
+        return (zlib.decompress(data) if self.compress else data).decode('utf-8')
+
+    def page(self, doc_id: int) -> Page:
+        """Monta o Page do documento (None se ele foi removido)."""
+        if self.urls[doc_id] is None:
+            return None
+        return Page(self.urls[doc_id], self.titles[doc_id], self.content(doc_id))
+
+    def _store_content(self, doc_id: int, content: str):
+        if content is None: # Mantém o conteúdo atual (ex.: carregado do snapshot)
+            return
+        if self._content_file is not None:
+            data = content.encode('utf-8')
+            data = zlib.compress(data) if self.compress else data
+            # Arquivo só de acréscimo: a versão antiga do conteúdo fica órfã até o próximo snapshot
+            self._content_file.seek(0, os.SEEK_END)
+            self._content_offsets[doc_id] = self._content_file.tell()
+            self._content_sizes[doc_id] = len(data)
+            self._content_file.write(data)
+        elif self.compress:
+            self._contents[doc_id] = zlib.compress(content.encode('utf-8'))
+        else:
+            self._contents[doc_id] = content
+
+    def close(self):
+        if self._content_file is not None:
+            self._content_file.close()
+
+    def __len__(self):
+        return self.num_docs
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._ids
@@ -0,0 +1,116 @@
+# src/http_client.py
+import json
+import os
+import threading
+from importlib.util import find_spec
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.storage import atomic_write
+
+# O urllib3 só decodifica Brotli quando algum pacote brotli está instalado
+ACCEPT_ENCODING = 'gzip, deflate, br' if find_spec('brotli') or find_spec('brotlicffi') else 'gzip, deflate'
+USER_AGENT = 'BuscadorWebIFPE/1.0'
+
+
+def fetch_cache_path(index_path: str) -> str:
+    """Arquivo do FetchCache que acompanha um snapshot do índice."""
+    return index_path + '.http.json'
+
+
+class FetchCache:
+    """Validadores HTTP (ETag/Last-Modified) e links de cada URL já baixada.
+
+    Num novo crawling, as requisições viram condicionais; se o servidor responder
+    304, a página não é baixada, parseada nem reindexada, e os links guardados
+    aqui mantêm a busca em largura andando.
+    """
+
+    def __init__(self):
+        self.entries = {} # url -> {'etag': ..., 'last_modified': ..., 'links': [...]}
+        self._lock = threading.Lock()
+
+    def validators(self, url: str) -> dict:
+        entry = self.entries.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def links(self, url: str) -> list[str]:
+        entry = self.entries.get(url)
+        return entry['links'] if entry else []
+
+    def remember(self, url: str, etag: str, last_modified: str, links: list[str]):
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self.entries[url] = {'etag': etag, 'last_modified': last_modified, 'links': links}
+
+    def forget(self, url: str):
+        with self._lock:
+            self.entries.pop(url, None)
+
+    def save(self, path: str):
+        with self._lock:
+            data = json.dumps(self.entries, ensure_ascii=False).encode('utf-8')
+        with atomic_write(path) as f:
+            f.write(data)
+
+    @classmethod
+    def load(cls, path: str) -> 'FetchCache':
+        cache = cls()
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                cache.entries = json.loads(f.read().decode('utf-8'))
+        return cache
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class HttpResponse:
+    def __init__(self, url: str, status: int, content: bytes = b'', encoding: str = None,
+                 etag: str = None, last_modified: str = None):
+        self.url = url
+        self.status = status
+        self.content = content
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+class HttpClient:
+    """Cliente HTTP compartilhado pelo crawler: uma Session com pool de conexões keep-alive,
+    compressão gzip/br e requisições condicionais a partir do FetchCache."""
+
+    def __init__(self, per_host: int = 4, max_hosts: int = 32, timeout: float = 5, cache: FetchCache = None):
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING})
+        # pool_block=True: no máximo `per_host` conexões abertas por host; as demais requisições esperam
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=per_host, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url: str) -> HttpResponse:
+        headers = self.cache.validators(url) if self.cache is not None else {}
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return HttpResponse(url, 304)
+
+        response.raise_for_status()
+        return HttpResponse(url, response.status_code, response.content, response.encoding,
+                            response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,137 @@
+# src/indexer.py
+import hashlib
+import math
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """Normaliza uma URL para deduplicação: remove o fragmento, ordena a query,
+    põe esquema e host em minúsculas e descarta a porta padrão do esquema."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if ':' in host: # IPv6 volta entre colchetes
+        host = f'[{host}]'
+
+    try:
+        port = parts.port
+    except ValueError: # Porta inválida: mantém a URL como veio, só sem o fragmento
+        return urlunsplit((scheme, parts.netloc.lower(), parts.path or '/', parts.query, ''))
+
+    netloc = host
+    if parts.username:
+        userinfo = parts.username + (f':{parts.password}' if parts.password else '')
+        netloc = f'{userinfo}@{host}'
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{port}'
+
+    query = '&'.join(sorted(param for param in parts.query.split('&') if param))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+class BloomFilter:
+    """Filtro de Bloom com memória fixa: pode dar falso positivo (com taxa ~error_rate), nunca falso negativo."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing: k posições derivadas de dois hashes de 64 bits
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> bool:
+        """Adiciona o item; devolve True se ele (provavelmente) ainda não estava no filtro."""
+        new = False
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, item: str) -> bool:
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+
+class UrlSeenSet:
+    """Conjunto de URLs já vistas (enfileiradas ou visitadas) com verificação O(1).
+
+    Por padrão usa um `set` exato. Com `bloom_capacity`, usa um filtro de Bloom
+    de memória limitada, adequado para crawls grandes.
+    """
+
+    def __init__(self, bloom_capacity: int = None, error_rate: float = 0.001):
+        if bloom_capacity:
+            self._items = BloomFilter(bloom_capacity, error_rate)
+        else:
+            self._items = set()
+        self.new_urls = None # Com `track_new`: URLs adicionadas desde o último checkpoint, em ordem
+
+    def track_new(self, enabled: bool = True):
+        """Passa a anotar em `new_urls` as URLs adicionadas, para o checkpoint gravá-las aos poucos."""
+        self.new_urls = [] if enabled else None
+
+    @property
+    def is_bloom(self) -> bool:
+        return isinstance(self._items, BloomFilter)
+
+    def add(self, url: str) -> bool:
+        """Registra a URL (já canonicalizada) e devolve True se ela ainda não tinha sido vista."""
+        if self.is_bloom:
+            new = self._items.add(url)
+        else:
+            new = url not in self._items
+            if new:
+                self._items.add(url)
+        if new and self.new_urls is not None:
+            self.new_urls.append(url)
+        return new
+
+    def clear(self):
+        if self.is_bloom:
+            self._items = BloomFilter(self._items.capacity, self._items.error_rate)
+        else:
+            self._items.clear()
+        if self.new_urls is not None:
+            self.new_urls = []
+
+    def to_state(self) -> dict:
+        """Configuração serializável em JSON, sem as URLs: o checkpoint do crawling as grava à parte, só as novas a cada vez."""
+        if self.is_bloom:
+            return {'bloom': {'capacity': self._items.capacity, 'error_rate': self._items.error_rate}}
+        return {}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'UrlSeenSet':
+        """Remonta o conjunto a partir de `to_state()` mais as URLs vistas em `state['urls']` (reinseridas no filtro de Bloom)."""
+        bloom = state.get('bloom')
+        seen = cls(bloom['capacity'], bloom['error_rate']) if bloom is not None else cls()
+        for url in state.get('urls', ()):
+            seen._items.add(url)
+        return seen
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._items
+
+    def __len__(self):
+        return len(self._items)
@@ -1,16 +1,23 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 import webbrowser
+import os
+import queue
 import re
-import requests
-from bs4 import BeautifulSoup
-from collections import deque
+import threading
 
 # --- Importações das suas classes personalizadas ---
 # Certifique-se de que Page está em 'src/page.py' e TrieNode/SearchTrie em 'src/tree.py'.
 # As definições completas dessas classes NÃO DEVEM estar aqui, apenas a importação.
 from src.page import Page
 from src.tree import TrieNode, SearchTrie
+from src.search_engine import SearchEngine
+from src.storage import DEFAULT_INDEX_PATH, load_index, save_index
+from src.checkpoint import CrawlCheckpoint
+from src.crawler import CrawlEngine
+from src.http_client import FetchCache, HttpClient, fetch_cache_path
+from src.pipeline import CrawlPipeline
+from src.tokenizer import tokenize
 
 # --- Estilo e Configurações Globais ---
 PRIMARY_COLOR = '#007ACC'
@@ -36,6 +43,25 @@ CARD_RADIUS = 10
 SHADOW_OFFSET = 5
 SHADOW_COLOR = '#CCCCCC'
 
+# --- Configurações do Crawler ---
+CRAWLER_WORKERS = 8 # Downloads simultâneos
+CRAWLER_PER_HOST = 4 # Máximo de conexões simultâneas por host
+CRAWLER_MAX_FRONTIER = 10000 # Máximo de URLs aguardando na fila
+CRAWLER_POLL_MS = 50 # Intervalo entre verificações de resultados do crawler
+CRAWLER_PARSE_PROCESSES = os.cpu_count() or 1 # Processos de parse/tokenização do HTML
+CRAWLER_QUEUE_SIZE = 100 # Capacidade das filas entre os estágios do pipeline
+CRAWLER_RATE = 2.0 # Requisições por segundo a cada host (o Crawl-delay do robots.txt pode reduzir)
+CRAWLER_MAX_PAGES = 5000 # Orçamento de páginas por crawling
+CRAWLER_MAX_BYTES = 200 * 1024 * 1024 # Orçamento de bytes baixados por crawling
+CRAWLER_CHECKPOINT_SECONDS = 30 # Intervalo entre checkpoints de um crawling em andamento
+CRAWLER_EVENTS_PER_POLL = 200 # Máximo de eventos tratados por verificação, para não travar a interface
+
+SEARCH_MAX_RESULTS = 20 # Quantidade de resultados exibidos (os de maior pontuação BM25)
+SUGGEST_MAX = 8 # Sugestões de autocompletar exibidas abaixo da busca
+SUGGEST_DEBOUNCE_MS = 150 # Espera depois da última tecla antes de buscar sugestões
+
+INDEX_PATH = DEFAULT_INDEX_PATH # Snapshot do índice salvo ao fechar a janela e ao fim de cada crawling
+
 class SearchApp:
     def __init__(self, root):
         self.root = root
@@ -52,12 +78,20 @@ class SearchApp:
 
         self._configure_grid()
 
-        self.trie = SearchTrie()
-        self.visited_urls = set()
+        self.fetch_cache = FetchCache()
+        self.http_client = HttpClient(per_host=CRAWLER_PER_HOST, cache=self.fetch_cache)
+        self.crawl_engine = CrawlEngine(workers=CRAWLER_WORKERS, per_host=CRAWLER_PER_HOST, max_frontier=CRAWLER_MAX_FRONTIER,
+                                        http_client=self.http_client, rate=CRAWLER_RATE,
+                                        max_pages=CRAWLER_MAX_PAGES, max_bytes=CRAWLER_MAX_BYTES)
+        self.crawl_pipeline = None
+        self.crawl_checkpoint = CrawlCheckpoint(INDEX_PATH) # Permite retomar um crawling interrompido
+        self._closing = False # Janela fechada durante um crawling: fecha de vez quando o pipeline terminar
+        self.index_lock = threading.Lock() # O pipeline indexa em segundo plano enquanto a interface busca
         self._create_styles()
         self._create_widgets()
-        self._load_sample_data()
+        self._load_index()
         self._setup_placeholders()
+        self.root.protocol('WM_DELETE_WINDOW', self._on_close)
 
     def _configure_grid(self):
         self.root.columnconfigure(0, weight=1)
@@ -330,6 +364,19 @@ class SearchApp:
         search_btn.grid(row=0, column=1, padx=(5, 0)) 
         self._add_hover_effect(search_btn)
 
+        # Lista de sugestões flutuando logo abaixo da caixa de busca (só aparece quando há sugestões)
+        self.suggestions_listbox = tk.Listbox(card_frame, height=SUGGEST_MAX, font=(FONT_FALLBACK, FONT_SIZE_SMALL),
+                                              bd=1, relief='solid', highlightthickness=0, activestyle='none')
+        self._suggestions = []
+        self._suggest_after_id = None
+        self.search_entry.bind('<KeyRelease>', self._on_search_key)
+        self.search_entry.bind('<Return>', lambda e: self._perform_search())
+        self.search_entry.bind('<Down>', self._focus_suggestions)
+        self.search_entry.bind('<Escape>', lambda e: self._hide_suggestions())
+        self.suggestions_listbox.bind('<ButtonRelease-1>', self._apply_suggestion)
+        self.suggestions_listbox.bind('<Return>', self._apply_suggestion)
+        self.suggestions_listbox.bind('<Escape>', lambda e: (self._hide_suggestions(), self.search_entry.focus_set()))
+
         result_container_frame = ttk.Frame(card_frame, style='Card.TFrame', relief='solid', borderwidth=1) 
         result_container_frame.grid(row=2, column=0, columnspan=2, sticky='nsew', padx=15, pady=(5,15))
         result_container_frame.rowconfigure(0, weight=1)
@@ -440,12 +487,10 @@ class SearchApp:
     def _add_page_to_trie(self, url, title, content):
         """Método auxiliar para adicionar uma página à Trie, seja do cadastro manual ou do crawler."""
         p = Page(url, title, content)
-        words_indexed = 0
-        # Divide o conteúdo por vírgulas ou espaços e pega palavras com 3+ letras
-        for w in [w.lower() for w in re.findall(r'\b\w{3,}\b', re.sub(r'[,;]', ' ', content))]:
-            self.trie.insert(w, p)
-            words_indexed += 1
-        return words_indexed
+        words = tokenize(content)
+        with self.index_lock:
+            self.engine.add_page(p, words)
+        return len(words)
 
     def _add_page(self):
         url = self.url_entry.get().strip()
@@ -475,7 +520,63 @@ class SearchApp:
         self._set_placeholder(self.title_entry, 'Ex: Meu Projeto Incrivel')
         self._set_text_placeholder(self.content_text, 'Ex: python, tkinter, busca, web (separadas por virgula)')
 
+    def _on_search_key(self, event):
+        if event.keysym in ('Return', 'Escape', 'Down', 'Up'):
+            return
+        # Debounce: só consulta as sugestões quando o usuário para de digitar
+        if self._suggest_after_id is not None:
+            self.root.after_cancel(self._suggest_after_id)
+        self._suggest_after_id = self.root.after(SUGGEST_DEBOUNCE_MS, self._update_suggestions)
+
+    def _update_suggestions(self):
+        self._suggest_after_id = None
+        text = self.search_entry.get()
+        words = text.split()
+        if text == 'Digite seu termo de busca aqui...' or not words or text.endswith(' '):
+            self._hide_suggestions()
+            return
+
+        with self.index_lock:
+            self._suggestions = [word for word, _ in self.engine.suggest(words[-1], SUGGEST_MAX)]
+        if not self._suggestions:
+            self._hide_suggestions()
+            return
+
+        self.suggestions_listbox.delete(0, tk.END)
+        for word in self._suggestions:
+            self.suggestions_listbox.insert(tk.END, word)
+        self.suggestions_listbox.config(height=len(self._suggestions))
+        self.suggestions_listbox.place(in_=self.search_entry, x=0, rely=1.0, relwidth=1.0)
+        self.suggestions_listbox.lift()
+
+    def _hide_suggestions(self):
+        if self._suggest_after_id is not None:
+            self.root.after_cancel(self._suggest_after_id)
+            self._suggest_after_id = None
+        self.suggestions_listbox.place_forget()
+
+    def _focus_suggestions(self, event):
+        if self._suggestions and self.suggestions_listbox.winfo_ismapped():
+            self.suggestions_listbox.focus_set()
+            self.suggestions_listbox.selection_clear(0, tk.END)
+            self.suggestions_listbox.selection_set(0)
+            self.suggestions_listbox.activate(0)
+
+    def _apply_suggestion(self, event):
+        selection = self.suggestions_listbox.curselection()
+        if not selection:
+            return
+        # Troca a última palavra digitada pela sugestão escolhida
+        words = self.search_entry.get().split() or ['']
+        words[-1] = self._suggestions[selection[0]]
+        self.search_entry.delete(0, tk.END)
+        self.search_entry.insert(0, ' '.join(words) + ' ')
+        self._hide_suggestions()
+        self.search_entry.focus_set()
+        self.search_entry.icursor(tk.END)
+
     def _perform_search(self):
+        self._hide_suggestions()
         query = self.search_entry.get().strip()
         
         if query == 'Digite seu termo de busca aqui...': query = ''
@@ -485,23 +586,16 @@ class SearchApp:
             messagebox.showwarning('Entrada Invalida', 'Por favor, digite um termo para realizar a busca.')
             return
         
-        found_pages = []
-        search_terms = [w.lower() for w in re.findall(r'\b\w+\b', query)]
-
-        for term in search_terms:
-            results = self.trie.search(term)
-            if results:
-                found_pages.extend(results)
-
-        unique_pages = list(dict.fromkeys(found_pages)) 
+        with self.index_lock:
+            ranked_pages = self.engine.ranked_search(query, k=SEARCH_MAX_RESULTS)
 
-        if not unique_pages:
+        if not ranked_pages:
             self.results_listbox.insert(tk.END, 'Nenhum resultado encontrado para sua busca.')
         else:
             self.results_listbox.insert(tk.END, f"Resultados para '{query}':")
             self.results_listbox.insert(tk.END, "--------------------------")
-            for i, p in enumerate(unique_pages):
-                self.results_listbox.insert(tk.END, f"-> {p.title} ({p.url})")
+            for p, score in ranked_pages:
+                self.results_listbox.insert(tk.END, f"-> [{score:.2f}] {p.title} ({p.url})")
             self.results_listbox.insert(tk.END, "--------------------------")
             self.results_listbox.insert(tk.END, "Dica: Clique duas vezes para abrir o link no navegador.")
 
@@ -532,34 +626,73 @@ class SearchApp:
         print("Mapeamento de Palavras-Chave para Paginas Indexadas")
         print("="*70 + "\n")
         
-        if not self.trie.root.children:
+        vocabulary = self.engine.vocabulary() # Termos da memória e do snapshot em disco, em ordem alfabética
+        if not vocabulary:
             print("A arvore esta vazia. Nenhuma pagina foi indexada ainda.")
             print("\n" + "="*70 + "\n")
             messagebox.showinfo('Arvore Vazia', 'A arvore esta vazia. Adicione algumas paginas primeiro para ver a estrutura no console.')
             return
 
-        q = deque([(self.trie.root, '')]) # Usando deque para BFS
         printed_nodes_count = 0
-        while q:
-            node, path = q.popleft() # Usa popleft para BFS
-            
-            if node.pages:
-                page_details = []
-                for p in node.pages:
-                    # Correção: p já é um objeto Page, então acessamos p.title e p.url diretamente
-                    page_details.append(f"'{p.title}' <{p.url}>")
-                print(f"Palavra: '{path}' -> Paginas: {', '.join(page_details)}")
-                printed_nodes_count += 1
-            
-            for char_key in sorted(node.children.keys()):
-                child_node = node.children[char_key]
-                q.append((child_node, path + char_key))
+        for path in vocabulary:
+            page_details = []
+            for p in self.engine.pages_for(path):
+                page_details.append(f"'{p.title}' <{p.url}>")
+            print(f"Palavra: '{path}' -> Paginas: {', '.join(page_details)}")
+            printed_nodes_count += 1
         
         # Texto sem emojis
         print(f"\nTotal de {printed_nodes_count} nos com conteudo de pagina impressos.")
         print("\n" + "="*70 + "\n")
         messagebox.showinfo('Estrutura da Arvore', 'A estrutura detalhada da Trie foi impressa no console (saida padrao).')
 
+    def _load_index(self):
+        if os.path.exists(INDEX_PATH):
+            try:
+                self.engine = load_index(INDEX_PATH)
+                self.engine.load_vocabulary(background=True) # Sem travar a interface no primeiro autocompletar
+                self.fetch_cache.entries = FetchCache.load(fetch_cache_path(INDEX_PATH)).entries
+                print(f" Indice carregado de '{INDEX_PATH}' ({len(self.engine)} paginas).")
+                self._replay_crawl_journal()
+                return
+            except (OSError, ValueError) as e:
+                print(f" Nao foi possivel carregar o indice salvo ({e}). Usando dados de exemplo.")
+
+        self.engine = SearchEngine()
+        self._load_sample_data()
+        self._replay_crawl_journal()
+
+    def _replay_crawl_journal(self):
+        # Páginas indexadas por um crawling interrompido depois do último snapshot salvo
+        if self.crawl_checkpoint.exists():
+            replayed = self.crawl_checkpoint.replay(self.engine)
+            print(f" {replayed} paginas recuperadas do crawling interrompido.")
+
+    def _save_index(self):
+        try:
+            save_index(self.engine, INDEX_PATH)
+            self.fetch_cache.save(fetch_cache_path(INDEX_PATH))
+        except OSError as e:
+            print(f" Nao foi possivel salvar o indice: {e}")
+            messagebox.showerror('Erro ao Salvar', f'Nao foi possivel salvar o indice em {INDEX_PATH}:\n{e}')
+
+    def _on_close(self):
+        if self.crawl_pipeline is not None and not self._closing:
+            # Sem travar a interface: o pipeline grava o checkpoint final e avisa com 'done' (ver _poll_crawler).
+            # Fechar de novo antes disso fecha na hora; o diário já tem as páginas indexadas.
+            self._closing = True
+            self._update_crawler_log("Encerrando: gravando o checkpoint do crawling...")
+            self.crawl_pipeline.cancel()
+            return
+        self._close_now()
+
+    def _close_now(self):
+        self.crawl_engine.shutdown()
+        self.http_client.close()
+        with self.index_lock:
+            self._save_index()
+        self.root.destroy()
+
     def _load_sample_data(self):
         samples = [
             Page('https://ifpe.edu.br/python-dev', 'Desenvolvimento Python no IFPE', 'python, desenvolvimento, web, ciencia de dados, automacao'),
@@ -570,10 +703,7 @@ class SearchApp:
         
         indexed_pages_count = 0
         for p in samples:
-            keywords = [w.lower() for w in re.findall(r'\b\w{3,}\b', re.sub(r'[,;]', ' ', p.content))]
-            for w in keywords:
-                # Importante: self.trie.insert(w, p) já está adicionando o OBJETO Page 'p'
-                self.trie.insert(w, p)
+            self.engine.add_page(p, tokenize(p.content))
             indexed_pages_count += 1
         
         # Texto sem emojis
@@ -600,6 +730,17 @@ class SearchApp:
         self.root.update_idletasks()
 
     def _start_crawling(self):
+        if self.crawl_pipeline is None and self.crawl_checkpoint.exists():
+            resume = messagebox.askyesnocancel('Crawling Interrompido',
+                                               'Existe um crawling interrompido. Deseja retoma-lo?\n'
+                                               '(Nao descarta o progresso salvo e inicia um novo crawling.)')
+            if resume is None:
+                return
+            if resume:
+                self._run_crawl_pipeline(state=self.crawl_checkpoint.load())
+                return
+            self.crawl_checkpoint.clear()
+
         start_url = self.crawler_url_entry.get().strip()
         depth_str = self.crawler_depth_entry.get().strip()
 
@@ -622,74 +763,70 @@ class SearchApp:
             messagebox.showerror('Profundidade Invalida', 'Por favor, insira um numero inteiro nao negativo para a profundidade.')
             return
 
+        if self.crawl_pipeline is not None:
+            messagebox.showwarning('Crawling em Andamento', 'Aguarde o crawling atual terminar antes de iniciar outro.')
+            return
+
+        self._run_crawl_pipeline(start_url, max_depth)
+
+    def _run_crawl_pipeline(self, start_url=None, max_depth=None, state=None):
         self.crawler_log_text.config(state='normal')
         self.crawler_log_text.delete('1.0', tk.END)
         self.crawler_log_text.config(state='disabled')
         self._update_progress_bar(0, 0)
-        self.visited_urls.clear()
-
-        self._update_crawler_log(f"Iniciando crawling a partir de: {start_url} (Profundidade: {max_depth})")
-        self.root.after(100, lambda: self._simple_web_crawler(start_url, max_depth))
-
-    def _simple_web_crawler(self, start_url, max_depth):
-        queue = deque([(start_url, 0)])
-        
-        pages_processed = 0
-        total_pages_to_process = 1
-
-        while queue:
-            current_url, current_depth = queue.popleft()
-
-            if current_url in self.visited_urls:
-                continue
-
-            self.visited_urls.add(current_url)
-            self._update_crawler_log(f"Processando: {current_url} (Profundidade: {current_depth})")
-            pages_processed += 1
-            self._update_progress_bar(pages_processed, total_pages_to_process)
 
+        self.crawl_pipeline = CrawlPipeline(self.engine, self.crawl_engine, self.index_lock,
+                                            parse_processes=CRAWLER_PARSE_PROCESSES, queue_size=CRAWLER_QUEUE_SIZE,
+                                            checkpoint=self.crawl_checkpoint, checkpoint_interval=CRAWLER_CHECKPOINT_SECONDS)
+        if state is not None:
+            self._update_crawler_log(f"Retomando crawling de {state['netloc']} ({len(state['frontier'])} URLs na fila)")
+            self.crawl_pipeline.resume(state)
+        else:
+            self._update_crawler_log(f"Iniciando crawling a partir de: {start_url} (Profundidade: {max_depth})")
+            self.crawl_pipeline.start(start_url, max_depth)
+        self.root.after(CRAWLER_POLL_MS, self._poll_crawler)
+
+    def _poll_crawler(self):
+        # Única ponte entre as threads do pipeline e a interface: esvazia o canal de eventos na thread do Tk
+        pipeline = self.crawl_pipeline
+        for _ in range(CRAWLER_EVENTS_PER_POLL):
             try:
-                response = requests.get(current_url, timeout=5)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                page_title = soup.title.string if soup.title else 'Titulo Desconhecido'
-                
-                page_content_paragraphs = [p.get_text() for p in soup.find_all('p')]
-                page_content = ' '.join(page_content_paragraphs).strip()
-
-                if page_content:
-                    words_indexed = self._add_page_to_trie(current_url, page_title, page_content)
-                    self._update_crawler_log(f"   > Indexado: '{page_title}' ({words_indexed} palavras)")
+                kind, *payload = pipeline.events.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == 'log':
+                self._update_crawler_log(payload[0])
+            elif kind == 'progress':
+                self._update_progress_bar(*payload)
+            elif kind == 'done':
+                if self._closing:
+                    self.crawl_pipeline = None
+                    self._close_now()
                 else:
-                    self._update_crawler_log(f"   > '{page_title}' nao possui conteudo de paragrafo para indexar.")
-
-                if current_depth < max_depth:
-                    for link in soup.find_all('a', href=True):
-                        href = link.get('href')
-                        full_url = requests.compat.urljoin(current_url, href)
-                        
-                        if re.match(r'^https?:\/\/', full_url) and requests.utils.urlparse(full_url).netloc == requests.utils.urlparse(start_url).netloc:
-                            # CORREÇÃO: A fila deve armazenar tuplas (url, depth), não objetos Page
-                            # Mas a verificação de duplicatas na fila precisa ser precisa
-                            if full_url not in self.visited_urls and all(u[0] != full_url for u in queue): 
-                                queue.append((full_url, current_depth + 1))
-                                total_pages_to_process += 1
-                                self._update_progress_bar(pages_processed, total_pages_to_process)
-
-            except requests.exceptions.RequestException as e:
-                self._update_crawler_log(f"   > Erro ao acessar {current_url}: {e}")
-            except Exception as e:
-                self._update_crawler_log(f"   > Erro inesperado ao processar {current_url}: {e}")
-            
-            self.root.update_idletasks() 
-            self.root.after(50)
-
+                    self._finish_crawling(payload[0])
+                return
+
+        self.root.after(CRAWLER_POLL_MS, self._poll_crawler)
+
+    def _finish_crawling(self, stage_stats):
+        pages_processed = self.crawl_engine.pages_processed
+        if self.crawl_engine.links_dropped:
+            self._update_crawler_log(f"   > {self.crawl_engine.links_dropped} links ignorados (fila cheia).")
+        if self.crawl_engine.frontier.robots_blocked:
+            self._update_crawler_log(f"   > {self.crawl_engine.frontier.robots_blocked} URLs bloqueadas pelo robots.txt.")
+        if self.crawl_engine.frontier.exhausted:
+            self._update_crawler_log("   > Orcamento de paginas/bytes do crawling atingido.")
+        self._update_crawler_log("Vazao por estagio: " + ', '.join(f"{name} {rate:.1f}/s" for name, rate in stage_stats.items()))
         self._update_crawler_log("Crawling concluido!")
         self._update_progress_bar(pages_processed, pages_processed)
+        self.crawl_pipeline = None
+        with self.index_lock:
+            self._save_index()
+        self.crawl_checkpoint.clear() # O índice completo já está salvo
         messagebox.showinfo('Crawling Concluido', f'O crawling terminou. {pages_processed} paginas processadas e indexadas.')
 
 if __name__ == '__main__':
     root = tk.Tk()
     app = SearchApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
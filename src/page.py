@@ -1,5 +1,7 @@
 # src/page.py
 class Page:
+    __slots__ = ('url', 'title', 'content')
+
     def __init__(self, url, title, content):
         self.url = url
         self.title = title
@@ -0,0 +1,38 @@
+# src/parser.py
+# Parse do HTML e tokenização, feitos em processos separados pelo pipeline do crawler.
+# Tudo aqui precisa ser "picklable": funções no nível do módulo e objetos simples.
+from importlib.util import find_spec
+
+from src.tokenizer import term_positions, tokenize
+
+# Backend de parse mais rápido, usado quando estiver instalado
+HTML_PARSER = 'lxml' if find_spec('lxml') is not None else 'html.parser'
+
+
+class ParsedDocument:
+    def __init__(self, url: str, depth: int, title: str, content: str, links: list[str], term_positions: dict):
+        self.url = url
+        self.depth = depth
+        self.title = title
+        self.content = content
+        self.links = links
+        self.term_positions = term_positions # termo -> posições em que aparece na página
+
+    @property
+    def term_freqs(self) -> dict:
+        """termo -> quantidade de ocorrências na página."""
+        return {term: len(positions) for term, positions in self.term_positions.items()}
+
+    def __repr__(self):
+        return f"ParsedDocument(title='{self.title}', url='{self.url}', termos={len(self.term_positions)})"
+
+
+def parse_document(url: str, depth: int, html: bytes, encoding: str = None) -> ParsedDocument:
+    """Extrai título, texto dos parágrafos, links e posições dos termos de uma página HTML."""
+    from bs4 import BeautifulSoup # Importado só quando há HTML para processar (o CLI de busca não precisa dele)
+
+    soup = BeautifulSoup(html, HTML_PARSER, from_encoding=encoding)
+    title = soup.title.string if soup.title and soup.title.string else 'Titulo Desconhecido'
+    content = ' '.join(p.get_text() for p in soup.find_all('p')).strip()
+    links = [link.get('href') for link in soup.find_all('a', href=True)]
+    return ParsedDocument(url, depth, title.strip(), content, links, term_positions(tokenize(content)))
@@ -0,0 +1,240 @@
+# src/pipeline.py
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.checkpoint import CrawlCheckpoint
+from src.crawler import CrawlEngine
+from src.page import Page
+from src.parser import ParsedDocument, parse_document
+from src.search_engine import SearchEngine
+
+_STOP = object() # Sentinela que encerra os workers de um estágio
+
+
+class Stage:
+    """Estágio do pipeline: um pool de threads que consome uma fila limitada e mede a própria vazão."""
+
+    def __init__(self, name: str, handler, workers: int, queue_size: int):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.input = queue.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self._started_at = None
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'{self.name}-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Envia uma sentinela por worker; eles terminam depois de esvaziar a fila."""
+        for _ in self._threads:
+            self.input.put(_STOP)
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def throughput(self) -> float:
+        """Itens processados por segundo desde o início do estágio."""
+        if self._started_at is None:
+            return 0.0
+        elapsed = time.perf_counter() - self._started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def _run(self):
+        while True:
+            item = self.input.get()
+            if item is _STOP:
+                return
+            start = time.perf_counter()
+            try:
+                self.handler(item)
+            finally:
+                with self._lock:
+                    self.processed += 1
+                    self.busy_seconds += time.perf_counter() - start
+
+
+class CrawlPipeline:
+    """Pipeline de crawling em segundo plano: fetch -> parse/tokenize -> index.
+
+    Os estágios são ligados por filas limitadas (backpressure). O parse do HTML
+    e a tokenização, que dependem de CPU, rodam num pool de processos (fora do
+    GIL); o processo principal só junta os resultados no índice. A interface
+    não é chamada daqui: logs e progresso vão para `events`, uma fila que a
+    thread do Tk esvazia com `root.after`.
+    Eventos: ('log', mensagem), ('progress', processadas, total), ('done', estatísticas).
+
+    Com um CrawlCheckpoint, cada página indexada vai para o diário e o estado
+    do crawling é salvo a cada `checkpoint_interval` segundos e no cancelamento;
+    `resume()` continua um crawling interrompido. No cancelamento, as páginas
+    já baixadas terminam de ser processadas antes do checkpoint final, então
+    só os downloads em andamento são refeitos ao retomar.
+    """
+
+    def __init__(self, engine: SearchEngine, crawl_engine: CrawlEngine, index_lock: threading.Lock = None,
+                 parse_processes: int = None, queue_size: int = 100, checkpoint: CrawlCheckpoint = None,
+                 checkpoint_interval: float = 30.0):
+        self.engine = engine
+        self.crawl_engine = crawl_engine
+        self.index_lock = index_lock or threading.Lock() # Protege o índice contra buscas simultâneas na thread da interface
+        self.events = queue.Queue()
+
+        self.parse_processes = parse_processes or os.cpu_count() or 1
+        # Cada thread do estágio mantém um documento em andamento no pool de processos
+        self.parse_stage = Stage('parse', self._parse, self.parse_processes, queue_size)
+        self.index_stage = Stage('index', self._index, 1, queue_size) # Um único escritor no índice
+        self.pages_indexed = 0
+        self._process_pool = None
+
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        crawl_engine.track_seen = checkpoint is not None
+        self._links = queue.Queue() # Links das páginas já processadas (e indexadas), devolvidos ao coordenador da fronteira
+        self._unfinished = {} # url -> profundidade das páginas baixadas cujos links ainda não voltaram
+        self._started_at = None
+        self._coordinator = None
+        self._cancelled = threading.Event()
+
+    def start(self, start_url: str, max_depth: int):
+        self.crawl_engine.start(start_url, max_depth)
+        self._launch()
+
+    def resume(self, state: dict):
+        """Continua o crawling salvo em `state` (lido do checkpoint)."""
+        self.crawl_engine.resume(state)
+        self._launch()
+
+    def _launch(self):
+        self._started_at = time.perf_counter()
+        # 'spawn' evita herdar por fork o estado das threads (e do Tk) do processo principal
+        self._process_pool = ProcessPoolExecutor(max_workers=self.parse_processes,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        for stage in (self.parse_stage, self.index_stage):
+            stage.start()
+        self._coordinator = threading.Thread(target=self._coordinate, name='fetch-coordinator', daemon=True)
+        self._coordinator.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def join(self, timeout: float = None):
+        """Espera o pipeline terminar (ex.: depois de `cancel()`, para o checkpoint final ser gravado)."""
+        if self._coordinator is not None:
+            self._coordinator.join(timeout)
+
+    def stats(self) -> dict:
+        """Vazão (itens/s) de cada estágio."""
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0
+        return {
+            'fetch': self.crawl_engine.pages_processed / elapsed if elapsed > 0 else 0.0,
+            'parse': self.parse_stage.throughput(),
+            'index': self.index_stage.throughput(),
+        }
+
+    def _log(self, message: str):
+        self.events.put(('log', message))
+
+    def _coordinate(self):
+        # Estágio de fetch: o CrawlEngine baixa em paralelo; aqui só se move a fronteira
+        # e os resultados, para que a fronteira seja tocada por uma única thread.
+        last_checkpoint = time.monotonic()
+        while not self._cancelled.is_set():
+            for result in self.crawl_engine.poll():
+                self._unfinished[result.url] = result.depth
+                self.parse_stage.input.put(result) # Bloqueia se o parse estiver atrasado
+            self.events.put(('progress', self.crawl_engine.pages_processed, self.crawl_engine.pages_discovered))
+
+            self._take_links(timeout=0.05)
+
+            if self.crawl_engine.finished and not self._unfinished:
+                break
+            if self.checkpoint is not None and time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                self._save_checkpoint()
+                last_checkpoint = time.monotonic()
+
+        self.crawl_engine.shutdown()
+        for stage in (self.parse_stage, self.index_stage):
+            stage.stop()
+            stage.join()
+        if self._cancelled.is_set() and self.checkpoint is not None:
+            self._take_links() # Links das páginas que terminaram de ser indexadas depois do cancelamento
+            self._save_checkpoint()
+        self._process_pool.shutdown()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+        self.events.put(('done', self.stats()))
+
+    def _take_links(self, timeout: float = None):
+        try:
+            while True:
+                url, depth, links = self._links.get(timeout=timeout) if timeout else self._links.get_nowait()
+                self._unfinished.pop(url, None)
+                self.crawl_engine.add_links(url, depth, links)
+        except queue.Empty:
+            pass
+
+    def _save_checkpoint(self):
+        state = self.crawl_engine.checkpoint_state(self._unfinished.items())
+        try:
+            self.checkpoint.save(state)
+        except OSError as e:
+            self._log(f"   > Nao foi possivel salvar o checkpoint do crawling: {e}")
+            return
+        self.crawl_engine.checkpoint_saved(state)
+
+    def _parse(self, result):
+        links = []
+        handed_to_index = False
+        try:
+            self._log(f"Processando: {result.url} (Profundidade: {result.depth})")
+            if result.error is not None:
+                self._log(f"   > Erro ao acessar {result.url}: {result.error}")
+                return
+            if result.not_modified:
+                links = result.links
+                self._log("   > Nao modificada desde o ultimo crawling (304); reaproveitando o indice.")
+                return
+            parsed = self._process_pool.submit(parse_document, result.url, result.depth, result.content, result.encoding).result()
+            links = parsed.links
+            cache = self.crawl_engine.http_client.cache
+            if cache is not None:
+                cache.remember(result.url, result.etag, result.last_modified, links)
+            if parsed.term_positions:
+                self.index_stage.input.put(parsed) # O indexador devolve os links depois de indexar
+                handed_to_index = True
+            else:
+                self._log(f"   > '{parsed.title}' nao possui conteudo de paragrafo para indexar.")
+        except Exception as e:
+            self._log(f"   > Erro inesperado ao processar {result.url}: {e}")
+        finally:
+            if not handed_to_index:
+                self._links.put((result.url, result.depth, links))
+
+    def _index(self, parsed: ParsedDocument):
+        # Os links só voltam à fronteira depois que a página está no índice (e no diário do checkpoint),
+        # então uma página fora de `_unfinished` nunca se perde numa retomada
+        try:
+            page = Page(parsed.url, parsed.title, parsed.content)
+            term_freqs = parsed.term_freqs
+            with self.index_lock:
+                self.engine.add_document(page, term_freqs, parsed.term_positions)
+            if self.checkpoint is not None:
+                self.checkpoint.record(page, parsed.term_positions)
+            self.pages_indexed += 1
+            self._log(f"   > Indexado: '{page.title}' ({sum(term_freqs.values())} palavras)")
+        except Exception as e:
+            self._log(f"   > Erro inesperado ao indexar {parsed.url}: {e}")
+        finally:
+            self._links.put((parsed.url, parsed.depth, parsed.links))
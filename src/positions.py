@@ -0,0 +1,49 @@
+# src/positions.py
+# Posições dos termos nos documentos, para consultas de frase ("...") e de proximidade (NEAR/k).
+# As posições de um termo num documento são guardadas como deltas em varint (LEB128):
+# a maioria das distâncias entre ocorrências cabe em 1 byte.
+from bisect import bisect_left
+
+
+def encode_positions(positions) -> bytes:
+    """Posições crescentes -> bytes: cada posição vira a diferença para a anterior, em varint."""
+    out = bytearray()
+    previous = 0
+    for position in positions:
+        delta = position - previous
+        previous = position
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode_positions(data) -> list[int]:
+    positions = []
+    position = value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            position += value
+            positions.append(position)
+            value = shift = 0
+    return positions
+
+
+def phrase_matches(position_lists) -> bool:
+    """Os termos aparecem em sequência? `position_lists[i]` são as posições do i-ésimo termo da frase."""
+    first, *rest = position_lists
+    rest = [set(positions) for positions in rest]
+    return any(all(start + offset in positions for offset, positions in enumerate(rest, 1)) for start in first)
+
+
+def near_matches(left: list[int], right: list[int], distance: int) -> bool:
+    """Alguma ocorrência de um termo está a até `distance` posições de uma do outro (em qualquer ordem)?"""
+    for position in left:
+        i = bisect_left(right, position - distance)
+        if i < len(right) and right[i] <= position + distance:
+            return True
+    return False
@@ -0,0 +1,64 @@
+# src/query_cache.py
+import threading
+from collections import OrderedDict
+
+
+class QueryCache:
+    """Cache LRU de resultados de busca, invalidado pela geração do índice.
+
+    Cada inserção ou remoção no SearchEngine incrementa a geração; quando uma
+    consulta chega com uma geração diferente da que o cache conhece, todos os
+    resultados guardados ficam obsoletos e são descartados de uma vez.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # chave -> resultado, do menos para o mais usado recentemente
+        self._lock = threading.Lock()
+
+    def get(self, key, generation: int):
+        with self._lock:
+            if generation != self.generation:
+                self._entries.clear()
+                self.generation = generation
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, generation: int, result):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation != self.generation: # O índice mudou enquanto a consulta rodava
+                return
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,228 @@
+# src/scheduler.py
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from src.http_client import USER_AGENT
+
+
+class TokenBucket:
+    """Limite de taxa: `rate` requisições por segundo, com rajadas de até `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class RobotsCache:
+    """Regras do robots.txt de cada host, baixadas uma vez por crawling.
+
+    Segue o urllib.robotparser: 401/403 bloqueiam o host inteiro, outros erros
+    4xx (ex.: 404) liberam tudo. Falhas de rede e 5xx também liberam, para um
+    robots.txt fora do ar não travar o crawling.
+    """
+
+    def __init__(self, user_agent: str = USER_AGENT):
+        self.user_agent = user_agent
+        self.rules = {} # host -> RobotFileParser (None = sem restrições)
+
+    def load(self, http_client, scheme: str, host: str):
+        parser = None
+        try:
+            response = http_client.session.get(f'{scheme}://{host}/robots.txt', timeout=http_client.timeout)
+            if response.status_code in (401, 403):
+                parser = RobotFileParser()
+                parser.disallow_all = True
+            elif response.status_code < 400:
+                parser = RobotFileParser()
+                parser.parse(response.text.splitlines())
+        except Exception:
+            pass
+        self.rules[host] = parser
+
+    def loaded(self, host: str) -> bool:
+        return host in self.rules
+
+    def allowed(self, url: str) -> bool:
+        parser = self.rules.get(urlparse(url).netloc)
+        return parser is None or parser.can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, host: str) -> float:
+        parser = self.rules.get(host)
+        delay = parser.crawl_delay(self.user_agent) if parser is not None else None
+        return float(delay) if delay else 0.0
+
+    def clear(self):
+        self.rules.clear()
+
+
+class PolitenessScheduler:
+    """Fronteira do crawler com uma fila por host, despachadas em rodízio.
+
+    Cada host tem seu próprio limite de taxa (token bucket, reduzido pelo
+    Crawl-delay do robots.txt) e de downloads simultâneos, então hosts
+    diferentes são baixados em paralelo sem sobrecarregar nenhum deles.
+    URLs proibidas pelo robots.txt são descartadas na hora do despacho, e os
+    orçamentos `max_pages`/`max_bytes` encerram o crawling quando estourados.
+
+    Antes da primeira página de um host, `pop_ready` devolve só uma URL dele e
+    segura o host até a thread que vai baixá-la chamar `check_robots`, que
+    baixa o robots.txt. Com `robots=None` o robots.txt é ignorado, e com
+    `rate=None` não há limite de taxa.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: int = 2, per_host: int = 2, max_pages: int = None, max_bytes: int = None,
+                 robots: RobotsCache = None):
+        self.rate = rate # Requisições por segundo por host (antes do Crawl-delay)
+        self.burst = burst
+        self.per_host = per_host # Downloads simultâneos por host
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.robots = robots
+
+        self.queues = {} # host -> deque de (url, profundidade)
+        self.in_flight = {} # host -> downloads em andamento
+        self.buckets = {} # host -> TokenBucket (None se o host não tem limite de taxa)
+        self.pages_dispatched = 0
+        self.bytes_downloaded = 0
+        self.robots_blocked = 0 # URLs descartadas pelo robots.txt
+        self._hosts = deque() # Rodízio dos hosts com URLs na fila
+        self._robots_pending = set() # Hosts com o robots.txt sendo baixado
+        self._size = 0
+        self._lock = threading.Lock() # in_flight e os contadores também são atualizados pelas threads de download
+
+    def append(self, item: tuple[str, int]):
+        host = urlparse(item[0]).netloc
+        host_queue = self.queues.get(host)
+        if host_queue is None:
+            host_queue = self.queues[host] = deque()
+        if not host_queue:
+            self._hosts.append(host)
+        host_queue.append(item)
+        self._size += 1
+
+    @property
+    def exhausted(self) -> bool:
+        """Algum orçamento (páginas ou bytes) já foi atingido."""
+        return ((self.max_pages is not None and self.pages_dispatched >= self.max_pages)
+                or (self.max_bytes is not None and self.bytes_downloaded >= self.max_bytes))
+
+    def pop_ready(self, now: float = None) -> tuple[str, int]:
+        """Próxima (url, profundidade) que pode ser baixada agora, ou None se todos os hosts precisam esperar."""
+        now = time.monotonic() if now is None else now
+        for _ in range(len(self._hosts)):
+            if self.exhausted:
+                return None
+            host = self._hosts[0]
+            self._hosts.rotate(-1)
+            item = self._pop_from(host, now)
+            if item is not None:
+                return item
+        return None
+
+    def _pop_from(self, host: str, now: float):
+        if host in self._robots_pending:
+            return None
+        with self._lock:
+            if self.in_flight.get(host, 0) >= self.per_host:
+                return None
+
+        host_queue = self.queues[host]
+        if self.robots is None or self.robots.loaded(host):
+            blocked = 0
+            while self.robots is not None and host_queue and not self.robots.allowed(host_queue[0][0]):
+                host_queue.popleft()
+                blocked += 1
+            if blocked:
+                self._size -= blocked
+                with self._lock:
+                    self.robots_blocked += blocked
+            if not host_queue:
+                self._hosts.remove(host)
+                return None
+            if host not in self.buckets:
+                self.buckets[host] = self._make_bucket(host, now)
+            bucket = self.buckets[host]
+            if bucket is not None and not bucket.try_acquire(now):
+                return None
+        else:
+            self._robots_pending.add(host) # Só esta URL sai até o robots.txt chegar
+
+        item = host_queue.popleft()
+        self._size -= 1
+        if not host_queue:
+            self._hosts.remove(host)
+        with self._lock:
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.pages_dispatched += 1
+        return item
+
+    def _make_bucket(self, host: str, now: float) -> TokenBucket:
+        rate, burst = self.rate, self.burst
+        delay = self.robots.crawl_delay(host) if self.robots is not None else 0
+        if delay:
+            rate, burst = min(rate or float('inf'), 1 / delay), 1
+        if rate is None: # Sem limite de taxa
+            return None
+        bucket = TokenBucket(rate, burst)
+        bucket.updated = now
+        if self.robots is not None: # A primeira página (baixada junto com o robots.txt) já gastou a rajada
+            bucket.tokens = 0
+        return bucket
+
+    def check_robots(self, http_client, url: str) -> bool:
+        """Chamado pela thread de download: baixa o robots.txt do host na primeira vez e diz se a URL é permitida."""
+        if self.robots is None:
+            return True
+        parsed = urlparse(url)
+        if not self.robots.loaded(parsed.netloc):
+            self.robots.load(http_client, parsed.scheme, parsed.netloc)
+            self._robots_pending.discard(parsed.netloc)
+        if self.robots.allowed(url):
+            return True
+        with self._lock:
+            self.robots_blocked += 1
+            self.pages_dispatched -= 1 # Despachada antes do robots.txt chegar, mas não será baixada: não gasta o orçamento
+        return False
+
+    def release(self, host: str, num_bytes: int = 0):
+        """Fim de um download: libera a vaga do host e contabiliza o orçamento de bytes."""
+        with self._lock:
+            self.in_flight[host] -= 1
+            self.bytes_downloaded += num_bytes
+
+    def clear(self):
+        self.queues.clear()
+        self.in_flight.clear()
+        self.buckets.clear()
+        if self.robots is not None:
+            self.robots.clear()
+        self.pages_dispatched = 0
+        self.bytes_downloaded = 0
+        self.robots_blocked = 0
+        self._hosts.clear()
+        self._robots_pending.clear()
+        self._size = 0
+
+    def __iter__(self):
+        for host_queue in self.queues.values():
+            yield from host_queue
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
@@ -0,0 +1,673 @@
+# src/search_engine.py
+import heapq
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, islice
+
+from src.doc_store import DocStore
+from src.page import Page
+from src.positions import decode_positions, encode_positions, near_matches, phrase_matches
+from src.query_cache import QueryCache
+from src.tokenizer import QUERY_WORD_PATTERN, fold_accents, query_terms, stem, surface_forms, term_positions
+from src.tree import SearchTrie
+
+# Elementos de uma consulta: frase entre aspas, operador NEAR/k ou palavra
+QUERY_TOKEN_PATTERN = re.compile(r'"(?P<phrase>[^"]*)"|(?P<near>\bNEAR(?:/(?P<distance>\d+))?\b)|\b\w+\b')
+NEAR_DEFAULT_DISTANCE = 5 # NEAR sem /k
+
+
+class PostingList:
+    """Lista de postings de um termo: doc IDs inteiros, ordenados e sem repetição, num array compacto,
+    com a frequência do termo em cada documento num array paralelo.
+
+    As posições do termo em cada documento ficam concatenadas em `positions`
+    (deltas em varint, ver `src.positions`); as do i-ésimo documento ocupam
+    `positions[pos_offsets[i]:pos_offsets[i + 1]]`. Um documento indexado sem
+    posições tem um trecho vazio e não casa com consultas de frase.
+    """
+
+    __slots__ = ('doc_ids', 'freqs', 'positions', 'pos_offsets')
+
+    def __init__(self, doc_ids=(), freqs=None, positions=b'', pos_offsets=None):
+        self.doc_ids = array('I', doc_ids)
+        self.freqs = array('I', freqs if freqs is not None else [1] * len(self.doc_ids))
+        self.positions = bytearray(positions)
+        self.pos_offsets = array('I', pos_offsets if pos_offsets is not None else [0] * (len(self.doc_ids) + 1))
+
+    def add(self, doc_id: int, freq: int = 1, positions: bytes = b''):
+        """Insere o documento (ou troca sua frequência e posições); `positions` já vem codificado."""
+        ids = self.doc_ids
+        offsets = self.pos_offsets
+        if not ids or doc_id > ids[-1]: # Caso comum: doc IDs chegam em ordem crescente
+            ids.append(doc_id)
+            self.freqs.append(freq)
+            self.positions += positions
+            offsets.append(len(self.positions))
+            return
+
+        i = bisect_left(ids, doc_id)
+        start = offsets[i]
+        if i < len(ids) and ids[i] == doc_id:
+            self.freqs[i] = freq
+            end = offsets[i + 1]
+        else:
+            ids.insert(i, doc_id)
+            self.freqs.insert(i, freq)
+            offsets.insert(i + 1, start)
+            end = start
+        self.positions[start:end] = positions
+        self._shift_offsets(i + 1, len(positions) - (end - start))
+
+    def extend(self, doc_ids, freqs, positions):
+        """Acrescenta vários documentos de uma vez (doc IDs crescentes; `positions` já codificadas)."""
+        if self.doc_ids and doc_ids and doc_ids[0] <= self.doc_ids[-1]:
+            for doc_id, freq, encoded in zip(doc_ids, freqs, positions):
+                self.add(doc_id, freq, encoded)
+            return
+        self.doc_ids.extend(doc_ids)
+        self.freqs.extend(freqs)
+        self.pos_offsets.extend(islice(accumulate(map(len, positions), initial=len(self.positions)), 1, None))
+        self.positions += b''.join(positions)
+
+    @classmethod
+    def from_entries(cls, entries) -> 'PostingList':
+        """Lista a partir de (doc ID, frequência, posições codificadas) em ordem crescente de doc ID."""
+        postings = cls()
+        entries = list(entries)
+        if entries:
+            doc_ids, freqs, positions = zip(*entries)
+            postings.extend(doc_ids, freqs, positions)
+        return postings
+
+    def entries(self):
+        """Gera (doc ID, frequência, posições codificadas) em ordem crescente de doc ID."""
+        positions, offsets = self.positions, self.pos_offsets
+        for i, (doc_id, freq) in enumerate(zip(self.doc_ids, self.freqs)):
+            yield doc_id, freq, bytes(positions[offsets[i]:offsets[i + 1]])
+
+    def _shift_offsets(self, first: int, delta: int):
+        if delta:
+            offsets = self.pos_offsets
+            offsets[first:] = array('I', (offset + delta for offset in offsets[first:]))
+
+    @classmethod
+    def view(cls, doc_ids, freqs, positions=b'', pos_offsets=None):
+        """Lista somente-leitura sobre buffers já existentes (ex.: memoryviews de um índice mapeado em memória)."""
+        postings = cls.__new__(cls)
+        postings.doc_ids = doc_ids
+        postings.freqs = freqs
+        postings.positions = positions
+        postings.pos_offsets = pos_offsets if pos_offsets is not None else array('I', bytes(4 * (len(doc_ids) + 1)))
+        return postings
+
+    def copy(self):
+        return PostingList(self.doc_ids, self.freqs, self.positions, self.pos_offsets)
+
+    def remove(self, doc_id: int) -> bool:
+        i = bisect_left(self.doc_ids, doc_id)
+        if i >= len(self.doc_ids) or self.doc_ids[i] != doc_id:
+            return False
+        del self.doc_ids[i]
+        del self.freqs[i]
+        start, end = self.pos_offsets[i], self.pos_offsets[i + 1]
+        del self.positions[start:end]
+        del self.pos_offsets[i + 1]
+        self._shift_offsets(i + 1, start - end)
+        return True
+
+    def freq(self, doc_id: int) -> int:
+        """Frequência do termo no documento (0 se o documento não contém o termo)."""
+        i = bisect_left(self.doc_ids, doc_id)
+        if i < len(self.doc_ids) and self.doc_ids[i] == doc_id:
+            return self.freqs[i]
+        return 0
+
+    def encoded_positions(self, doc_id: int) -> bytes:
+        """Posições do termo no documento, ainda codificadas (vazio se o documento não contém o termo)."""
+        i = bisect_left(self.doc_ids, doc_id)
+        if i < len(self.doc_ids) and self.doc_ids[i] == doc_id:
+            return bytes(self.positions[self.pos_offsets[i]:self.pos_offsets[i + 1]])
+        return b''
+
+    def positions_of(self, doc_id: int) -> list[int]:
+        return decode_positions(self.encoded_positions(doc_id))
+
+    def items(self):
+        return zip(self.doc_ids, self.freqs)
+
+    def __contains__(self, doc_id: int) -> bool:
+        i = bisect_left(self.doc_ids, doc_id)
+        return i < len(self.doc_ids) and self.doc_ids[i] == doc_id
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def __iter__(self):
+        return iter(self.doc_ids)
+
+    def __repr__(self):
+        return f"PostingList({list(self.doc_ids)})"
+
+
+def galloping_search(ids, target: int, lo: int = 0) -> int:
+    """Menor índice i >= lo com ids[i] >= target, usando busca exponencial seguida de binária."""
+    n = len(ids)
+    step = 1
+    hi = lo
+    while hi < n and ids[hi] < target:
+        lo = hi + 1
+        hi += step
+        step *= 2
+    return bisect_left(ids, target, lo, min(hi, n))
+
+
+def intersect_postings(lists) -> array:
+    """Interseção (AND) de listas ordenadas; começa pela menor e galopa nas demais."""
+    lists = sorted(lists, key=len)
+    if not lists:
+        return array('I')
+
+    result = array('I', lists[0])
+    for other in lists[1:]:
+        if not result:
+            break
+        matched = array('I')
+        pos = 0
+        for doc_id in result:
+            pos = galloping_search(other, doc_id, pos)
+            if pos >= len(other):
+                break
+            if other[pos] == doc_id:
+                matched.append(doc_id)
+        result = matched
+    return result
+
+
+def union_postings(lists) -> array:
+    """União (OR) de listas ordenadas, devolvida ordenada e sem repetição."""
+    merged = set()
+    for ids in lists:
+        merged.update(ids)
+    return array('I', sorted(merged))
+
+
+def fuzzy_distance(term: str) -> int:
+    """Quantas edições tolerar num termo: palavras curtas viram outras palavras com poucas trocas."""
+    return 1 if len(term) <= 5 else 2
+
+
+class SearchEngine:
+    """Índice invertido: termo -> PostingList de doc IDs, com ranking BM25.
+
+    A SearchTrie guarda apenas as palavras do vocabulário e é usada para expandir
+    prefixos em termos; as postings só guardam doc IDs inteiros e as páginas
+    ficam no DocStore.
+
+    Um índice carregado do disco (`src.storage.load_index`) fica em `base`:
+    seus termos e postings são lidos direto do arquivo mapeado em memória e só
+    são copiados para `postings` quando alguma página nova os altera.
+
+    Um índice direto (doc_id -> termos) permite reindexar uma página mexendo só
+    nos termos que ela ganhou, perdeu ou cuja frequência mudou, e removê-la.
+    Páginas removidas deixam o doc ID vago (`page(doc_id)` é None).
+
+    Toda inserção ou remoção incrementa `generation`, que invalida o cache de
+    resultados de `ranked_search`.
+
+    Em `ranked_search`, um termo que não existe no vocabulário é trocado pelos
+    termos a até 1-2 edições de distância (busca tolerante a erros de digitação),
+    com peso menor que o de um termo exato.
+
+    As postings guardam também as posições de cada termo, usadas pelas frases
+    ("estrutura de dados") e por `a NEAR/k b`: os candidatos saem da interseção
+    das postings e são conferidos comparando as posições.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, docs: DocStore = None, cache_size: int = 256,
+                 fuzzy_penalty: float = 0.5):
+        self.trie = SearchTrie() # Expansor de prefixos (não guarda páginas)
+        self.postings = {} # termo -> PostingList
+        self.docs = docs if docs is not None else DocStore() # doc_id -> url, título, tamanho e conteúdo
+        self.forward = {} # doc_id -> {termo: frequência}, para páginas indexadas nesta sessão
+        self.k1 = k1 # Parâmetros do BM25
+        self.b = b
+        self.fuzzy_penalty = fuzzy_penalty # Peso de um termo corrigido = fuzzy_penalty ** distância
+        self.base = None # MappedIndex somente-leitura com o snapshot carregado do disco
+        self._base_in_trie = False # O vocabulário do snapshot já está na Trie (para o autocompletar)?
+        self._base_trie = None # Trie do snapshot montada por `load_vocabulary`, ainda não adotada
+        self._vocabulary_loader = None
+        self.generation = 0 # Versão do índice: muda a cada página inserida, reindexada ou removida
+        self.cache = QueryCache(cache_size)
+        self.surface_forms = {} # termo -> forma original (a primeira vista na indexação), para o autocompletar
+
+    def attach_base(self, base):
+        """Usa `base` (MappedIndex) como snapshot somente-leitura sob o índice em memória."""
+        self.base = base
+
+    def add_page(self, page: Page, terms) -> int:
+        """Indexa os termos da página (com suas frequências e posições) e devolve o doc ID atribuído a ela."""
+        positions = term_positions([term.lower() for term in terms])
+        return self.add_document(page, {term: len(p) for term, p in positions.items()}, positions)
+
+    def add_document(self, page: Page, term_freqs: dict, positions: dict = None) -> int:
+        """Indexa uma página cujas frequências de termos já foram calculadas (ex.: pelo parse em outro processo).
+
+        `positions` (termo -> posições) habilita as consultas de frase e NEAR na página.
+        """
+        term_freqs = dict(term_freqs)
+        length = sum(term_freqs.values())
+        encoded = {term: encode_positions(positions.get(term, ())) for term in term_freqs} if positions else {}
+
+        self._record_surface_forms(page.content, term_freqs)
+        doc_id = self.docs.id_of(page.url)
+        if doc_id is None:
+            doc_id = self.docs.add(page.url, page.title, page.content, length)
+            changed = term_freqs.items()
+        else:
+            # Reindexação: só os termos perdidos, ganhos ou com frequência (ou posições) diferente são tocados
+            old_freqs = self.doc_terms(doc_id)
+            for term in old_freqs.keys() - term_freqs.keys():
+                self._remove_posting(term, doc_id)
+            changed = [(term, freq) for term, freq in term_freqs.items()
+                       if old_freqs.get(term) != freq or self.get_postings(term).encoded_positions(doc_id) != encoded.get(term, b'')]
+            self.docs.update(doc_id, page.title, page.content, length)
+
+        for term, freq in changed:
+            postings = self._writable_postings(term)
+            doc_freq = len(postings)
+            postings.add(doc_id, freq, encoded.get(term, b''))
+            if len(postings) != doc_freq:
+                if not doc_freq: # Termo que tinha sido esvaziado (e tirado da Trie) volta ao vocabulário
+                    self.trie.insert(term)
+                self.trie.set_weight(term, len(postings))
+        self.forward[doc_id] = term_freqs
+        self.generation += 1
+        return doc_id
+
+    def add_documents(self, batch) -> list[int]:
+        """Indexação em lote de pares (página, {termo: posições}); devolve os doc IDs, na ordem do lote.
+
+        Os pares (termo, doc ID) de todo o lote são agrupados por termo: cada
+        PostingList recebe seus documentos de uma vez e o vocabulário novo entra
+        na Trie numa só passada, em ordem, compartilhando os prefixos comuns.
+        Páginas já indexadas seguem pelo caminho normal de reindexação (`add_document`).
+        """
+        doc_ids = []
+        groups = {} # termo -> [(doc ID, frequência, posições codificadas)], em ordem crescente de doc ID
+        for page, positions in batch:
+            if self.docs.id_of(page.url) is not None:
+                self._add_groups(groups) # O lote pendente pode conter a versão anterior desta página
+                groups = {}
+                doc_ids.append(self.add_document(page, {term: len(p) for term, p in positions.items()}, positions))
+                continue
+            self._record_surface_forms(page.content, positions)
+            doc_id = self.docs.add(page.url, page.title, page.content, sum(map(len, positions.values())))
+            term_freqs = {}
+            for term, occurrences in positions.items():
+                entry = (doc_id, len(occurrences), encode_positions(occurrences))
+                term_freqs[term] = entry[1]
+                group = groups.get(term)
+                if group is None:
+                    groups[term] = [entry]
+                else:
+                    group.append(entry)
+            self.forward[doc_id] = term_freqs
+            doc_ids.append(doc_id)
+        self._add_groups(groups)
+        self.generation += 1
+        return doc_ids
+
+    def _add_groups(self, groups: dict):
+        if not groups:
+            return
+        weights = []
+        for term in sorted(groups):
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = self._copy_postings(term)
+            postings.extend(*zip(*groups[term]))
+            weights.append((term, len(postings)))
+        self.trie.insert_sorted(weights)
+
+    def remove_page(self, url: str) -> bool:
+        """Remove a página do índice; termos que ficarem sem páginas saem do vocabulário."""
+        doc_id = self.docs.id_of(url)
+        if doc_id is None:
+            return False
+
+        for term in self.doc_terms(doc_id):
+            self._remove_posting(term, doc_id)
+        self.forward.pop(doc_id, None)
+        self.docs.remove(doc_id)
+        self.generation += 1
+        return True
+
+    def page(self, doc_id: int) -> Page:
+        return self.docs.page(doc_id)
+
+    def doc_terms(self, doc_id: int) -> dict:
+        """Índice direto: {termo: frequência} do documento."""
+        term_freqs = self.forward.get(doc_id)
+        if term_freqs is None:
+            term_freqs = {}
+            if self.base is not None and doc_id < self.base.num_docs:
+                for term in self.base.doc_terms(doc_id):
+                    postings = self.get_postings(term)
+                    freq = postings.freq(doc_id) if postings is not None else 0
+                    if freq:
+                        term_freqs[term] = freq
+        return term_freqs
+
+    def _remove_posting(self, term: str, doc_id: int):
+        postings = self._writable_postings(term)
+        postings.remove(doc_id)
+        if postings:
+            self.trie.set_weight(term, len(postings))
+        else:
+            self.trie.delete(term) # Poda os nós vazios da Trie
+            if self.base is None or self.base.get_postings(term) is None:
+                del self.postings[term]
+            # Se o termo existe no snapshot, a lista vazia fica em `postings` para escondê-lo
+
+    def get_postings(self, term: str) -> PostingList:
+        """PostingList do termo (da memória ou do snapshot em disco), ou None se o termo não existe."""
+        postings = self.postings.get(term)
+        if postings is None and self.base is not None:
+            postings = self.base.get_postings(term)
+        return postings
+
+    def _writable_postings(self, term: str) -> PostingList:
+        postings = self.postings.get(term)
+        if postings is None:
+            postings = self.postings[term] = self._copy_postings(term)
+            self.trie.insert(term)
+        return postings
+
+    def _copy_postings(self, term: str) -> PostingList:
+        # Copy-on-write: a lista do snapshot é copiada na primeira alteração
+        base_postings = self.base.get_postings(term) if self.base is not None else None
+        return base_postings.copy() if base_postings is not None else PostingList()
+
+    def expand_prefix(self, prefix: str) -> list[str]:
+        """Termos do vocabulário que começam com `prefix`."""
+        self._adopt_base_trie()
+        words = self.trie.words_with_prefix(prefix)
+        if self.base is not None and not self._base_in_trie:
+            base_words = (term for term in self.base.terms_with_prefix(prefix.lower())
+                          if term not in self.postings or self.postings[term]) # Ignora termos esvaziados desde o snapshot
+            words = sorted(set(words).union(base_words))
+        return words
+
+    def suggest(self, prefix: str, n: int = 10) -> list[tuple[str, int]]:
+        """Autocompletar: até `n` (palavra, frequência nos documentos) que começam com `prefix`, dos mais frequentes aos menos.
+
+        As palavras são mostradas como aparecem no texto ("árvore", "dados"), não como os termos do índice ("arvor", "dado").
+        """
+        return [(self.surface_form(term), doc_freq) for term, doc_freq in self._suggest_terms(prefix, n)]
+
+    def _suggest_terms(self, prefix: str, n: int) -> list[tuple[str, int]]:
+        self._adopt_base_trie()
+        prefix = fold_accents(prefix.lower())
+        # O índice guarda radicais: uma palavra inteira ("dados", "arvore") só casa com o próprio radical ("dado", "arvor")
+        prefixes = {prefix, stem(prefix)}
+        completions = {item for key in prefixes for item in self.trie.top_completions(key, n)}
+        if self.base is not None and not self._base_in_trie:
+            # Trie do snapshot ainda não carregada: os termos do snapshot são lidos direto do arquivo
+            completions.update((term, doc_freq) for key in prefixes for term, doc_freq in self.base.prefix_doc_freqs(key)
+                               if term not in self.postings)
+        return heapq.nsmallest(min(n, self.trie.top_n), completions, key=lambda item: (-item[1], item[0]))
+
+    def surface_form(self, term: str) -> str:
+        """Como o termo aparece no texto: a forma com que ele foi visto pela primeira vez."""
+        form = self.surface_forms.get(term)
+        if form is None and self.base is not None:
+            form = self.base.surface_form(term)
+        return form or term
+
+    def _record_surface_forms(self, content: str, terms):
+        # Só os termos novos custam alguma coisa: o texto é percorrido até achar a forma de todos eles
+        missing = [term for term in terms if term not in self.surface_forms]
+        if self.base is not None:
+            for term in missing:
+                form = self.base.surface_form(term)
+                if form is not None:
+                    self.surface_forms[term] = form
+            missing = [term for term in missing if term not in self.surface_forms]
+        if missing:
+            found = surface_forms(content or '', missing)
+            for term in missing:
+                self.surface_forms[term] = found.get(term, term)
+
+    def fuzzy_expand(self, term: str, max_distance: int = None) -> list[tuple[str, int]]:
+        """Termos do vocabulário a até `max_distance` edições de `term` (padrão: 1 ou 2, conforme o tamanho)."""
+        if max_distance is None:
+            max_distance = fuzzy_distance(term)
+        self._adopt_base_trie()
+        matches = self.trie.fuzzy(term, max_distance)
+        if self.base is not None and not self._base_in_trie:
+            matches += [(word, distance) for word, distance in self.base.fuzzy(term, max_distance) if word not in self.postings]
+            matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+
+    def load_vocabulary(self, background: bool = False):
+        """Monta a Trie com o vocabulário do snapshot, o que deixa o autocompletar O(tamanho do prefixo).
+
+        Com `background`, a Trie é montada numa thread, sem travar quem usa o
+        engine, e adotada na primeira chamada depois de pronta; até lá,
+        `suggest` e `fuzzy_expand` consultam o snapshot direto.
+        """
+        if self.base is None or self._base_in_trie:
+            return
+        if self._vocabulary_loader is None:
+            self._vocabulary_loader = threading.Thread(target=self._build_base_trie, name='vocabulary-loader', daemon=True)
+            self._vocabulary_loader.start()
+        if not background:
+            self._vocabulary_loader.join()
+            self._adopt_base_trie()
+
+    def _build_base_trie(self):
+        # Numa Trie separada: a atual continua recebendo os termos das páginas indexadas enquanto isso
+        trie = SearchTrie(self.trie.top_n)
+        trie.insert_sorted(self.base.iter_doc_freqs())
+        self._base_trie = trie
+
+    def _adopt_base_trie(self):
+        # Na thread de quem usa o engine: aplica à Trie do snapshot os termos alterados nesta sessão e troca as Tries
+        trie = self._base_trie
+        if trie is None or self._base_in_trie:
+            return
+        for term, postings in self.postings.items():
+            if postings:
+                trie.insert(term)
+                trie.set_weight(term, len(postings))
+            else:
+                trie.delete(term)
+        self.trie = trie
+        self._base_trie = None
+        self._base_in_trie = True
+
+    def vocabulary(self) -> list[str]:
+        """Todos os termos do índice, em ordem crescente."""
+        return sorted(self.expand_prefix(''))
+
+    def lookup(self, term: str) -> array:
+        """Doc IDs que contêm exatamente o termo."""
+        postings = self.get_postings(term.lower())
+        return postings.doc_ids if postings is not None else array('I')
+
+    def lookup_prefix(self, prefix: str) -> array:
+        """Doc IDs que contêm algum termo começando com `prefix`."""
+        return union_postings(self.lookup(term) for term in self.expand_prefix(prefix))
+
+    def query(self, terms, operator: str = 'OR', prefix: bool = False) -> array:
+        """Combina os termos com AND ou OR; com `prefix`, cada termo vale como prefixo."""
+        lookup = self.lookup_prefix if prefix else self.lookup
+        lists = [lookup(term) for term in terms]
+        if not lists:
+            return array('I')
+        if operator.upper() == 'AND':
+            return intersect_postings(lists)
+        return union_postings(lists)
+
+    def search(self, query: str, prefix: bool = True) -> list[Page]:
+        """Busca textual: as palavras são combinadas com OR, ou com AND se a consulta contiver 'AND'/'E'.
+
+        Trechos entre aspas valem como frase (termos em sequência) e `a NEAR/k b`
+        exige os dois termos a até k posições um do outro.
+        """
+        clauses, operator = self._parse_query(query)
+        matches = [self._clause_docs(clause, self._clause_words(clause, prefix, False)) for clause in clauses]
+        if not matches:
+            return []
+        doc_ids = intersect_postings(matches) if operator == 'AND' else union_postings(matches)
+        return [self.docs.page(doc_id) for doc_id in doc_ids]
+
+    def ranked_search(self, query: str, k: int = 10, prefix: bool = True, fuzzy: bool = True) -> list[tuple[Page, float]]:
+        """Como `search`, mas devolve só as k páginas de maior pontuação BM25, em ordem decrescente.
+
+        Com `fuzzy`, termos sem nenhuma correspondência são substituídos pelos termos mais próximos.
+        Os termos de frases e de NEAR são sempre exatos (sem prefixo nem correção).
+        """
+        clauses, operator = self._parse_query(query)
+        if not clauses or not self.docs.num_docs:
+            return []
+
+        # Consultas com as mesmas cláusulas e opções compartilham a entrada do cache
+        key = (tuple(sorted(clauses)), operator, k, prefix, fuzzy)
+        generation = self.generation
+        top = self.cache.get(key, generation)
+        if top is None:
+            top = self._rank(clauses, operator, k, prefix, fuzzy)
+            self.cache.put(key, generation, top)
+        return [(self.docs.page(doc_id), score) for doc_id, score in top]
+
+    def _expand_term(self, term: str, prefix: bool, fuzzy: bool) -> list[tuple[str, float]]:
+        """(termo do vocabulário, peso) que representam um termo da consulta."""
+        if prefix:
+            words = self.expand_prefix(term)
+        else:
+            postings = self.get_postings(term)
+            words = [term] if postings else []
+        if words or not fuzzy:
+            return [(word, 1.0) for word in words]
+        return [(word, self.fuzzy_penalty ** distance) for word, distance in self.fuzzy_expand(term)]
+
+    def _clause_words(self, clause: tuple, prefix: bool, fuzzy: bool) -> list[tuple[str, float]]:
+        if clause[0] == 'TERM':
+            return self._expand_term(clause[1], prefix, fuzzy)
+        return [(term, 1.0) for term in clause[1]]
+
+    def _clause_docs(self, clause: tuple, words) -> array:
+        """Doc IDs que satisfazem a cláusula; frases e NEAR são conferidos nas posições de cada candidato."""
+        if clause[0] == 'TERM':
+            return union_postings(self.lookup(word) for word, _ in words)
+
+        terms = clause[1]
+        postings = [self.get_postings(term) for term in terms]
+        if any(p is None for p in postings):
+            return array('I')
+        candidates = intersect_postings([p.doc_ids for p in postings])
+        if clause[0] == 'PHRASE':
+            if len(terms) == 1:
+                return candidates
+            return array('I', [doc_id for doc_id in candidates
+                               if phrase_matches([p.positions_of(doc_id) for p in postings])])
+
+        distances = clause[2]
+        return array('I', [doc_id for doc_id in candidates
+                           if all(near_matches(postings[i].positions_of(doc_id), postings[i + 1].positions_of(doc_id), distance)
+                                  for i, distance in enumerate(distances))])
+
+    def _rank(self, clauses, operator: str, k: int, prefix: bool, fuzzy: bool) -> list[tuple[int, float]]:
+        return self._score(clauses, [self._clause_words(clause, prefix, fuzzy) for clause in clauses], operator, k)
+
+    def _score(self, clauses, expansions, operator: str, k: int, stats: dict = None) -> list[tuple[int, float]]:
+        """Top k (doc_id, pontuação BM25) para as cláusulas já expandidas em (termo, peso).
+
+        `stats` troca as estatísticas locais do BM25 pelas de uma coleção maior
+        ({'num_docs', 'total_length', 'doc_freqs'}), como num índice dividido em shards.
+        """
+        num_docs = stats['num_docs'] if stats else self.docs.num_docs
+        avg_length = (stats['total_length'] if stats else self.docs.total_length) / num_docs if num_docs else 1
+        weights = {} # Um termo que aparece em mais de uma cláusula pontua uma vez só, com o maior peso
+        for words in expansions:
+            for word, weight in words:
+                weights[word] = max(weight, weights.get(word, 0.0))
+
+        scores = {}
+        lengths = self.docs.lengths
+        for word, weight in weights.items():
+            postings = self.get_postings(word)
+            if not postings:
+                continue
+            doc_freq = stats['doc_freqs'][word] if stats else len(postings)
+            idf = weight * self._idf(doc_freq, num_docs)
+            for doc_id, freq in postings.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * self._tf_weight(freq, lengths[doc_id], avg_length)
+
+        if operator == 'AND' or any(clause[0] != 'TERM' for clause in clauses):
+            matches = [self._clause_docs(clause, words) for clause, words in zip(clauses, expansions)]
+            allowed = set(intersect_postings(matches) if operator == 'AND' else union_postings(matches))
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in allowed}
+
+        # Seleção por heap: O(n log k) em vez de ordenar todos os documentos encontrados
+        return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+    @staticmethod
+    def _parse_query(query: str) -> tuple[list[tuple], str]:
+        """Cláusulas da consulta e o operador que as combina.
+
+        Cada cláusula é ('TERM', termo), ('PHRASE', termos) ou ('NEAR', termos, distâncias),
+        onde `distâncias[i]` vale entre `termos[i]` e `termos[i + 1]`.
+        """
+        clauses = []
+        operator = 'OR'
+        near = None # Distância de um NEAR que ainda espera o termo da direita
+        for match in QUERY_TOKEN_PATTERN.finditer(query):
+            if match.group('near'):
+                near = int(match.group('distance') or NEAR_DEFAULT_DISTANCE)
+                continue
+            phrase = match.group('phrase')
+            if phrase is not None:
+                terms = query_terms(QUERY_WORD_PATTERN.findall(phrase))
+                clause = ('PHRASE', tuple(terms)) if terms else None
+            elif match.group() in ('AND', 'E'):
+                operator = 'AND'
+                continue
+            elif match.group() in ('OR', 'OU'):
+                continue
+            else:
+                terms = query_terms([match.group()])
+                clause = ('TERM', terms[0]) if terms else None
+            if clause is None: # Só stopwords
+                continue
+
+            previous = clauses[-1] if clauses else None
+            if near is not None and clause[0] == 'TERM' and previous is not None and previous[0] in ('TERM', 'NEAR'):
+                clauses.pop()
+                if previous[0] == 'TERM':
+                    clause = ('NEAR', (previous[1], clause[1]), (near,))
+                else: # a NEAR b NEAR c
+                    clause = ('NEAR', previous[1] + (clause[1],), previous[2] + (near,))
+            clauses.append(clause)
+            near = None
+        return clauses, operator
+
+    def _idf(self, doc_freq: int, num_docs: int = None) -> float:
+        n = self.docs.num_docs if num_docs is None else num_docs
+        return math.log(1 + (n - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def _tf_weight(self, freq: int, doc_length: int, avg_length: float = None) -> float:
+        if avg_length is None:
+            avg_length = self.docs.total_length / self.docs.num_docs if self.docs.num_docs else 1
+        norm = self.k1 * (1 - self.b + self.b * doc_length / (avg_length or 1))
+        return freq * (self.k1 + 1) / (freq + norm)
+
+    def pages_for(self, term: str) -> list[Page]:
+        return [self.docs.page(doc_id) for doc_id in self.lookup(term)]
+
+    def __len__(self):
+        return self.docs.num_docs
@@ -0,0 +1,428 @@
+# src/segments.py
+import heapq
+import threading
+from array import array
+from itertools import groupby
+
+from src.page import Page
+from src.positions import encode_positions
+from src.query_cache import QueryCache
+from src.search_engine import PostingList, SearchEngine
+
+LIVE_CACHE_SIZE = 1024 # Termos com as postings já filtradas pelas lápides, por segmento
+
+
+def without_deleted(postings: PostingList, deleted) -> PostingList:
+    """A lista sem os documentos que têm lápide em `deleted`."""
+    if postings is None or not deleted or not any(doc_id in deleted for doc_id in postings.doc_ids):
+        return postings
+    return PostingList.from_entries(entry for entry in postings.entries() if entry[0] not in deleted)
+
+
+def merge_postings(lists) -> PostingList:
+    """Junta as listas de segmentos diferentes (cada documento está em uma só) numa lista ordenada."""
+    if len(lists) == 1:
+        return lists[0]
+    lists = sorted(lists, key=lambda postings: postings.doc_ids[0])
+    if any(left.doc_ids[-1] > right.doc_ids[0] for left, right in zip(lists, lists[1:])):
+        # Intervalos intercalados (páginas reindexadas mantêm o doc ID antigo): merge documento a documento
+        return PostingList.from_entries(heapq.merge(*(postings.entries() for postings in lists)))
+
+    # Caso comum: cada segmento tem doc IDs mais novos que o anterior, então basta concatenar os buffers
+    merged = PostingList()
+    for postings in lists:
+        merged.doc_ids.extend(postings.doc_ids)
+        merged.freqs.extend(postings.freqs)
+        start = len(merged.positions)
+        merged.pos_offsets.extend(offset + start for offset in postings.pos_offsets[1:])
+        merged.positions += postings.positions
+    return merged
+
+
+class MemorySegment:
+    """Segmento mutável que recebe as páginas novas; só a thread que indexa escreve nele.
+
+    As PostingLists são alteradas no lugar, então as consultas (de outras
+    threads) recebem uma cópia feita sob o lock, nunca uma lista no meio de uma
+    escrita. O segmento tem no máximo `segment_size` páginas: as cópias são pequenas.
+    """
+
+    def __init__(self):
+        self.postings = {} # termo -> PostingList
+        self.forward = {} # doc_id -> {termo: frequência}
+        self._lock = threading.Lock()
+
+    def add(self, doc_id: int, term_freqs: dict, encoded: dict):
+        with self._lock:
+            for term, freq in term_freqs.items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = PostingList()
+                postings.add(doc_id, freq, encoded.get(term, b''))
+            self.forward[doc_id] = term_freqs
+
+    def remove(self, doc_id: int):
+        with self._lock:
+            for term in self.forward.pop(doc_id):
+                postings = self.postings[term]
+                postings.remove(doc_id)
+                if not postings:
+                    del self.postings[term]
+
+    def get_postings(self, term: str, deleted=None) -> PostingList:
+        with self._lock:
+            postings = self.postings.get(term)
+            return postings.copy() if postings is not None else None
+
+    def doc_terms(self, doc_id: int) -> dict:
+        return self.forward[doc_id]
+
+    def items(self):
+        for term in sorted(self.postings):
+            yield term, self.postings[term]
+
+    def __len__(self):
+        return len(self.forward)
+
+
+class ImmutableSegment:
+    """Base dos segmentos que não mudam depois de criados, a não ser pelas lápides.
+
+    Um documento reindexado ou removido ganha uma lápide em `deleted` e some das
+    postings devolvidas. As lápides só aumentam, então a quantidade delas serve
+    de versão: a lista filtrada de cada termo é montada uma vez por versão e
+    reaproveitada pelas consultas seguintes, em vez de refeita a cada consulta.
+    """
+
+    def __init__(self):
+        self.deleted = set() # Lápides: doc IDs que não valem mais neste segmento
+        self._live = QueryCache(LIVE_CACHE_SIZE) # termo -> postings sem as lápides; "geração" = len(deleted)
+
+    def _without_deleted(self, term: str, postings: PostingList, deleted) -> PostingList:
+        if deleted is not None: # Lápides de um momento específico (merge): sem cache
+            return without_deleted(postings, deleted)
+        version = len(self.deleted)
+        if postings is None or not version:
+            return postings
+        live = self._live.get(term, version)
+        if live is None:
+            live = without_deleted(postings, self.deleted)
+            self._live.put(term, version, live)
+        return live
+
+
+class FrozenSegment(ImmutableSegment):
+    """Segmento imutável: as postings de todos os termos em arrays contíguos, no layout do arquivo do índice.
+
+    Documentos com lápide são descartados de vez quando o segmento entra num merge.
+    """
+
+    def __init__(self, items):
+        """`items`: (termo, PostingList) em ordem crescente de termo."""
+        super().__init__()
+        self.terms = {} # termo -> número do termo
+        self.term_list = []
+        post_offsets = array('Q', [0])
+        doc_ids = array('I')
+        freqs = array('I')
+        pos_starts = array('Q', [0])
+        pos_offsets = array('I') # len(postings) + 1 offsets por termo, relativos ao início do termo
+        positions = bytearray()
+        self.forward = {} # doc_id -> números dos termos do documento
+        for term, postings in items:
+            if not postings:
+                continue
+            number = len(self.term_list)
+            self.terms[term] = number
+            self.term_list.append(term)
+            doc_ids.extend(postings.doc_ids)
+            freqs.extend(postings.freqs)
+            post_offsets.append(len(doc_ids))
+            pos_offsets.extend(postings.pos_offsets)
+            positions += postings.positions
+            pos_starts.append(len(positions))
+            for doc_id in postings.doc_ids:
+                term_numbers = self.forward.get(doc_id)
+                if term_numbers is None:
+                    term_numbers = self.forward[doc_id] = array('I')
+                term_numbers.append(number)
+
+        # Os arrays nunca mais mudam: as postings devolvidas são memoryviews sobre eles, sem cópia
+        self._post_offsets = post_offsets
+        self._pos_starts = pos_starts
+        self._doc_ids = memoryview(doc_ids)
+        self._freqs = memoryview(freqs)
+        self._pos_offsets = memoryview(pos_offsets)
+        self._positions = memoryview(bytes(positions))
+
+    def get_postings(self, term: str, deleted=None) -> PostingList:
+        """Postings do termo, sem os documentos com lápide (ou sem os de `deleted`, se informado)."""
+        number = self.terms.get(term)
+        if number is None:
+            return None
+        start, end = self._post_offsets[number], self._post_offsets[number + 1]
+        postings = PostingList.view(self._doc_ids[start:end], self._freqs[start:end],
+                                    self._positions[self._pos_starts[number]:self._pos_starts[number + 1]],
+                                    self._pos_offsets[start + number:end + number + 1])
+        return self._without_deleted(term, postings, deleted)
+
+    def doc_terms(self, doc_id: int) -> dict:
+        term_freqs = {}
+        for number in self.forward.get(doc_id, ()):
+            term = self.term_list[number]
+            term_freqs[term] = self.get_postings(term, ()).freq(doc_id)
+        return term_freqs
+
+    def __len__(self):
+        return len(self.forward) - len(self.deleted)
+
+
+class SnapshotSegment(ImmutableSegment):
+    """O índice carregado do disco (MappedIndex) como o segmento mais antigo; não entra nos merges.
+
+    Suas lápides só somem quando o índice é salvo de novo; até lá, o cache de
+    listas filtradas evita refazer o filtro a cada consulta.
+    """
+
+    def __init__(self, index):
+        super().__init__()
+        self.index = index
+
+    def get_postings(self, term: str, deleted=None) -> PostingList:
+        return self._without_deleted(term, self.index.get_postings(term), deleted)
+
+    def doc_terms(self, doc_id: int) -> dict:
+        return {term: self.index.get_postings(term).freq(doc_id) for term in self.index.doc_terms(doc_id)}
+
+    def __len__(self):
+        return self.index.num_docs - len(self.deleted)
+
+
+class SegmentedEngine(SearchEngine):
+    """Índice segmentado (no estilo de uma LSM-tree) com a mesma interface do SearchEngine.
+
+    Páginas novas vão para um segmento pequeno em memória; quando ele chega a
+    `segment_size` páginas, é congelado num FrozenSegment imutável. Uma thread
+    em segundo plano junta `merge_factor` segmentos de tamanho parecido num só,
+    descartando os documentos com lápide, então o custo de escrita não cresce
+    com o índice e as consultas não disputam uma estrutura única com o crawler.
+
+    Cada documento vive em um único segmento: reindexar ou remover uma página
+    de um segmento congelado só grava uma lápide. As consultas leem todos os
+    segmentos e juntam as postings de cada termo. O vocabulário (a Trie, com a
+    quantidade de documentos de cada termo como peso) continua único, para o
+    autocompletar e a busca aproximada.
+
+    Como no SearchEngine, as escritas devem vir de uma thread por vez. As
+    consultas podem rodar em outras threads ao mesmo tempo, sem o `index_lock`:
+    os segmentos congelados não mudam, o segmento em memória entrega cópias, a
+    tupla `segments` é trocada inteira e a Trie (alterada no lugar) só é lida
+    ou escrita com o `_trie_lock`.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, docs=None, cache_size: int = 256, fuzzy_penalty: float = 0.5,
+                 segment_size: int = 1000, merge_factor: int = 4, background_merge: bool = True):
+        super().__init__(k1, b, docs, cache_size, fuzzy_penalty)
+        self.segment_size = segment_size
+        self.merge_factor = merge_factor
+        self.background_merge = background_merge
+        self.memory = MemorySegment()
+        self.segments = (self.memory,) # Do mais antigo ao segmento em memória; a tupla é trocada inteira, nunca alterada
+        self.doc_freqs = {} # termo -> quantidade de documentos que o contêm
+        self.merges = 0
+        self._snapshot = None
+        self._home = {} # doc_id -> segmento com as postings atuais do documento (os do snapshot não aparecem aqui)
+        self._lock = threading.Lock() # Troca de segmentos, lápides e `_home`
+        self._trie_lock = threading.Lock() # Trie e `doc_freqs`: o escritor as altera enquanto consultas as percorrem
+        self._merge_lock = threading.Lock() # Um merge por vez
+        self._merge_wanted = threading.Event()
+        self._merge_thread = None
+        self._closed = False
+
+    def attach_base(self, base):
+        """O snapshot vira o segmento mais antigo, e seu vocabulário vai todo para a Trie de uma vez."""
+        self.base = base
+        self._snapshot = SnapshotSegment(base)
+        with self._lock:
+            self.segments = (self._snapshot,) + self.segments
+        for term, doc_freq in base.iter_doc_freqs():
+            if doc_freq:
+                self.doc_freqs[term] = doc_freq
+        with self._trie_lock:
+            self.trie.insert_sorted(self.doc_freqs.items()) # iter_doc_freqs já vem em ordem
+        self._base_in_trie = True
+
+    def add_document(self, page: Page, term_freqs: dict, positions: dict = None) -> int:
+        term_freqs = dict(term_freqs)
+        length = sum(term_freqs.values())
+        encoded = {term: encode_positions(positions.get(term, ())) for term in term_freqs} if positions else {}
+
+        self._record_surface_forms(page.content, term_freqs)
+        doc_id = self.docs.id_of(page.url)
+        if doc_id is None:
+            doc_id = self.docs.add(page.url, page.title, page.content, length)
+        else:
+            self._retire(doc_id)
+            self.docs.update(doc_id, page.title, page.content, length)
+
+        self.memory.add(doc_id, term_freqs, encoded)
+        self._home[doc_id] = self.memory
+        with self._trie_lock:
+            for term in term_freqs:
+                self._change_doc_freq(term, 1)
+        self.generation += 1
+        if len(self.memory) >= self.segment_size:
+            self.flush()
+        return doc_id
+
+    def add_documents(self, batch) -> list[int]:
+        return [self.add_document(page, {term: len(p) for term, p in positions.items()}, positions)
+                for page, positions in batch]
+
+    def remove_page(self, url: str) -> bool:
+        doc_id = self.docs.id_of(url)
+        if doc_id is None:
+            return False
+        self._retire(doc_id)
+        self.docs.remove(doc_id)
+        self.generation += 1
+        return True
+
+    def _retire(self, doc_id: int):
+        # Tira as postings atuais do documento: apagadas no segmento em memória, lápide nos congelados
+        with self._lock:
+            segment = self._home.pop(doc_id, self._snapshot)
+            terms = list(segment.doc_terms(doc_id))
+            if segment is self.memory:
+                self.memory.remove(doc_id)
+            else:
+                segment.deleted.add(doc_id)
+        with self._trie_lock:
+            for term in terms:
+                self._change_doc_freq(term, -1)
+
+    def _change_doc_freq(self, term: str, delta: int):
+        # Chamado com o `_trie_lock`
+        doc_freq = self.doc_freqs.get(term, 0) + delta
+        if doc_freq > 0:
+            if term not in self.doc_freqs:
+                self.trie.insert(term)
+            self.doc_freqs[term] = doc_freq
+            self.trie.set_weight(term, doc_freq)
+        else:
+            self.doc_freqs.pop(term, None)
+            self.trie.delete(term)
+
+    def expand_prefix(self, prefix: str) -> list[str]:
+        with self._trie_lock:
+            return super().expand_prefix(prefix)
+
+    def _suggest_terms(self, prefix: str, n: int) -> list[tuple[str, int]]:
+        with self._trie_lock: # top_completions também grava na Trie o top-n que recalcula
+            return super()._suggest_terms(prefix, n)
+
+    def fuzzy_expand(self, term: str, max_distance: int = None) -> list[tuple[str, int]]:
+        with self._trie_lock:
+            return super().fuzzy_expand(term, max_distance)
+
+    def doc_terms(self, doc_id: int) -> dict:
+        segment = self._home.get(doc_id, self._snapshot)
+        return dict(segment.doc_terms(doc_id)) if segment is not None else {}
+
+    def get_postings(self, term: str) -> PostingList:
+        lists = [postings for postings in (segment.get_postings(term) for segment in self.segments) if postings]
+        return merge_postings(lists) if lists else None
+
+    def flush(self):
+        """Congela o segmento em memória (feito sozinho quando ele chega a `segment_size` páginas)."""
+        memory = self.memory
+        if not len(memory):
+            return
+        frozen = FrozenSegment(memory.items())
+        with self._lock:
+            self.memory = MemorySegment()
+            self.segments = self.segments[:-1] + (frozen, self.memory)
+            for doc_id in memory.forward:
+                self._home[doc_id] = frozen
+        self._request_merge()
+
+    def _request_merge(self):
+        if not self.background_merge:
+            self.merge_now()
+            return
+        if self._merge_thread is None:
+            self._merge_thread = threading.Thread(target=self._merge_loop, name='segment-merge', daemon=True)
+            self._merge_thread.start()
+        self._merge_wanted.set()
+
+    def _merge_loop(self):
+        while True:
+            self._merge_wanted.wait()
+            self._merge_wanted.clear()
+            if self._closed:
+                return
+            self.merge_now()
+
+    def merge_now(self):
+        """Faz agora todos os merges pendentes (a thread de merge faz o mesmo em segundo plano)."""
+        with self._merge_lock:
+            while not self._closed:
+                group = self._pick_merge()
+                if group is None:
+                    return
+                self._merge(group)
+
+    def _pick_merge(self) -> list[FrozenSegment]:
+        # Camadas por tamanho: até segment_size, até segment_size * merge_factor, ...
+        tiers = {}
+        for segment in self.segments:
+            if not isinstance(segment, FrozenSegment):
+                continue
+            if 2 * len(segment.deleted) >= len(segment.forward): # Metade ou mais são lápides: regrava sozinho
+                return [segment]
+            tier, limit = 0, self.segment_size
+            while len(segment) > limit:
+                tier += 1
+                limit *= self.merge_factor
+            tiers.setdefault(tier, []).append(segment)
+        for tier in sorted(tiers):
+            if len(tiers[tier]) >= self.merge_factor:
+                return tiers[tier][:self.merge_factor]
+        return None
+
+    def _merge(self, group: list[FrozenSegment]):
+        with self._lock:
+            deleted = [set(segment.deleted) for segment in group]
+
+        def items():
+            for term, _ in groupby(heapq.merge(*(segment.term_list for segment in group))):
+                lists = [postings for postings in (segment.get_postings(term, dead) for segment, dead in zip(group, deleted))
+                         if postings]
+                if lists:
+                    yield term, merge_postings(lists)
+
+        merged = FrozenSegment(items()) # Fora do lock: consultas e escritas continuam enquanto o merge roda
+        with self._lock:
+            # Lápides gravadas durante o merge passam para o segmento novo
+            for segment, dead in zip(group, deleted):
+                merged.deleted.update(segment.deleted - dead)
+            for doc_id in merged.forward:
+                if any(self._home.get(doc_id) is segment for segment in group):
+                    self._home[doc_id] = merged
+            kept = [segment for segment in self.segments if not any(segment is old for old in group)]
+            if merged.forward:
+                kept.insert(len(kept) - 1, merged) # Antes do segmento em memória
+            self.segments = tuple(kept)
+            self.merges += 1
+
+    def segment_sizes(self) -> list[int]:
+        """Documentos vivos em cada segmento, do mais antigo ao em memória."""
+        return [len(segment) for segment in self.segments]
+
+    def close(self):
+        """Para a thread de merge."""
+        self._closed = True
+        self._merge_wanted.set()
+        if self._merge_thread is not None:
+            self._merge_thread.join()
+            self._merge_thread = None
@@ -0,0 +1,301 @@
+# src/server.py
+"""Servidor HTTP/JSON de buscas (asyncio, só biblioteca padrão).
+
+    GET /search?q=estrutura+de+dados&page=1&size=10[&prefix=0][&fuzzy=0]
+    GET /suggest?q=estr[&n=10]
+    GET /stats
+
+O índice servido é um snapshot somente-leitura carregado do arquivo. Quando o
+arquivo muda (um `crawl` ou `index` em outro processo salvou uma versão nova),
+o snapshot novo é carregado em segundo plano e publicado trocando uma única
+referência: cada requisição pega a versão atual no início e a usa até o fim,
+então as buscas nunca esperam por um lock nem pela indexação.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from src import api
+from src.search_engine import SearchEngine
+from src.storage import DEFAULT_INDEX_PATH, load_index
+
+MAX_PAGE_SIZE = 100
+MAX_RESULTS = 1000 # Páginas só vão até aqui: cada página pede o top (página * tamanho) ao ranking
+MAX_SUGGESTIONS = 50
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class IndexVersion:
+    """Um snapshot publicado: o engine (nunca alterado depois de publicado) e suas estatísticas."""
+
+    def __init__(self, engine: SearchEngine, signature, stats: dict):
+        self.engine = engine
+        self.signature = signature # (inode, tamanho, mtime) do arquivo carregado
+        self.stats = stats
+        self.loaded_at = time.time()
+
+
+def _file_signature(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def load_version(index_path: str) -> IndexVersion:
+    """Carrega o snapshot e o aquece antes da publicação (Trie completa, cache de sugestões da raiz).
+
+    O aquecimento tira as escritas preguiçosas do caminho das buscas: publicado,
+    o engine só é lido, por quantas threads for preciso.
+    """
+    signature = _file_signature(index_path)
+    engine = load_index(index_path) if signature is not None else SearchEngine()
+    engine.load_vocabulary()
+    engine.suggest('', 1)
+    return IndexVersion(engine, signature, api.index_stats(engine))
+
+
+def _int_param(params: dict, name: str, default: int, low: int, high: int) -> int:
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[0])
+    except ValueError:
+        raise HttpError(400, f"Parametro '{name}' deve ser inteiro") from None
+    if not low <= value <= high:
+        raise HttpError(400, f"Parametro '{name}' deve estar entre {low} e {high}")
+    return value
+
+
+def _flag_param(params: dict, name: str, default: bool) -> bool:
+    values = params.get(name)
+    return values[0].lower() not in ('0', 'false', 'nao', 'no') if values else default
+
+
+class SearchServer:
+    """Servidor de buscas sobre o índice salvo em `index_path`.
+
+    As buscas rodam num pool de `max_concurrent` threads, para o laço de
+    eventos continuar aceitando conexões. Requisições além disso esperam numa
+    fila de até `max_pending`; com a fila cheia, a resposta é 503 com
+    Retry-After, em vez de a latência de todo mundo crescer sem limite.
+
+    A cada `reload_interval` segundos o arquivo do índice é conferido e, se
+    mudou, recarregado (ver o docstring do módulo).
+    """
+
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH, host: str = '127.0.0.1', port: int = 8080,
+                 max_concurrent: int = 8, max_pending: int = 64, reload_interval: float = 2.0,
+                 idle_timeout: float = 30.0):
+        self.index_path = index_path
+        self.host = host
+        self.port = port
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self.reload_interval = reload_interval
+        self.idle_timeout = idle_timeout
+        self.version = None # IndexVersion publicada; trocada inteira, nunca alterada
+        self.requests = 0
+        self.rejected = 0
+        self.errors = 0
+        self.reloads = 0
+        self._in_flight = 0 # Buscas executando ou esperando uma thread
+        self._slots = None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='search')
+        self._server = None
+        self._watcher = None
+
+    def reload(self) -> bool:
+        """Publica o snapshot do arquivo, se ele mudou desde o último carregamento."""
+        current = self.version
+        if current is not None and _file_signature(self.index_path) == current.signature:
+            return False
+        self.version = load_version(self.index_path)
+        if current is not None:
+            self.reloads += 1
+        return True
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        await loop.run_in_executor(None, self.reload)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1] # Com port=0, a porta escolhida pelo sistema
+        self._watcher = asyncio.create_task(self._watch_index())
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._executor.shutdown(wait=False)
+
+    async def _watch_index(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await loop.run_in_executor(None, self.reload)
+            except Exception as e: # Arquivo pela metade ou corrompido: segue com a versão atual
+                print(f"Falha ao recarregar '{self.index_path}': {type(e).__name__}: {e}", file=sys.stderr)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                    if not request_line:
+                        break
+                    method, target, version = request_line.decode('latin-1').split()
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get('content-length') or 0)
+                    if length < 0:
+                        raise ValueError(f"Content-Length negativo: {length}")
+                except (asyncio.TimeoutError, ConnectionError):
+                    break
+                except ValueError: # Linha malformada, maior que o limite do StreamReader ou Content-Length inválido
+                    await self._respond(writer, 400, {'error': 'Requisicao invalida'}, keep_alive=False)
+                    break
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                if length:
+                    await reader.readexactly(length) # Descarta o corpo: só há rotas GET
+
+                self.requests += 1
+                status, body, extra = await self._dispatch(method, target)
+                await self._respond(writer, status, body, keep_alive, extra)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, target: str) -> tuple[int, dict, dict]:
+        url = urlsplit(target)
+        routes = {'/search': self._search, '/suggest': self._suggest, '/stats': self._stats}
+        route = routes.get(url.path)
+        if route is None:
+            return 404, {'error': f"Rota desconhecida: {url.path}"}, {}
+        if method != 'GET':
+            return 405, {'error': 'Use GET'}, {'Allow': 'GET'}
+        if self._in_flight >= self.max_concurrent + self.max_pending:
+            self.rejected += 1
+            return 503, {'error': 'Servidor ocupado'}, {'Retry-After': '1'}
+
+        self._in_flight += 1
+        try:
+            async with self._slots:
+                return 200, await route(parse_qs(url.query)), {}
+        except HttpError as e:
+            return e.status, {'error': str(e)}, {}
+        except Exception as e:
+            self.errors += 1
+            print(f"Erro em {target}: {type(e).__name__}: {e}", file=sys.stderr)
+            return 500, {'error': 'Erro interno'}, {}
+        finally:
+            self._in_flight -= 1
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def _search(self, params: dict) -> dict:
+        query = (params.get('q') or [''])[0].strip()
+        if not query:
+            raise HttpError(400, "Parametro 'q' obrigatorio")
+        page = _int_param(params, 'page', 1, 1, MAX_RESULTS)
+        size = _int_param(params, 'size', 10, 1, MAX_PAGE_SIZE)
+        prefix, fuzzy = _flag_param(params, 'prefix', True), _flag_param(params, 'fuzzy', True)
+        first = (page - 1) * size
+        if first + size > MAX_RESULTS:
+            raise HttpError(400, f"Paginas vao ate o resultado {MAX_RESULTS}")
+
+        version = self.version
+        start = time.perf_counter()
+        # Um resultado a mais que a página revela se existe a próxima sem contar todos os documentos
+        ranked = await self._run(version.engine.ranked_search, query, first + size + 1, prefix, fuzzy)
+        return {
+            'query': query,
+            'page': page,
+            'size': size,
+            'has_more': len(ranked) > first + size,
+            'results': [{'url': p.url, 'title': p.title, 'score': round(score, 6)} for p, score in ranked[first:first + size]],
+            'took_ms': round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    async def _suggest(self, params: dict) -> dict:
+        prefix = (params.get('q') or [''])[0].strip()
+        n = _int_param(params, 'n', 10, 1, MAX_SUGGESTIONS)
+        suggestions = await self._run(self.version.engine.suggest, prefix, n)
+        return {'prefix': prefix, 'suggestions': [{'term': term, 'doc_freq': doc_freq} for term, doc_freq in suggestions]}
+
+    async def _stats(self, params: dict) -> dict:
+        version = self.version
+        return {
+            'index': version.stats,
+            'loaded_at': version.loaded_at,
+            'reloads': self.reloads,
+            'cache': version.engine.cache.stats(),
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'in_flight': self._in_flight,
+            'max_concurrent': self.max_concurrent,
+        }
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, body: dict, keep_alive: bool, extra: dict = None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        lines = [f'HTTP/1.1 {status} {_REASONS[status]}',
+                 'Content-Type: application/json; charset=utf-8',
+                 f'Content-Length: {len(data)}',
+                 'Connection: ' + ('keep-alive' if keep_alive else 'close')]
+        lines.extend(f'{name}: {value}' for name, value in (extra or {}).items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+
+
+def serve(index_path: str = DEFAULT_INDEX_PATH, host: str = '127.0.0.1', port: int = 8080, on_ready=None, **options):
+    """Roda o servidor até Ctrl+C. `on_ready(server)` é chamado quando ele já aceita conexões."""
+    async def main():
+        server = SearchServer(index_path, host, port, **options)
+        await server.start()
+        if on_ready is not None:
+            on_ready(server)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,288 @@
+# src/shards.py
+import heapq
+import json
+import multiprocessing
+import os
+import threading
+import zlib
+
+from src.page import Page
+from src.query_cache import QueryCache
+from src.search_engine import SearchEngine
+from src.storage import atomic_write
+from src.tokenizer import term_positions
+
+
+def shard_of(url: str, num_shards: int) -> int:
+    """Shard dono da página. Estável entre execuções (o hash() do Python muda a cada processo)."""
+    return zlib.crc32(url.encode('utf-8')) % num_shards
+
+
+def shard_path(index_path: str, shard: int) -> str:
+    return f'{index_path}.shard{shard}'
+
+
+def manifest_path(index_path: str) -> str:
+    return index_path + '.shards'
+
+
+def saved_num_shards(index_path: str) -> int:
+    """Número de shards com que o índice em `index_path` foi salvo (0 se ele não foi salvo em shards)."""
+    try:
+        with open(manifest_path(index_path), 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))['num_shards']
+    except FileNotFoundError:
+        return 0
+
+
+def _plan(engine, clauses: list, prefix: bool, fuzzy: bool) -> dict:
+    # Primeira fase da busca: o que as cláusulas viram neste shard e as estatísticas locais para o BM25
+    words = [[word for word, _ in engine._clause_words(clause, prefix, False)] for clause in clauses]
+    corrections = [engine.fuzzy_expand(clause[1]) if fuzzy and clause[0] == 'TERM' and not clause_words else []
+                   for clause, clause_words in zip(clauses, words)]
+    doc_freqs = {}
+    for word in {word for clause_words in words for word in clause_words} | {word for found in corrections for word, _ in found}:
+        postings = engine.get_postings(word)
+        if postings:
+            doc_freqs[word] = len(postings)
+    return {'words': words, 'corrections': corrections, 'doc_freqs': doc_freqs,
+            'num_docs': engine.docs.num_docs, 'total_length': engine.docs.total_length}
+
+
+def _shard_main(connection, index_path: str):
+    """Processo de um shard: recebe (comando, *argumentos) pelo pipe e responde ('ok', resultado) ou ('error', mensagem)."""
+    from src import api
+    from src.storage import load_index, save_index
+
+    engine = load_index(index_path) if index_path and os.path.exists(index_path) else SearchEngine()
+    engine.load_vocabulary(background=True) # Autocompletar e correções sem copiar o vocabulário na primeira consulta
+    commands = {
+        'add_documents': engine.add_documents,
+        'remove_page': engine.remove_page,
+        'page': engine.page,
+        'plan': lambda clauses, prefix, fuzzy: _plan(engine, clauses, prefix, fuzzy),
+        'search': lambda clauses, operator, expansions, k, stats: [
+            (engine.page(doc_id), score) for doc_id, score in engine._score(clauses, expansions, operator, k, stats)],
+        'suggest_terms': engine._suggest_terms,
+        'surface_forms': lambda words: {word: engine.surface_form(word) for word in words},
+        'doc_freqs': lambda words: {word: len(engine.get_postings(word) or ()) for word in words},
+        'vocabulary': engine.vocabulary,
+        'num_docs': lambda: engine.docs.num_docs,
+        'stats': lambda: api.index_stats(engine),
+        'save': lambda path: save_index(engine, path),
+    }
+    while True:
+        try:
+            command, *args = connection.recv()
+        except EOFError: # Coordenador encerrado
+            return
+        if command == 'close':
+            connection.send(('ok', None))
+            return
+        try:
+            connection.send(('ok', commands[command](*args)))
+        except Exception as e:
+            connection.send(('error', f'{type(e).__name__}: {e}'))
+
+
+class ShardedEngine:
+    """Índice dividido em `num_shards` processos, cada um dono de um SearchEngine com parte das páginas.
+
+    As páginas são distribuídas pelo hash da URL. Uma busca é feita em duas
+    rodadas pelos pipes, com todos os shards trabalhando em paralelo:
+    1. cada shard diz em que termos a consulta se expande (prefixos e
+       correções) e quantos documentos locais contêm cada um;
+    2. o coordenador soma essas contagens e o tamanho da coleção e manda as
+       estatísticas globais de volta; cada shard pontua seus documentos com
+       elas e devolve seu top-k, e o coordenador junta os k melhores.
+    Com as estatísticas globais, as pontuações são as mesmas de um índice único.
+
+    Os índices de cada shard são salvos em arquivos próprios (`shard_path`), e
+    o número de shards num manifesto (`manifest_path`): como ele decide o dono
+    de cada URL, um índice salvo só pode ser aberto com o mesmo número.
+    Os doc IDs são globais: `doc_id_local * num_shards + shard`.
+    """
+
+    def __init__(self, num_shards: int = None, index_path: str = None, cache_size: int = 256, fuzzy_penalty: float = 0.5):
+        saved = saved_num_shards(index_path) if index_path else 0
+        if saved and num_shards and num_shards != saved:
+            raise ValueError(f"O indice '{index_path}' foi salvo com {saved} shards, nao {num_shards}")
+        if not saved and index_path and os.path.exists(index_path):
+            raise ValueError(f"O indice '{index_path}' nao foi salvo em shards")
+        self.num_shards = num_shards or saved or os.cpu_count() or 1
+        self.fuzzy_penalty = fuzzy_penalty
+        self.generation = 0
+        self.cache = QueryCache(cache_size)
+        self._lock = threading.Lock() # Uma conversa de cada vez com os shards
+        self._connections = []
+        self._processes = []
+        context = multiprocessing.get_context('spawn') # Mesmo motivo do pipeline: não herdar threads por fork
+        for shard in range(self.num_shards):
+            parent, child = context.Pipe()
+            process = context.Process(target=_shard_main, name=f'shard-{shard}', daemon=True,
+                                      args=(child, shard_path(index_path, shard) if index_path else None))
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def _scatter(self, requests: dict) -> dict:
+        """Envia {shard: (comando, *argumentos)} a todos antes de esperar a primeira resposta."""
+        with self._lock:
+            for shard, request in requests.items():
+                self._connections[shard].send(request)
+            replies = {shard: self._connections[shard].recv() for shard in requests}
+        for status, result in replies.values():
+            if status == 'error':
+                raise RuntimeError(f"Erro num shard: {result}")
+        return {shard: result for shard, (_, result) in replies.items()}
+
+    def _broadcast(self, *request) -> list:
+        replies = self._scatter({shard: request for shard in range(self.num_shards)})
+        return [replies[shard] for shard in range(self.num_shards)]
+
+    def add_page(self, page: Page, terms) -> int:
+        return self.add_documents([(page, term_positions([term.lower() for term in terms]))])[0]
+
+    def add_document(self, page: Page, term_freqs: dict, positions: dict = None) -> int:
+        """Como no SearchEngine; páginas sem posições não podem ser distribuídas (use add_documents)."""
+        if positions is None:
+            raise ValueError("ShardedEngine precisa das posicoes dos termos")
+        return self.add_documents([(page, positions)])[0]
+
+    def add_documents(self, batch) -> list[int]:
+        """Indexa um lote de (página, {termo: posições}); cada shard indexa sua parte em paralelo.
+
+        Devolve os doc IDs (globais), na ordem do lote, como o SearchEngine.
+        """
+        parts = {}
+        shards = []
+        for page, positions in batch:
+            shard = shard_of(page.url, self.num_shards)
+            parts.setdefault(shard, []).append((page, positions))
+            shards.append(shard)
+        local_ids = {shard: iter(doc_ids)
+                     for shard, doc_ids in self._scatter({shard: ('add_documents', part) for shard, part in parts.items()}).items()}
+        self.generation += 1
+        return [next(local_ids[shard]) * self.num_shards + shard for shard in shards]
+
+    def remove_page(self, url: str) -> bool:
+        shard = shard_of(url, self.num_shards)
+        removed = self._scatter({shard: ('remove_page', url)})[shard]
+        self.generation += 1
+        return removed
+
+    def page(self, doc_id: int) -> Page:
+        shard = doc_id % self.num_shards
+        return self._scatter({shard: ('page', doc_id // self.num_shards)})[shard]
+
+    def ranked_search(self, query: str, k: int = 10, prefix: bool = True, fuzzy: bool = True) -> list[tuple[Page, float]]:
+        clauses, operator = SearchEngine._parse_query(query)
+        if not clauses:
+            return []
+        # Como no SearchEngine: consultas com as mesmas cláusulas e opções compartilham a entrada do cache
+        key = (tuple(sorted(clauses)), operator, k, prefix, fuzzy)
+        generation = self.generation
+        results = self.cache.get(key, generation)
+        if results is None:
+            results = self._search(clauses, operator, k, prefix, fuzzy)
+            self.cache.put(key, generation, results)
+        return results
+
+    def _search(self, clauses: list, operator: str, k: int, prefix: bool, fuzzy: bool) -> list[tuple[Page, float]]:
+        plans = self._broadcast('plan', clauses, prefix, fuzzy)
+        stats = {'num_docs': sum(plan['num_docs'] for plan in plans),
+                 'total_length': sum(plan['total_length'] for plan in plans), 'doc_freqs': {}}
+        if not stats['num_docs']:
+            return []
+        for plan in plans:
+            for word, doc_freq in plan['doc_freqs'].items():
+                stats['doc_freqs'][word] = stats['doc_freqs'].get(word, 0) + doc_freq
+
+        # Expansão global: um termo só é corrigido se nenhum shard tem correspondência exata
+        expansions = []
+        for i, clause in enumerate(clauses):
+            words = sorted({word for plan in plans for word in plan['words'][i]})
+            if words or clause[0] != 'TERM' or not fuzzy:
+                expansions.append([(word, 1.0) for word in words])
+                continue
+            distances = {}
+            for plan in plans:
+                for word, distance in plan['corrections'][i]:
+                    distances[word] = min(distance, distances.get(word, distance))
+            expansions.append([(word, self.fuzzy_penalty ** distance) for word, distance in sorted(distances.items())])
+
+        tops = self._broadcast('search', clauses, operator, expansions, k, stats)
+        return heapq.nlargest(k, (result for top in tops for result in top), key=lambda result: result[1])
+
+    def search(self, query: str, prefix: bool = True) -> list[Page]:
+        return [page for page, _ in self.ranked_search(query, k=len(self), prefix=prefix, fuzzy=False)]
+
+    def suggest(self, prefix: str, n: int = 10) -> list[tuple[str, int]]:
+        """Autocompletar com as frequências somadas de todos os shards (candidatos: o top-n de cada shard).
+
+        A forma original de cada termo vem do shard em que ele está em mais documentos.
+        """
+        candidates = {word for top in self._broadcast('suggest_terms', prefix, n) for word, _ in top}
+        doc_freqs, owners = {}, {}
+        for shard, counts in enumerate(self._broadcast('doc_freqs', sorted(candidates))):
+            for word, doc_freq in counts.items():
+                doc_freqs[word] = doc_freqs.get(word, 0) + doc_freq
+                if doc_freq > owners.get(word, (0, None))[0]:
+                    owners[word] = (doc_freq, shard)
+        top = sorted(doc_freqs.items(), key=lambda item: (-item[1], item[0]))[:n]
+        requests = {}
+        for word, _ in top:
+            requests.setdefault(owners[word][1], []).append(word)
+        forms = {}
+        for found in self._scatter({shard: ('surface_forms', words) for shard, words in requests.items()}).values():
+            forms.update(found)
+        return [(forms[word], doc_freq) for word, doc_freq in top]
+
+    def vocabulary(self) -> list[str]:
+        return sorted(set().union(*self._broadcast('vocabulary')))
+
+    def shard_stats(self) -> list[dict]:
+        return self._broadcast('stats')
+
+    def index_stats(self) -> dict:
+        shards = self.shard_stats()
+        pages = sum(stats['pages'] for stats in shards)
+        total_length = sum(stats['total_length'] for stats in shards)
+        return {
+            'pages': pages,
+            'terms': len(self.vocabulary()),
+            'postings': sum(stats['postings'] for stats in shards),
+            'total_length': total_length,
+            'avg_page_length': total_length / pages if pages else 0.0,
+            'shards': self.num_shards,
+        }
+
+    def save(self, index_path: str):
+        """Cada shard grava seu índice em `shard_path(index_path, shard)`; depois o manifesto é gravado."""
+        saved = saved_num_shards(index_path)
+        if saved and saved != self.num_shards:
+            raise ValueError(f"O indice '{index_path}' foi salvo com {saved} shards, nao {self.num_shards}")
+        self._scatter({shard: ('save', shard_path(index_path, shard)) for shard in range(self.num_shards)})
+        with atomic_write(manifest_path(index_path)) as f:
+            f.write(json.dumps({'num_shards': self.num_shards}).encode('utf-8'))
+
+    def close(self):
+        if not self._processes:
+            return
+        self._broadcast('close')
+        for process in self._processes:
+            process.join()
+        for connection in self._connections:
+            connection.close()
+        self._processes = []
+        self._connections = []
+
+    def __len__(self):
+        return sum(self._broadcast('num_docs'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,369 @@
+# src/storage.py
+"""Formato binário do índice em disco.
+
+Layout (little-endian, seções alinhadas em 8 bytes):
+
+    cabeçalho     MAGIC + contadores + offset de cada seção
+    term_offsets  uint64[num_terms + 1]   -> posições em term_blob
+    term_blob     termos UTF-8 concatenados, em ordem crescente
+    post_offsets  uint64[num_terms + 1]   -> posições (em entradas) nos arrays de postings
+    post_docs     uint32[num_postings]    -> doc IDs
+    post_freqs    uint32[num_postings]    -> frequência do termo no documento
+    doc_lengths   uint32[num_docs]
+    doc_offsets   uint64[num_docs + 1]    -> posições em doc_blob
+    doc_blob      por documento: uint32 len(url), uint32 len(title), url, title, content
+                  (url vazia = doc ID de uma página removida)
+    fwd_offsets   uint64[num_docs + 1]    -> posições em fwd_terms
+    fwd_terms     uint32[num_postings]    -> índice direto: números dos termos de cada documento
+    pos_starts    uint64[num_terms + 1]   -> início das posições de cada termo em pos_blob
+    pos_offsets   uint32[num_postings + num_terms] -> por termo, len(postings) + 1 offsets relativos ao
+                  início do termo (PostingList.pos_offsets)
+    pos_blob      posições de cada (termo, documento), em deltas varint
+    form_offsets  uint64[num_terms + 1]   -> posições em form_blob
+    form_blob     forma original de cada termo, em UTF-8 (vazia quando é o próprio termo)
+
+O arquivo é aberto com mmap: o dicionário de termos é consultado por busca
+binária e as postings viram memoryviews, sem reler nem re-tokenizar nada.
+
+Cada gravação cria um arquivo de dados novo (`<índice>.<sufixo>.data`), e o
+arquivo do índice em si é só um ponteiro (POINTER_MAGIC + nome do arquivo de
+dados) trocado de forma atômica. O arquivo de dados mapeado por um engine (ou
+por outro processo, como o servidor) nunca é sobrescrito: no Windows, um
+os.replace sobre um arquivo mapeado falha. Os arquivos de dados antigos são
+apagados quando ninguém mais os mapeia.
+"""
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from contextlib import contextmanager
+
+from src.doc_store import DocStore
+from src.search_engine import PostingList, SearchEngine
+from src.segments import SegmentedEngine
+
+DEFAULT_INDEX_PATH = 'indice_buscador.bwi'
+
+MAGIC = b'BWAEDIX4' # v4: forma original dos termos
+POINTER_MAGIC = b'BWAEDPTR' # Arquivo do índice que aponta para o arquivo de dados atual
+DATA_SUFFIX = '.data'
+HEADER = struct.Struct('<8s4Q15Q') # magic, num_terms, num_docs, num_postings, total_length, 15 offsets de seção
+DOC_FIELDS = struct.Struct('<II')
+
+
+@contextmanager
+def atomic_write(path: str):
+    """Abre um arquivo temporário no mesmo diretório e só o renomeia para `path` depois de gravado e sincronizado.
+
+    Se algo falhar no meio, o snapshot anterior continua intacto.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    if hasattr(os, 'O_DIRECTORY'): # Garante que o rename também chegou ao disco
+        dir_fd = os.open(directory, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _pad(f):
+    padding = -f.tell() % 8
+    if padding:
+        f.write(b'\0' * padding)
+    return f.tell()
+
+
+def data_path(path: str) -> str:
+    """Arquivo de dados apontado pelo índice em `path` (o próprio `path`, num índice antigo sem ponteiro)."""
+    with open(path, 'rb') as f:
+        head = f.read(4096)
+    if not head.startswith(POINTER_MAGIC):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(path)), head[len(POINTER_MAGIC):].decode('utf-8'))
+
+
+def snapshot_files(path: str) -> list[str]:
+    """Arquivos que formam o snapshot em `path`: o ponteiro e o arquivo de dados."""
+    target = data_path(path)
+    return [path] if target == path else [path, target]
+
+
+def _remove_stale_data(path: str, keep: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    prefix = os.path.basename(path) + '.'
+    for name in os.listdir(directory):
+        middle = name[len(prefix):-len(DATA_SUFFIX)]
+        # Só os arquivos de dados deste índice: os de `<índice>.shardN` têm outro ponto no meio
+        if name.startswith(prefix) and name.endswith(DATA_SUFFIX) and middle and '.' not in middle and name != keep:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError: # Ainda mapeado (no Windows); sai numa próxima gravação
+                pass
+
+
+def save_index(engine: SearchEngine, path: str):
+    """Grava o índice completo (termos, postings e páginas) num arquivo de dados novo e aponta `path` para ele.
+
+    O ponteiro só é trocado depois que os dados estão no disco, então uma falha
+    no meio deixa o snapshot anterior intacto. O engine pode continuar usando o
+    snapshot de onde foi carregado.
+    """
+    terms = engine.vocabulary()
+    encoded_terms = [term.encode('utf-8') for term in terms]
+
+    term_offsets = array('Q', [0])
+    post_offsets = array('Q', [0])
+    post_docs = array('I')
+    post_freqs = array('I')
+    pos_starts = array('Q', [0])
+    pos_offsets = array('I')
+    pos_blob = bytearray()
+    form_offsets = array('Q', [0])
+    forms = []
+    docs = engine.docs
+    num_slots = len(docs.urls)
+    forward = [array('I') for _ in range(num_slots)]
+    for term_id, (term, encoded) in enumerate(zip(terms, encoded_terms)):
+        postings = engine.get_postings(term)
+        term_offsets.append(term_offsets[-1] + len(encoded))
+        post_docs.extend(postings.doc_ids)
+        post_freqs.extend(postings.freqs)
+        post_offsets.append(len(post_docs))
+        pos_offsets.extend(postings.pos_offsets)
+        pos_blob += postings.positions
+        pos_starts.append(len(pos_blob))
+        for doc_id in postings.doc_ids:
+            forward[doc_id].append(term_id)
+        form = engine.surface_form(term)
+        forms.append(form.encode('utf-8') if form != term else b'')
+        form_offsets.append(form_offsets[-1] + len(forms[-1]))
+
+    doc_offsets = array('Q', [0])
+    doc_records = []
+    for doc_id in range(num_slots):
+        if docs.urls[doc_id] is None: # Página removida: registro vazio mantém os doc IDs estáveis
+            record = DOC_FIELDS.pack(0, 0)
+        else:
+            url, title, content = (str(field or '').encode('utf-8') for field in (docs.urls[doc_id], docs.titles[doc_id], docs.content(doc_id)))
+            record = DOC_FIELDS.pack(len(url), len(title)) + url + title + content
+        doc_records.append(record)
+        doc_offsets.append(doc_offsets[-1] + len(record))
+
+    fwd_offsets = array('Q', [0])
+    fwd_terms = array('I')
+    for term_ids in forward:
+        fwd_terms.extend(term_ids)
+        fwd_offsets.append(len(fwd_terms))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, new_data = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix=DATA_SUFFIX, dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'\0' * HEADER.size)
+            sections = []
+            for chunk in (term_offsets, b''.join(encoded_terms), post_offsets, post_docs, post_freqs,
+                          docs.lengths, doc_offsets, b''.join(doc_records), fwd_offsets, fwd_terms,
+                          pos_starts, pos_offsets, bytes(pos_blob), form_offsets, b''.join(forms)):
+                sections.append(_pad(f))
+                f.write(chunk if isinstance(chunk, bytes) else chunk.tobytes())
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, len(terms), num_slots, len(post_docs), docs.total_length, *sections))
+            f.flush()
+            os.fsync(f.fileno())
+        with atomic_write(path) as f:
+            f.write(POINTER_MAGIC + os.path.basename(new_data).encode('utf-8'))
+    except BaseException:
+        os.unlink(new_data)
+        raise
+    _remove_stale_data(path, os.path.basename(new_data))
+
+
+class MappedIndex:
+    """Visão somente-leitura de um arquivo de índice mapeado em memória."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data_path = data_path(path)
+        with open(self.data_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+
+        magic, self.num_terms, self.num_docs, self.num_postings, self.total_length, *sections = HEADER.unpack_from(self._buf)
+        if magic != MAGIC:
+            raise ValueError(f"Arquivo de indice invalido ou de uma versao antiga (reindexe as paginas): {path}")
+
+        (terms_pos, blob_pos, post_off_pos, docs_pos, freqs_pos, lengths_pos, doc_off_pos, doc_blob_pos,
+         fwd_off_pos, fwd_terms_pos, pos_starts_pos, pos_off_pos, pos_blob_pos, form_off_pos, form_blob_pos) = sections
+        self._term_offsets = self._buf[terms_pos:terms_pos + 8 * (self.num_terms + 1)].cast('Q')
+        self._term_blob = self._buf[blob_pos:]
+        self._post_offsets = self._buf[post_off_pos:post_off_pos + 8 * (self.num_terms + 1)].cast('Q')
+        self._post_docs = self._buf[docs_pos:docs_pos + 4 * self.num_postings].cast('I')
+        self._post_freqs = self._buf[freqs_pos:freqs_pos + 4 * self.num_postings].cast('I')
+        self.doc_lengths = self._buf[lengths_pos:lengths_pos + 4 * self.num_docs].cast('I')
+        self._doc_offsets = self._buf[doc_off_pos:doc_off_pos + 8 * (self.num_docs + 1)].cast('Q')
+        self._doc_blob = self._buf[doc_blob_pos:fwd_off_pos]
+        self._fwd_offsets = self._buf[fwd_off_pos:fwd_off_pos + 8 * (self.num_docs + 1)].cast('Q')
+        self._fwd_terms = self._buf[fwd_terms_pos:fwd_terms_pos + 4 * self.num_postings].cast('I')
+        self._pos_starts = self._buf[pos_starts_pos:pos_starts_pos + 8 * (self.num_terms + 1)].cast('Q')
+        self._pos_offsets = self._buf[pos_off_pos:pos_off_pos + 4 * (self.num_postings + self.num_terms)].cast('I')
+        self._pos_blob = self._buf[pos_blob_pos:form_off_pos]
+        self._form_offsets = self._buf[form_off_pos:form_off_pos + 8 * (self.num_terms + 1)].cast('Q')
+        self._form_blob = self._buf[form_blob_pos:]
+
+    def _term_bytes(self, i: int) -> bytes:
+        return bytes(self._term_blob[self._term_offsets[i]:self._term_offsets[i + 1]])
+
+    def _find(self, key: bytes) -> int:
+        # Busca binária no dicionário ordenado (a ordem dos bytes UTF-8 é a ordem dos code points)
+        lo, hi = 0, self.num_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get_postings(self, term: str) -> PostingList:
+        key = term.encode('utf-8')
+        i = self._find(key)
+        if i >= self.num_terms or self._term_bytes(i) != key:
+            return None
+        start, end = self._post_offsets[i], self._post_offsets[i + 1]
+        # Os offsets de posição de cada termo têm uma entrada a mais que suas postings
+        return PostingList.view(self._post_docs[start:end], self._post_freqs[start:end],
+                                self._pos_blob[self._pos_starts[i]:self._pos_starts[i + 1]],
+                                self._pos_offsets[start + i:end + i + 1])
+
+    def surface_form(self, term: str) -> str:
+        """Forma original do termo gravada no snapshot (None se ele não está no snapshot)."""
+        key = term.encode('utf-8')
+        i = self._find(key)
+        if i >= self.num_terms or self._term_bytes(i) != key:
+            return None
+        form = bytes(self._form_blob[self._form_offsets[i]:self._form_offsets[i + 1]])
+        return form.decode('utf-8') if form else term
+
+    def terms_with_prefix(self, prefix: str) -> list[str]:
+        key = prefix.encode('utf-8')
+        terms = []
+        for i in range(self._find(key), self.num_terms):
+            term = self._term_bytes(i)
+            if not term.startswith(key):
+                break
+            terms.append(term.decode('utf-8'))
+        return terms
+
+    def prefix_doc_freqs(self, prefix: str):
+        """Gera (termo, quantidade de documentos) dos termos que começam com `prefix`, em ordem."""
+        key = prefix.encode('utf-8')
+        offsets = self._post_offsets
+        for i in range(self._find(key), self.num_terms):
+            term = self._term_bytes(i)
+            if not term.startswith(key):
+                break
+            yield term.decode('utf-8'), offsets[i + 1] - offsets[i]
+
+    def fuzzy(self, word: str, max_distance: int = 1) -> list[tuple[str, int]]:
+        """(termo, distância) dos termos a até `max_distance` edições de `word`, como `SearchTrie.fuzzy`.
+
+        O dicionário ordenado é percorrido como uma Trie implícita: cada termo
+        reaproveita as linhas de Levenshtein do prefixo comum com o anterior, e
+        quando a menor distância de uma linha passa do limite, todos os termos
+        com aquele prefixo são pulados com uma busca binária.
+        """
+        word = word.lower()
+        columns = len(word) + 1
+        rows = [list(range(columns))] # rows[d]: linha do prefixo de tamanho d de `previous`
+        previous = ''
+        matches = []
+        i = 0
+        while i < self.num_terms:
+            term = self._term_bytes(i).decode('utf-8')
+            common = 0
+            limit = min(len(term), len(previous))
+            while common < limit and term[common] == previous[common]:
+                common += 1
+            del rows[common + 1:]
+
+            pruned = False
+            for char in term[common:]:
+                previous_row = rows[-1]
+                row = [previous_row[0] + 1]
+                for j in range(1, columns):
+                    row.append(min(row[j - 1] + 1, previous_row[j] + 1, previous_row[j - 1] + (word[j - 1] != char)))
+                rows.append(row)
+                if min(row) > max_distance:
+                    pruned = True
+                    break
+
+            previous = term[:len(rows) - 1]
+            if pruned: # Nenhum termo com este prefixo chega ao limite: pula todos ('\xff' não aparece em UTF-8)
+                i = self._find(previous.encode('utf-8') + b'\xff')
+                continue
+            if rows[-1][-1] <= max_distance:
+                matches.append((term, rows[-1][-1]))
+            i += 1
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+
+    def iter_doc_freqs(self):
+        """Gera (termo, quantidade de documentos) para todo o vocabulário, em ordem, sem buscas binárias."""
+        offsets = self._post_offsets
+        for i in range(self.num_terms):
+            yield self._term_bytes(i).decode('utf-8'), offsets[i + 1] - offsets[i]
+
+    def doc_terms(self, doc_id: int) -> list[str]:
+        """Termos do documento, lidos do índice direto."""
+        start, end = self._fwd_offsets[doc_id], self._fwd_offsets[doc_id + 1]
+        return [self._term_bytes(term_id).decode('utf-8') for term_id in self._fwd_terms[start:end]]
+
+    def doc_meta(self, doc_id: int) -> tuple[str, str]:
+        """(url, título) do documento; (None, None) se ele foi removido."""
+        start = self._doc_offsets[doc_id]
+        url_len, title_len = DOC_FIELDS.unpack_from(self._doc_blob, start)
+        if url_len == 0:
+            return None, None
+        pos = start + DOC_FIELDS.size
+        url = bytes(self._doc_blob[pos:pos + url_len]).decode('utf-8')
+        title = bytes(self._doc_blob[pos + url_len:pos + url_len + title_len]).decode('utf-8')
+        return url, title
+
+    def content(self, doc_id: int) -> str:
+        start = self._doc_offsets[doc_id]
+        url_len, title_len = DOC_FIELDS.unpack_from(self._doc_blob, start)
+        pos = start + DOC_FIELDS.size + url_len + title_len
+        return bytes(self._doc_blob[pos:self._doc_offsets[doc_id + 1]]).decode('utf-8')
+
+    def close(self):
+        # As memoryviews derivadas precisam ser liberadas antes do mmap
+        for name in ('_term_offsets', '_term_blob', '_post_offsets', '_post_docs', '_post_freqs',
+                     'doc_lengths', '_doc_offsets', '_doc_blob', '_fwd_offsets', '_fwd_terms',
+                     '_pos_starts', '_pos_offsets', '_pos_blob', '_buf'):
+            getattr(self, name).release()
+        self._mmap.close()
+
+
+def load_index(path: str, docs: DocStore = None, segmented: bool = False) -> SearchEngine:
+    """Abre um índice salvo: termos, postings e conteúdos ficam no arquivo mapeado; só url e título vão para a memória.
+
+    Com `segmented`, devolve um SegmentedEngine em que o snapshot é o segmento mais antigo.
+    """
+    base = MappedIndex(path)
+    docs = docs if docs is not None else DocStore()
+    docs.attach_base(base)
+    engine = SegmentedEngine(docs=docs) if segmented else SearchEngine(docs=docs)
+    engine.attach_base(base)
+    return engine
@@ -0,0 +1,144 @@
+# src/tokenizer.py
+# Normalização de texto usada tanto na indexação quanto nas consultas:
+# minúsculas -> remoção de acentos -> palavras com 3+ letras -> stopwords -> stemmer leve de português.
+# Usado também pelos processos de parse do crawler, então só tem funções no nível do módulo.
+import re
+import unicodedata
+from functools import lru_cache
+
+WORD_PATTERN = re.compile(r'\b\w{3,}\b')
+QUERY_WORD_PATTERN = re.compile(r'\b\w+\b') # Na consulta, prefixos curtos ("py") também valem
+SEPARATOR_PATTERN = re.compile(r'[,;]')
+
+
+def _build_fold_table() -> dict:
+    # Letras latinas acentuadas (á, ç, õ, ...) -> letra sem acento
+    table = {}
+    for code in range(0xC0, 0x250):
+        base = unicodedata.normalize('NFKD', chr(code))[0]
+        if base != chr(code) and base.isascii():
+            table[code] = base
+    return table
+
+
+FOLD_TABLE = _build_fold_table()
+
+# Palavras muito frequentes em português, já sem acento (comparadas depois da remoção de acentos)
+STOPWORDS = frozenset('''
+    abaixo acima alem algo alguem algum alguma algumas alguns ali ambos ano anos antes ao aos apenas apos aquela
+    aquelas aquele aqueles aqui aquilo as assim ate bem cada com como contra contudo cujo cuja da das de dela delas
+    dele deles demais depois desde dessa dessas desse desses desta destas deste destes deve devem dez dia diz do dois
+    dos duas durante ela elas ele eles em embora enquanto entao entre era eram essa essas esse esses esta estao estas
+    estava estavam este estes esteve estou eu faz fazer foi foram fosse ha havia isso isto ja la lhe lhes mais mas me
+    mesma mesmas mesmo mesmos meu meus minha minhas muita muitas muito muitos na nao nas nem nenhum nessa nesse nesta
+    neste nos nossa nossas nosso nossos num numa nunca onde ou outra outras outro outros para pela pelas pelo pelos
+    pode podem por porque porem pois quais qual qualquer quando quanto que quem sao se seja sem sempre ser sera seu
+    seus sido sob sobre sua suas tal tambem tanto te tem tendo ter teu teus toda todas todo todos tua tuas tudo um
+    uma umas uns vai vao voce voces
+'''.split())
+
+# Regras de plural do stemmer, aplicadas na ordem: (sufixo, substituição, tamanho mínimo do que sobra)
+PLURAL_RULES = (
+    ('oes', 'ao', 2), # aplicacoes -> aplicacao
+    ('aes', 'ao', 2), # paes -> pao
+    ('ais', 'al', 2), # digitais -> digital
+    ('eis', 'el', 2), # papeis -> papel
+    ('ois', 'ol', 2), # lencois -> lencol
+    ('ns', 'm', 2), # itens -> item
+)
+ADVERB_SUFFIX = 'mente'
+
+
+def fold_accents(text: str) -> str:
+    return text.translate(FOLD_TABLE)
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Stemmer leve: reduz plurais ao singular, tira o sufixo adverbial "-mente" e o "e" final.
+
+    O "e" final sai para que "professor"/"professores" e "arvore"/"arvores" caiam no mesmo radical.
+    """
+    if len(word) < 4:
+        return word
+    if word.endswith(ADVERB_SUFFIX) and len(word) - len(ADVERB_SUFFIX) >= 4:
+        return word[:-len(ADVERB_SUFFIX)]
+    if word.endswith('s') and not word.endswith(('ss', 'us')):
+        for suffix, replacement, min_stem in PLURAL_RULES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+                return word[:-len(suffix)] + replacement
+        if not word.endswith('is'): # lapis, tenis
+            word = word[:-1] # dados -> dado
+    if word.endswith('e') and len(word) >= 4:
+        word = word[:-1]
+    return word
+
+
+def normalize(word: str) -> str:
+    """Forma canônica de uma palavra isolada (sem filtrar stopwords)."""
+    return stem(fold_accents(word.lower()))
+
+
+def tokenize(content: str) -> list[str]:
+    """Termos indexáveis do texto, na ordem em que aparecem (com repetições)."""
+    text = fold_accents(SEPARATOR_PATTERN.sub(' ', content).lower())
+    return [stem(word) for word in WORD_PATTERN.findall(text) if word not in STOPWORDS]
+
+
+@lru_cache(maxsize=65536)
+def _word_term(word: str) -> str:
+    # Termo de uma palavra já em minúsculas (None para stopwords)
+    folded = fold_accents(word)
+    return None if folded in STOPWORDS else stem(folded)
+
+
+def surface_forms(content: str, terms) -> dict[str, str]:
+    """Primeira palavra do texto (em minúsculas, com acentos) que vira cada termo de `terms` na normalização."""
+    missing = set(terms)
+    forms = {}
+    for word in WORD_PATTERN.findall(SEPARATOR_PATTERN.sub(' ', content).lower()):
+        term = _word_term(word)
+        if term in missing:
+            forms[term] = word
+            missing.discard(term)
+            if not missing:
+                break
+    return forms
+
+
+def term_positions(terms) -> dict[str, list[int]]:
+    """termo -> posições (índices em `terms`) em que ele aparece, para as consultas de frase e proximidade.
+
+    As posições contam só os termos indexáveis: uma stopword entre duas palavras
+    não as afasta, então "estrutura de dados" e "estrutura dados" são a mesma frase.
+    """
+    positions = {}
+    for position, term in enumerate(terms):
+        positions.setdefault(term, []).append(position)
+    return positions
+
+
+def query_terms(words) -> list[str]:
+    """Normaliza as palavras de uma consulta do mesmo jeito que o texto indexado."""
+    terms = []
+    for word in words:
+        folded = fold_accents(word.lower())
+        if folded not in STOPWORDS:
+            terms.append(stem(folded))
+    return terms
+
+
+def vocabulary_reduction(texts) -> dict:
+    """Tamanho do vocabulário em cada etapa da normalização, para medir quanto ela encolhe o índice."""
+    raw, folded, normalized = set(), set(), set()
+    for text in texts:
+        words = WORD_PATTERN.findall(SEPARATOR_PATTERN.sub(' ', text).lower())
+        raw.update(words)
+        folded.update(fold_accents(word) for word in words)
+        normalized.update(tokenize(text))
+    return {
+        'raw': len(raw),
+        'accent_folded': len(folded),
+        'normalized': len(normalized),
+        'reduction': 1 - len(normalized) / len(raw) if raw else 0.0,
+    }
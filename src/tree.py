@@ -7,6 +7,10 @@ class TrieNode: # Se TrieNode estiver neste arquivo, garanta que seja assim
         self.children = {}
         self.is_end_of_word = False # ESSENCIAL: Adicione esta linha se não tiver!
         self.pages = set() # Deve ser um set de objetos Page
+        self.word_count = 0 # Quantidade de palavras na subárvore (inclui este nó)
+        self.page_count = 0 # Quantidade de pares (palavra, página) na subárvore
+        self.weight = 0 # Peso da palavra deste nó para o autocompletar (ex.: frequência nos documentos)
+        self.top = None # Cache: melhores (peso, palavra) da subárvore; None = precisa recalcular
 
     def add_page(self, page_obj: Page):
         self.pages.add(page_obj)
@@ -15,34 +19,249 @@ class TrieNode: # Se TrieNode estiver neste arquivo, garanta que seja assim
         return list(self.pages)
 
 class SearchTrie:
-    def __init__(self):
+    def __init__(self, top_n: int = 10):
         self.root = TrieNode()
+        self.top_n = top_n # Tamanho das listas de sugestões guardadas em cada nó
 
-    def insert(self, word: str, page: Page):
+    def insert(self, word: str, page: Page = None):
         node = self.root
+        path = [node]
         for char in word.lower():
             if char not in node.children:
                 node.children[char] = TrieNode()
             node = node.children[char]
+            path.append(node)
+
+        new_word = not node.is_end_of_word
+        new_page = page is not None and page not in node.pages
         node.is_end_of_word = True # ESSENCIAL: Mantem esta propriedade
-        node.add_page(page) # CORREÇÃO CRÍTICA: Passa o objeto Page completo
+        if page is not None: # Sem página, a Trie serve só como dicionário de palavras (expansor de prefixos)
+            node.add_page(page) # CORREÇÃO CRÍTICA: Passa o objeto Page completo
 
-    def search(self, word: str) -> list[Page]:
+        # Atualiza os contadores em cache de todos os nós do caminho
+        if new_word or new_page:
+            for path_node in path:
+                path_node.word_count += new_word
+                path_node.page_count += new_page
+                path_node.top = None
+
+    def insert_sorted(self, words):
+        """Insere em lote pares (palavra, peso) já em ordem crescente, sem páginas.
+
+        Cada palavra reaproveita o caminho da anterior até o prefixo comum, então
+        cada nó é visitado uma vez por lote: as contagens de palavras novas sobem
+        para o pai quando o caminho deixa o nó, e o cache de sugestões de um nó
+        compartilhado é invalidado uma vez só, não uma vez por palavra.
+        """
+        path = [self.root] # Nós do caminho da palavra anterior
+        added = [0] # Palavras novas na subárvore de path[i] ainda não somadas em word_count
+        invalidated = -1 # path[0..invalidated] já tiveram o cache de sugestões invalidado
+        previous = ''
+        for word, weight in words:
+            word = word.lower()
+            common = 0
+            limit = min(len(word), len(previous))
+            while common < limit and word[common] == previous[common]:
+                common += 1
+            while len(path) > common + 1: # Fecha os nós abaixo do prefixo comum
+                node = path.pop()
+                count = added.pop()
+                if count:
+                    node.word_count += count
+                    added[-1] += count
+            if invalidated > common:
+                invalidated = common
+
+            node = path[-1]
+            for char in word[common:]:
+                child = node.children.get(char)
+                if child is None:
+                    child = node.children[char] = TrieNode()
+                node = child
+                path.append(node)
+                added.append(0)
+
+            changed = node.weight != weight
+            if not node.is_end_of_word:
+                node.is_end_of_word = True
+                added[-1] += 1
+                changed = True
+            if changed:
+                node.weight = weight
+                for path_node in path[invalidated + 1:]:
+                    path_node.top = None
+                invalidated = len(path) - 1
+            previous = word
+
+        while len(path) > 1:
+            node = path.pop()
+            count = added.pop()
+            node.word_count += count
+            added[-1] += count
+        self.root.word_count += added[0]
+
+    def delete(self, word: str, page: Page = None) -> bool:
+        """Remove a página da palavra (ou a palavra inteira, se `page` for None).
+
+        Quando a palavra fica sem páginas ela deixa de existir, e os nós que
+        ficaram vazios são podados. Devolve False se não havia o que remover.
+        """
         node = self.root
+        path = [(None, node)]
         for char in word.lower():
             if char not in node.children:
-                return []
+                return False
+            node = node.children[char]
+            path.append((char, node))
+        if not node.is_end_of_word:
+            return False
+
+        if page is not None:
+            if page not in node.pages:
+                return False
+            node.pages.discard(page)
+            removed_pages = 1
+            removed_word = not node.pages
+        else:
+            removed_pages = len(node.pages)
+            node.pages.clear()
+            removed_word = True
+        if removed_word:
+            node.is_end_of_word = False
+
+        if removed_word:
+            node.weight = 0
+        for _, path_node in path:
+            path_node.word_count -= removed_word
+            path_node.page_count -= removed_pages
+            path_node.top = None
+
+        # Poda de baixo para cima os nós que não têm mais palavras
+        for i in range(len(path) - 1, 0, -1):
+            char, path_node = path[i]
+            if path_node.word_count or path_node.children:
+                break
+            del path[i - 1][1].children[char]
+        return True
+
+    def _find_node(self, prefix: str) -> TrieNode:
+        node = self.root
+        for char in prefix:
+            if char not in node.children:
+                return None
             node = node.children[char]
+        return node
+
+    def iter_prefix(self, prefix: str, limit: int = None):
+        """Gera (palavra, páginas) para cada palavra que começa com `prefix`, em ordem alfabética.
+
+        Percorre a subárvore com uma pilha explícita (sem recursão) e para depois de `limit` palavras.
+        """
+        prefix = prefix.lower()
+        node = self._find_node(prefix)
+        if node is None or limit == 0:
+            return
+
+        produced = 0
+        stack = [(node, prefix)]
+        while stack:
+            node, path = stack.pop()
+            if node.is_end_of_word:
+                yield path, node.pages
+                produced += 1
+                if limit is not None and produced >= limit:
+                    return
+            for char_key in sorted(node.children, reverse=True):
+                stack.append((node.children[char_key], path + char_key))
+
+    def count_prefix(self, prefix: str) -> tuple[int, int]:
+        """(palavras, pares palavra-página) sob o prefixo, lidos do cache dos nós em O(len(prefix))."""
+        node = self._find_node(prefix.lower())
+        if node is None:
+            return 0, 0
+        return node.word_count, node.page_count
+
+    def set_weight(self, word: str, weight: int):
+        """Define o peso de uma palavra já inserida e invalida as sugestões do caminho, em O(len(word))."""
+        node = self.root
+        path = [node]
+        for char in word.lower():
+            node = node.children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        if node.is_end_of_word and node.weight != weight:
+            node.weight = weight
+            for path_node in path:
+                path_node.top = None
 
+    def top_completions(self, prefix: str, n: int = None) -> list[tuple[str, int]]:
+        """Até `n` (palavra, peso) que começam com `prefix`, do maior para o menor peso.
+
+        Cada nó guarda as `top_n` melhores palavras da sua subárvore; com o cache em
+        dia, a consulta custa O(len(prefix)), independente do tamanho da subárvore.
+        """
+        prefix = prefix.lower()
+        node = self._find_node(prefix)
+        if node is None:
+            return []
+        if node.top is None:
+            self._refresh_top(node, prefix)
+        n = self.top_n if n is None else min(n, self.top_n)
+        return [(word, -neg_weight) for neg_weight, word in node.top[:n]]
+
+    def _refresh_top(self, start: TrieNode, prefix: str):
+        # Pós-ordem iterativa que só desce nos nós invalidados; os demais reaproveitam o cache
+        stack = [(start, prefix, False)]
+        while stack:
+            node, path, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, path, True))
+                for char, child in node.children.items():
+                    if child.top is None:
+                        stack.append((child, path + char, False))
+                continue
+            candidates = [(-node.weight, path)] if node.is_end_of_word else []
+            for child in node.children.values():
+                candidates.extend(child.top)
+            candidates.sort()
+            node.top = candidates[:self.top_n]
+
+    def fuzzy(self, word: str, max_distance: int = 1) -> list[tuple[str, int]]:
+        """(palavra, distância) de todas as palavras a até `max_distance` edições de `word`.
+
+        Calcula uma linha da tabela de Levenshtein por nó, reaproveitando a do pai,
+        e poda a subárvore assim que o menor valor da linha passa de `max_distance`.
+        O resultado vem ordenado por distância e depois alfabeticamente.
+        """
+        word = word.lower()
+        columns = len(word) + 1
+        matches = []
+        stack = [(child, char, char, range(columns)) for char, child in self.root.children.items()]
+        while stack:
+            node, char, path, previous_row = stack.pop()
+            row = [previous_row[0] + 1]
+            for i in range(1, columns):
+                row.append(min(row[i - 1] + 1, # Inserção
+                               previous_row[i] + 1, # Remoção
+                               previous_row[i - 1] + (word[i - 1] != char))) # Substituição (ou igual)
+
+            if node.is_end_of_word and row[-1] <= max_distance:
+                matches.append((path, row[-1]))
+            if min(row) <= max_distance:
+                for child_char, child in node.children.items():
+                    stack.append((child, child_char, path + child_char, row))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+
+    def search(self, word: str) -> list[Page]:
         found_pages = set()
-        self._collect_pages(node, found_pages)
+        for _, pages in self.iter_prefix(word):
+            found_pages.update(pages)
         return list(found_pages)
 
-    def _collect_pages(self, node: TrieNode, page_set: set):
-        if node.pages:
-            page_set.update(node.pages)
-
-        for char_key in node.children:
-            self._collect_pages(node.children[char_key], page_set)
+    def words_with_prefix(self, prefix: str, limit: int = None) -> list[str]:
+        """Devolve as palavras inseridas que começam com `prefix` (no máximo `limit`)."""
+        return [word for word, _ in self.iter_prefix(prefix, limit)]
 
-    # ... (outros métodos como starts_with, delete, se você os adicionou)
\ No newline at end of file
+    # ... (outros métodos como starts_with, delete, se você os adicionou)
@@ -0,0 +1,97 @@
+# tests/conftest.py
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class LocalServer:
+    """Servidor HTTP local com respostas configuráveis por caminho, que registra cada requisição recebida.
+
+    Páginas com `etag` ou `last_modified` respondem 304 às requisições condicionais
+    que batem com os validadores atuais. Caminhos sem rota respondem 404.
+    """
+
+    def __init__(self):
+        self.routes = {} # caminho -> {'status', 'body', 'headers'}
+        self.requests = [] # (caminho, cabeçalhos, porta do cliente)
+        self.delay = 0 # Segundos de espera antes de cada resposta
+        self._lock = threading.Lock()
+        self._server = None
+
+    def route(self, path: str, body=b'', status: int = 200, content_type: str = 'text/html; charset=utf-8',
+              etag: str = None, last_modified: str = None):
+        headers = {'Content-Type': content_type}
+        if etag:
+            headers['ETag'] = etag
+        if last_modified:
+            headers['Last-Modified'] = last_modified
+        self.routes[path] = {'status': status, 'body': body.encode('utf-8') if isinstance(body, str) else body,
+                             'headers': headers}
+
+    def url(self, path: str = '/') -> str:
+        return f'http://127.0.0.1:{self._server.server_address[1]}{path}'
+
+    @property
+    def netloc(self) -> str:
+        return f'127.0.0.1:{self._server.server_address[1]}'
+
+    def requests_for(self, path: str) -> list[dict]:
+        with self._lock:
+            return [headers for request_path, headers, _ in self.requests if request_path == path]
+
+    def start(self) -> 'LocalServer':
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1' # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append((self.path, dict(self.headers), self.client_address[1]))
+                time.sleep(server.delay)
+                route = server.routes.get(self.path)
+                if route is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                headers = route['headers']
+                etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+                if ((etag and self.headers.get('If-None-Match') == etag)
+                        or (last_modified and self.headers.get('If-Modified-Since') == last_modified)):
+                    self.send_response(304)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(route['status'])
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(route['body'])))
+                self.end_headers()
+                self.wfile.write(route['body'])
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='local-server', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def html_page(title: str, text: str, links=()) -> str:
+    anchors = ''.join(f'<a href="{href}">{href}</a> ' for href in links)
+    return f'<html><head><title>{title}</title></head><body><p>{text}</p>{anchors}</body></html>'
+
+
+@pytest.fixture
+def server():
+    local = LocalServer().start()
+    yield local
+    local.stop()
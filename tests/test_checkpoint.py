@@ -0,0 +1,108 @@
+# tests/test_checkpoint.py
+import json
+import time
+from collections import Counter
+
+import pytest
+
+from src.checkpoint import CrawlCheckpoint
+from src.crawler import CrawlEngine
+from src.pipeline import CrawlPipeline
+from src.search_engine import SearchEngine
+from tests.conftest import html_page
+
+FANOUT = 3
+DEPTH = 3
+
+
+class SlowEngine(SearchEngine):
+    """Indexação lenta: as páginas baixadas se acumulam na fila do estágio de indexação."""
+
+    def add_document(self, *args, **kwargs):
+        time.sleep(0.05)
+        return super().add_document(*args, **kwargs)
+
+
+def build_site(server) -> list[str]:
+    """Árvore de páginas com FANOUT filhos por página, até DEPTH níveis abaixo da raiz; devolve as URLs."""
+    paths = ['/p']
+    level = ['/p']
+    for _ in range(DEPTH):
+        level = [f'{path}-{i}' for path in level for i in range(FANOUT)]
+        paths.extend(level)
+    for path in paths:
+        children = [f'{path}-{i}' for i in range(FANOUT)] if path.count('-') < DEPTH else []
+        server.route(path, html_page(path, f'conteudo da pagina {path.replace("-", " ")}', children + ['/p']))
+    return [server.url(path) for path in paths]
+
+
+def run(pipeline, cancel_after: int = None):
+    """Consome os eventos até 'done'; com `cancel_after`, cancela depois de tantas páginas indexadas."""
+    indexed = 0
+    while True:
+        kind, *payload = pipeline.events.get(timeout=30)
+        if kind == 'log' and 'Indexado' in payload[0]:
+            indexed += 1
+            if indexed == cancel_after:
+                pipeline.cancel()
+        elif kind == 'done':
+            pipeline.join()
+            return
+
+
+def journal_urls(checkpoint: CrawlCheckpoint) -> list[str]:
+    with open(checkpoint.journal_path, encoding='utf-8') as f:
+        return [json.loads(line)['url'] for line in f]
+
+
+@pytest.mark.parametrize('bloom_capacity', [None, 1000])
+def test_resume_after_cancel(server, tmp_path, bloom_capacity):
+    urls = build_site(server)
+    server.delay = 0.005
+    index_path = str(tmp_path / 'indice.bwi')
+
+    checkpoint = CrawlCheckpoint(index_path)
+    crawl = CrawlEngine(workers=2, per_host=2, rate=None, obey_robots=False, bloom_capacity=bloom_capacity)
+    pipeline = CrawlPipeline(SlowEngine(), crawl, parse_processes=1, checkpoint=checkpoint, checkpoint_interval=0.05)
+    pipeline.start(urls[0], DEPTH)
+    run(pipeline, cancel_after=8)
+    crawl.http_client.close()
+
+    first_run = journal_urls(checkpoint)
+    assert 8 <= len(first_run) < len(urls) # Parou no meio
+    with open(checkpoint.state_path, encoding='utf-8') as f:
+        assert 'urls' not in json.load(f)['seen'] # As URLs vistas ficam no arquivo à parte
+
+    # Outro processo: índice vazio (nunca salvo) + diário + estado salvo
+    engine = SearchEngine()
+    checkpoint = CrawlCheckpoint(index_path)
+    assert checkpoint.exists()
+    assert checkpoint.replay(engine) == len(first_run)
+    crawl = CrawlEngine(workers=2, per_host=2, rate=None, obey_robots=False, bloom_capacity=bloom_capacity)
+    pipeline = CrawlPipeline(engine, crawl, parse_processes=1, checkpoint=checkpoint, checkpoint_interval=0.05)
+    pipeline.resume(checkpoint.load())
+    run(pipeline)
+    crawl.http_client.close()
+
+    indexed = Counter(journal_urls(checkpoint))
+    assert [url for url, count in indexed.items() if count > 1] == [] # Nenhuma página indexada duas vezes
+    assert sorted(indexed) == sorted(urls) # Nenhuma perdida
+    assert len(engine) == len(urls)
+    assert crawl.pages_discovered == len(urls)
+
+
+def test_seen_urls_are_appended_incrementally(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'indice.bwi'))
+    state = {'seen': {}, 'frontier': []}
+    checkpoint.save({**state, 'seen_new': ['http://a/1', 'http://a/2']})
+    checkpoint.save({**state, 'seen_new': ['http://a/3']})
+    assert checkpoint.load()['seen']['urls'] == ['http://a/1', 'http://a/2', 'http://a/3']
+
+    with open(checkpoint.seen_path, 'ab') as f: # Sobra de uma gravação que falhou antes do estado
+        f.write(b'http://a/perdida\n')
+    assert checkpoint.load()['seen']['urls'] == ['http://a/1', 'http://a/2', 'http://a/3']
+    checkpoint.save({**state, 'seen_new': ['http://a/4']})
+    assert checkpoint.load()['seen']['urls'] == ['http://a/1', 'http://a/2', 'http://a/3', 'http://a/4']
+
+    checkpoint.clear()
+    assert not checkpoint.exists()
@@ -0,0 +1,76 @@
+# tests/test_http_client.py
+from src import api
+from src.http_client import FetchCache, HttpClient
+from src.search_engine import SearchEngine
+from tests.conftest import html_page
+
+
+def crawl(engine, server, fetch_cache) -> list[str]:
+    logs = []
+    api.crawl(engine, server.url('/p0.html'), max_depth=1, workers=2, parse_processes=1, fetch_cache=fetch_cache,
+              rate=None, obey_robots=False, on_event=lambda kind, *payload: kind == 'log' and logs.append(payload[0]))
+    return logs
+
+
+def test_connections_are_reused(server):
+    server.route('/a', 'ok', content_type='text/plain')
+    client = HttpClient(per_host=1)
+    try:
+        for _ in range(5):
+            assert client.get(server.url('/a')).content == b'ok'
+    finally:
+        client.close()
+    assert len({port for _, _, port in server.requests}) == 1 # Uma única conexão keep-alive
+
+
+def test_validators_are_sent_back(server):
+    server.route('/a', 'ok', etag='"v1"', last_modified='Wed, 01 Jan 2025 00:00:00 GMT')
+    cache = FetchCache()
+    client = HttpClient(cache=cache)
+    try:
+        first = client.get(server.url('/a'))
+        assert (first.etag, first.last_modified) == ('"v1"', 'Wed, 01 Jan 2025 00:00:00 GMT')
+        cache.remember(server.url('/a'), first.etag, first.last_modified, ['/b'])
+        second = client.get(server.url('/a'))
+    finally:
+        client.close()
+
+    headers = server.requests_for('/a')
+    assert 'If-None-Match' not in headers[0]
+    assert headers[1]['If-None-Match'] == '"v1"'
+    assert headers[1]['If-Modified-Since'] == 'Wed, 01 Jan 2025 00:00:00 GMT'
+    assert second.not_modified and second.content == b''
+
+
+def test_not_modified_page_reuses_the_index(server, tmp_path):
+    server.route('/p0.html', html_page('Inicio', 'estrutura de dados', ['/p1.html']), etag='"p0"')
+    server.route('/p1.html', html_page('Grafos', 'algoritmos de grafos'), etag='"p1"')
+    engine = SearchEngine()
+    cache = FetchCache()
+    crawl(engine, server, cache)
+    assert len(engine) == 2
+    cache.save(str(tmp_path / 'cache.json'))
+
+    generation = engine.generation
+    logs = crawl(engine, server, FetchCache.load(str(tmp_path / 'cache.json')))
+    # As duas páginas responderam 304: nada foi reindexado, e o link de p0 veio do cache
+    assert sum('(304)' in line for line in logs) == 2
+    assert engine.generation == generation
+    assert len(server.requests_for('/p1.html')) == 2
+    assert [page.url for page, _ in engine.ranked_search('grafos')] == [server.url('/p1.html')]
+
+
+def test_changed_page_is_fetched_again(server):
+    server.route('/p0.html', html_page('Inicio', 'estrutura de dados', ['/p1.html']), etag='"p0"')
+    server.route('/p1.html', html_page('Grafos', 'algoritmos de grafos'), etag='"p1"')
+    engine = SearchEngine()
+    cache = FetchCache()
+    crawl(engine, server, cache)
+
+    server.route('/p1.html', html_page('Grafos', 'caminhos minimos'), etag='"p1-v2"')
+    logs = crawl(engine, server, cache)
+    assert sum('(304)' in line for line in logs) == 1 # Só p0 continua igual
+    assert server.requests_for('/p1.html')[-1]['If-None-Match'] == '"p1"'
+    assert [page.url for page, _ in engine.ranked_search('minimos')] == [server.url('/p1.html')]
+    assert engine.ranked_search('grafos', fuzzy=False) == []
+    assert cache.validators(server.url('/p1.html'))['If-None-Match'] == '"p1-v2"'
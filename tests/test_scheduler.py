@@ -0,0 +1,142 @@
+# tests/test_scheduler.py
+import re
+import time
+from urllib.parse import urlparse
+
+import pytest
+
+from src.crawler import CrawlEngine
+from src.http_client import HttpClient
+from src.scheduler import PolitenessScheduler, RobotsCache
+from tests.conftest import html_page
+
+
+@pytest.fixture
+def client():
+    http_client = HttpClient()
+    yield http_client
+    http_client.close()
+
+
+def fetch_first(scheduler, client, now):
+    # Primeira URL do host: sai sozinha, e a "thread de download" baixa o robots.txt
+    url, _ = scheduler.pop_ready(now)
+    allowed = scheduler.check_robots(client, url)
+    scheduler.release(urlparse(url).netloc)
+    return url, allowed
+
+
+def test_robots_disallow(server, client):
+    server.route('/robots.txt', 'User-agent: *\nDisallow: /privado\n', content_type='text/plain')
+    scheduler = PolitenessScheduler(rate=None, robots=RobotsCache())
+    for path in ('/a', '/privado/x', '/b', '/privado/y'):
+        scheduler.append((server.url(path), 1))
+
+    now = time.monotonic()
+    assert scheduler.pop_ready(now) == (server.url('/a'), 1)
+    assert scheduler.pop_ready(now) is None # Host segurado até o robots.txt chegar
+    assert scheduler.check_robots(client, server.url('/a'))
+    scheduler.release(server.netloc)
+    assert scheduler.pop_ready(now) == (server.url('/b'), 1)
+    assert scheduler.pop_ready(now) is None
+    assert not scheduler
+    assert (scheduler.robots_blocked, scheduler.pages_dispatched) == (2, 2)
+    assert len(server.requests_for('/robots.txt')) == 1
+
+
+def test_blocked_first_url_does_not_use_the_budget(server, client):
+    server.route('/robots.txt', 'User-agent: *\nDisallow: /privado\n', content_type='text/plain')
+    scheduler = PolitenessScheduler(rate=None, max_pages=1, robots=RobotsCache())
+    scheduler.append((server.url('/privado/x'), 0))
+    scheduler.append((server.url('/a'), 1))
+
+    now = time.monotonic()
+    assert fetch_first(scheduler, client, now) == (server.url('/privado/x'), False)
+    assert (scheduler.robots_blocked, scheduler.pages_dispatched) == (1, 0)
+    assert not scheduler.exhausted
+    assert scheduler.pop_ready(now) == (server.url('/a'), 1)
+    assert scheduler.exhausted
+
+
+def test_crawl_delay(server, client):
+    server.route('/robots.txt', 'User-agent: *\nCrawl-delay: 2\n', content_type='text/plain')
+    scheduler = PolitenessScheduler(rate=10, burst=5, per_host=10, robots=RobotsCache())
+    for i in range(5):
+        scheduler.append((server.url(f'/p{i}'), 1))
+
+    now = time.monotonic()
+    assert fetch_first(scheduler, client, now) == (server.url('/p0'), True)
+    # Uma requisição a cada 2 s, sem rajada, contando a partir da primeira
+    assert scheduler.pop_ready(now) is None
+    assert scheduler.pop_ready(now + 1.9) is None
+    assert scheduler.pop_ready(now + 2) == (server.url('/p1'), 1)
+    assert scheduler.pop_ready(now + 3) is None
+    assert scheduler.pop_ready(now + 4) == (server.url('/p2'), 1)
+
+
+def test_token_bucket_per_host():
+    scheduler = PolitenessScheduler(rate=1, burst=2, per_host=10, robots=None)
+    for host in ('a.test', 'b.test'):
+        for i in range(4):
+            scheduler.append((f'http://{host}/{i}', 1))
+
+    now = time.monotonic()
+    popped = [scheduler.pop_ready(now) for _ in range(5)]
+    # Rajada de 2 por host, com os hosts em rodízio; o balde de um não limita o outro
+    assert [url for url, _ in popped[:4]] == ['http://a.test/0', 'http://b.test/0', 'http://a.test/1', 'http://b.test/1']
+    assert popped[4] is None
+    assert scheduler.pop_ready(now + 0.5) is None
+    assert [scheduler.pop_ready(now + 1)[0] for _ in range(2)] == ['http://a.test/2', 'http://b.test/2']
+    assert scheduler.pop_ready(now + 1) is None
+
+
+def test_per_host_concurrency():
+    scheduler = PolitenessScheduler(rate=None, per_host=1, robots=None)
+    scheduler.append(('http://a.test/0', 1))
+    scheduler.append(('http://a.test/1', 1))
+    assert scheduler.pop_ready() == ('http://a.test/0', 1)
+    assert scheduler.pop_ready() is None
+    scheduler.release('a.test')
+    assert scheduler.pop_ready() == ('http://a.test/1', 1)
+
+
+def crawl(server, **options) -> CrawlEngine:
+    engine = CrawlEngine(workers=1, per_host=1, rate=None, obey_robots=False, **options)
+    engine.start(server.url('/p0'), 5)
+    deadline = time.monotonic() + 10
+    try:
+        while not engine.finished and time.monotonic() < deadline:
+            for result in engine.poll():
+                if result.content:
+                    engine.add_links(result.url, result.depth, re.findall(r'href="([^"]+)"', result.content.decode()))
+            time.sleep(0.005)
+    finally:
+        engine.shutdown()
+        engine.http_client.close()
+    assert engine.finished
+    return engine
+
+
+def site(server) -> int:
+    # Uma cadeia de 10 páginas do mesmo tamanho
+    for i in range(10):
+        server.route(f'/p{i}', html_page(f'P{i}', f'pagina {i}', [f'/p{i + 1}'] if i < 9 else []))
+    return len(server.routes['/p0']['body'])
+
+
+def pages_requested(server) -> int:
+    return len([path for path, _, _ in server.requests if path.startswith('/p')])
+
+
+def test_max_pages(server):
+    site(server)
+    engine = crawl(server, max_pages=3)
+    assert pages_requested(server) == 3
+    assert engine.frontier.pages_dispatched == 3
+
+
+def test_max_bytes(server):
+    size = site(server)
+    engine = crawl(server, max_bytes=2 * size + 1) # Para depois da página que passa do limite
+    assert pages_requested(server) == 3
+    assert engine.frontier.bytes_downloaded == 3 * size
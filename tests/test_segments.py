@@ -0,0 +1,162 @@
+# tests/test_segments.py
+import random
+import sys
+import threading
+
+import pytest
+
+from benchmarks.synthetic import SyntheticCorpus
+from src.page import Page
+from src.search_engine import SearchEngine
+from src.segments import SegmentedEngine
+from src.storage import load_index, save_index
+from src.tokenizer import term_positions, tokenize
+
+
+def random_ops(engines, rng, corpus, urls, count):
+    """Inserções, reindexações e remoções aleatórias, aplicadas igualmente a todos os engines."""
+    for _ in range(count):
+        choice = rng.random()
+        if choice < 0.15 and urls:
+            url = rng.choice(urls)
+            for engine in engines:
+                engine.remove_page(url)
+            continue
+        if choice < 0.4 and urls:
+            url = rng.choice(urls) # Reindexação (ou volta de uma página removida)
+        else:
+            url = f'http://site/{len(urls)}'
+            urls.append(url)
+        content = corpus.text(rng.randint(5, 40))
+        batch = [(Page(url, url, content), term_positions(tokenize(content)))]
+        for engine in engines:
+            engine.add_documents(batch)
+
+
+def postings_of(engine) -> dict:
+    return {term: list(engine.get_postings(term).entries()) for term in engine.vocabulary()}
+
+
+def queries(rng, vocabulary) -> list[str]:
+    found = []
+    for _ in range(25):
+        a, b, c = (rng.choice(vocabulary) for _ in range(3))
+        found += [f'{a} {b} {c}', f'"{a} {b}"', f'{a} NEAR/3 {b}', f'{a} AND {b}', a[:2]]
+    return found
+
+
+def assert_same(reference, segmented, rng, vocabulary):
+    assert postings_of(segmented) == postings_of(reference)
+    assert len(segmented) == len(reference)
+    for query in queries(rng, vocabulary):
+        expected = [(page.url, round(score, 9)) for page, score in reference.ranked_search(query, k=20)]
+        assert [(page.url, round(score, 9)) for page, score in segmented.ranked_search(query, k=20)] == expected, query
+
+
+@pytest.mark.parametrize('background_merge', [False, True])
+def test_matches_search_engine(tmp_path, background_merge):
+    rng = random.Random(7)
+    corpus = SyntheticCorpus(300, seed=3)
+    vocabulary = corpus.vocabulary[:40] # Termos frequentes: frases e NEAR casam de verdade
+    urls = []
+
+    reference = SearchEngine()
+    segmented = SegmentedEngine(segment_size=10, merge_factor=3, background_merge=background_merge)
+    try:
+        random_ops([reference, segmented], rng, corpus, urls, 600)
+        segmented.merge_now()
+        assert segmented.merges > 0
+        assert_same(reference, segmented, rng, vocabulary)
+    finally:
+        segmented.close()
+
+    # Com o snapshot salvo como segmento mais antigo (e lápides nele)
+    path = str(tmp_path / 'indice.bwi')
+    save_index(reference, path)
+    loaded = load_index(path, segmented=True)
+    loaded.segment_size, loaded.merge_factor, loaded.background_merge = 10, 3, background_merge
+    try:
+        random_ops([reference, loaded], rng, corpus, urls, 400)
+        loaded.merge_now()
+        assert loaded._snapshot.deleted
+        assert_same(reference, loaded, rng, vocabulary)
+        assert_same(reference, loaded, rng, vocabulary) # Agora com as listas filtradas vindas do cache
+    finally:
+        loaded.close()
+
+
+def test_readers_see_consistent_memory_postings():
+    corpus = SyntheticCorpus(50, seed=4)
+    engine = SegmentedEngine(segment_size=100000, background_merge=False) # Tudo no segmento em memória
+    terms = corpus.vocabulary[:10]
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            for term in terms:
+                postings = engine.get_postings(term)
+                if postings is None:
+                    continue
+                if not (len(postings.doc_ids) == len(postings.freqs) == len(postings.pos_offsets) - 1
+                        and postings.pos_offsets[-1] == len(postings.positions)):
+                    errors.append(term)
+                engine.ranked_search(f'"{term} {terms[0]}"', k=5, prefix=False, fuzzy=False)
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5) # Troca de thread bem mais frequente: leituras caem no meio das escritas
+    for reader in readers:
+        reader.start()
+    try:
+        rng = random.Random(1)
+        for i in range(1500):
+            url = f'http://site/{rng.randrange(300)}' # Muitas reindexações: remoções e inserções no meio das listas
+            content = corpus.text(rng.randint(5, 30))
+            engine.add_documents([(Page(url, url, content), term_positions(tokenize(content)))])
+    finally:
+        done.set()
+        for reader in readers:
+            reader.join()
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+
+def test_vocabulary_reads_during_writes():
+    corpus = SyntheticCorpus(3000, seed=6)
+    engine = SegmentedEngine(segment_size=50, background_merge=False)
+    prefixes = sorted({word[:2] for word in corpus.vocabulary[:200]})
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            for prefix in prefixes:
+                try:
+                    engine.suggest(prefix, 5)
+                    engine.fuzzy_expand(prefix + 'a', 1)
+                except Exception as e: # ex.: "dictionary changed size during iteration"
+                    errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    for reader in readers:
+        reader.start()
+    try:
+        rng = random.Random(2)
+        for i in range(800):
+            url = f'http://site/{rng.randrange(200)}' # Reindexações tiram termos do vocabulário
+            content = corpus.text(rng.randint(5, 30))
+            engine.add_documents([(Page(url, url, content), term_positions(tokenize(content)))])
+    finally:
+        done.set()
+        for reader in readers:
+            reader.join()
+        sys.setswitchinterval(interval)
+    assert errors == []
+    # Nenhum leitor deixou na Trie um top-n calculado antes de uma escrita
+    for prefix in prefixes:
+        expected = sorted(((term, doc_freq) for term, doc_freq in engine.doc_freqs.items() if term.startswith(prefix)),
+                          key=lambda item: (-item[1], item[0]))[:5]
+        assert engine.trie.top_completions(prefix, 5) == expected, prefix
@@ -0,0 +1,47 @@
+# tests/test_server.py
+import asyncio
+import json
+
+from src.page import Page
+from src.search_engine import SearchEngine
+from src.server import SearchServer
+from src.storage import save_index
+from src.tokenizer import term_positions, tokenize
+
+
+def request(tmp_path, raw: bytes) -> tuple[int, dict]:
+    """Envia `raw` a um servidor sobre um índice pequeno e devolve (status, corpo JSON) da resposta."""
+    path = str(tmp_path / 'indice.bwi')
+    engine = SearchEngine()
+    text = 'Estrutura de dados'
+    engine.add_documents([(Page('doc0', 'doc0', text), term_positions(tokenize(text)))])
+    save_index(engine, path)
+
+    async def run():
+        server = SearchServer(path, port=0)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(raw)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return response
+        finally:
+            await server.close()
+
+    head, _, body = asyncio.run(run()).partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_search_request(tmp_path):
+    status, body = request(tmp_path, b'GET /search?q=dados HTTP/1.1\r\nConnection: close\r\n\r\n')
+    assert status == 200
+    assert [result['url'] for result in body['results']] == ['doc0']
+
+
+def test_invalid_content_length_is_rejected(tmp_path):
+    for length in (b'-5', b'abc'):
+        status, body = request(tmp_path, b'GET /search?q=dados HTTP/1.1\r\nContent-Length: ' + length + b'\r\n\r\n')
+        assert status == 400, length
+        assert 'error' in body
@@ -0,0 +1,87 @@
+# tests/test_shards.py
+import pytest
+
+from benchmarks.synthetic import SyntheticCorpus
+from src import api, cli
+from src.page import Page
+from src.search_engine import SearchEngine
+from src.shards import ShardedEngine, saved_num_shards
+from src.tokenizer import term_positions, tokenize
+
+
+def documents(count: int, seed: int = 3):
+    corpus = SyntheticCorpus(500, seed)
+    return corpus, [(Page(url, title, content), term_positions(tokenize(content)))
+                    for url, title, content in corpus.documents(count, 5, 30)]
+
+
+def same_results(sharded: ShardedEngine, reference: SearchEngine, queries):
+    # Todos os resultados: no top-k, empates podem sair em outra ordem
+    for query in queries:
+        expected = {page.url: score for page, score in reference.ranked_search(query, k=len(reference))}
+        found = {page.url: score for page, score in sharded.ranked_search(query, k=len(reference))}
+        assert expected and found == pytest.approx(expected), query
+
+
+def test_sharded_engine_matches_single_index_and_returns_doc_ids(tmp_path):
+    corpus, batch = documents(120)
+    reference = SearchEngine()
+    reference.add_documents(batch)
+    queries = [corpus.vocabulary[i] for i in range(0, 40, 4)] + [corpus.vocabulary[i][:3] for i in range(5)]
+
+    with ShardedEngine(3) as sharded:
+        doc_ids = sharded.add_documents(batch)
+        assert len(set(doc_ids)) == len(batch)
+        assert [sharded.page(doc_id).url for doc_id in doc_ids] == [page.url for page, _ in batch]
+        # Reindexar devolve o mesmo doc ID, como no SearchEngine
+        assert sharded.add_documents(batch[:2]) == doc_ids[:2]
+        page, positions = batch[5]
+        assert sharded.add_document(page, {term: len(p) for term, p in positions.items()}, positions) == doc_ids[5]
+        same_results(sharded, reference, queries)
+
+
+def test_shard_count_is_saved_and_checked(tmp_path):
+    corpus, batch = documents(60)
+    path = str(tmp_path / 'indice.bwi')
+    reference = SearchEngine()
+    reference.add_documents(batch)
+    queries = [corpus.vocabulary[i] for i in range(0, 20, 2)]
+
+    with ShardedEngine(3, path) as sharded:
+        sharded.add_documents(batch)
+        sharded.save(path)
+    assert saved_num_shards(path) == 3
+
+    with pytest.raises(ValueError):
+        ShardedEngine(2, path)
+    with api.open_engine(path) as reopened: # Sem `shards`: usa o número salvo
+        assert isinstance(reopened, ShardedEngine) and reopened.num_shards == 3
+        assert len(reopened) == len(batch)
+        same_results(reopened, reference, queries)
+    assert api.index_exists(path)
+
+
+def test_sharded_index_cannot_be_segmented(tmp_path, capsys):
+    path = str(tmp_path / 'indice.bwi')
+    with pytest.raises(ValueError):
+        api.open_engine(path, segmented=True, shards=2)
+
+    text = tmp_path / 'nota.txt'
+    text.write_text('estrutura de dados', encoding='utf-8')
+    assert cli.main(['--index', path, '--shards', '2', 'index', '--segmented', str(text)]) == 1
+    assert '--segmented' in capsys.readouterr().err
+
+    assert cli.main(['--index', path, '--shards', '2', 'index', '-q', str(text)]) == 0
+    assert cli.main(['--index', path, '--shards', '3', 'stats']) == 1
+    assert 'salvo com 2 shards' in capsys.readouterr().err
+    assert cli.main(['--index', path, 'index', '--segmented', str(text)]) == 1 # Manifesto: o índice está em shards
+
+
+def test_equivalent_queries_share_the_cache():
+    corpus, batch = documents(30)
+    first, second = corpus.vocabulary[0], corpus.vocabulary[1]
+    with ShardedEngine(2) as sharded:
+        sharded.add_documents(batch)
+        results = sharded.ranked_search(f'{first.capitalize()}  {second}')
+        assert sharded.ranked_search(f'{second} {first}') == results
+        assert sharded.cache.stats()['hits'] == 1
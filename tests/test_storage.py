@@ -0,0 +1,70 @@
+# tests/test_storage.py
+import os
+import shutil
+
+from src.page import Page
+from src.search_engine import SearchEngine
+from src.storage import POINTER_MAGIC, data_path, load_index, save_index, snapshot_files
+from src.tokenizer import tokenize
+
+
+def make_engine(texts: dict) -> SearchEngine:
+    engine = SearchEngine()
+    for url, text in texts.items():
+        engine.add_page(Page(url, url, text), tokenize(text))
+    return engine
+
+
+def urls(results) -> list[str]:
+    return sorted(page.url for page, _ in results)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'indice.bwi')
+    save_index(make_engine({'a': 'estrutura de dados', 'b': 'algoritmos de grafos'}), path)
+
+    engine = load_index(path)
+    assert urls(engine.ranked_search('dados')) == ['a']
+    assert urls(engine.ranked_search('"algoritmos grafos"')) == ['b']
+
+
+def test_save_never_replaces_the_mapped_file(tmp_path):
+    # No Windows, os.replace sobre um arquivo mapeado falha: o arquivo de dados em uso nunca é o alvo da troca
+    path = str(tmp_path / 'indice.bwi')
+    save_index(make_engine({'a': 'estrutura de dados'}), path)
+    engine = load_index(path)
+    mapped = engine.base.data_path
+    assert mapped != path
+    with open(path, 'rb') as f:
+        assert f.read().startswith(POINTER_MAGIC)
+
+    engine.add_page(Page('b', 'b', 'arvores binarias'), tokenize('arvores binarias'))
+    save_index(engine, path) # Salva por cima do índice de onde o engine foi carregado
+    assert data_path(path) != mapped
+    assert urls(engine.ranked_search('dados')) == ['a'] # O engine continua lendo o snapshot antigo
+
+    reloaded = load_index(path)
+    assert urls(reloaded.ranked_search('binarias')) == ['b']
+    assert urls(reloaded.ranked_search('dados')) == ['a']
+    assert not os.path.exists(mapped) # No POSIX o arquivo antigo sai mesmo mapeado
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(f) for f in snapshot_files(path))
+
+
+def test_save_keeps_shard_files(tmp_path):
+    path = str(tmp_path / 'indice.bwi')
+    save_index(make_engine({'a': 'estrutura de dados'}), path + '.shard0')
+    save_index(make_engine({'b': 'algoritmos'}), path)
+    save_index(make_engine({'b': 'algoritmos'}), path)
+    assert urls(load_index(path + '.shard0').ranked_search('dados')) == ['a']
+
+
+def test_loads_single_file_index(tmp_path):
+    # Índices gravados antes do ponteiro: o arquivo do índice é o próprio arquivo de dados
+    path = str(tmp_path / 'indice.bwi')
+    save_index(make_engine({'a': 'estrutura de dados'}), path)
+    legacy = str(tmp_path / 'antigo.bwi')
+    shutil.copyfile(data_path(path), legacy)
+
+    engine = load_index(legacy)
+    assert engine.base.data_path == legacy
+    assert urls(engine.ranked_search('dados')) == ['a']
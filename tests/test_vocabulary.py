@@ -0,0 +1,174 @@
+# tests/test_vocabulary.py
+import random
+
+import pytest
+
+from benchmarks.synthetic import SyntheticCorpus
+from src.page import Page
+from src.search_engine import SearchEngine
+from src.storage import load_index, save_index
+from src.tokenizer import term_positions, tokenize
+
+
+def documents(count: int, seed: int = 1):
+    corpus = SyntheticCorpus(800, seed)
+    return corpus, [(Page(url, title, content), term_positions(tokenize(content)))
+                    for url, title, content in corpus.documents(count, 5, 30)]
+
+
+def edit(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word))
+    choice = rng.randrange(3)
+    if choice == 0:
+        return word[:i] + word[i + 1:]
+    if choice == 1:
+        return word[:i] + rng.choice('aeiourst') + word[i:]
+    return word[:i] + rng.choice('aeiourst') + word[i + 1:]
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """(engine carregado do disco e alterado depois, engine em memória com as mesmas páginas)."""
+    corpus, batch = documents(300)
+    path = str(tmp_path / 'indice.bwi')
+    saved = SearchEngine()
+    saved.add_documents(batch[:200])
+    save_index(saved, path)
+
+    loaded = load_index(path)
+    reference = SearchEngine()
+    reference.add_documents(batch[:200])
+    for engine in (loaded, reference):
+        engine.add_documents(batch[200:]) # Termos novos e termos do snapshot com mais documentos
+        for page, _ in batch[:30]: # Termos do snapshot com menos documentos (ou esvaziados)
+            engine.remove_page(page.url)
+    return corpus, loaded, reference
+
+
+def prefixes(corpus) -> list[str]:
+    return sorted({word[:size] for word in corpus.vocabulary[:300] for size in (1, 2, 3)}) + ['', 'zzz']
+
+
+def test_snapshot_is_read_directly_until_loaded(engines):
+    corpus, loaded, reference = engines
+    for prefix in prefixes(corpus):
+        assert loaded.suggest(prefix, 10) == reference.suggest(prefix, 10), prefix
+    assert loaded.vocabulary() == reference.vocabulary()
+    assert not loaded._base_in_trie # Nada foi copiado do snapshot para a Trie
+
+
+def test_fuzzy_reads_snapshot_directly_until_loaded(engines):
+    corpus, loaded, reference = engines
+    rng = random.Random(5)
+    for word in rng.sample(corpus.vocabulary, 200):
+        typo = edit(word, rng)
+        assert loaded.fuzzy_expand(typo) == reference.fuzzy_expand(typo), typo
+        assert loaded.ranked_search(typo, prefix=False) == reference.ranked_search(typo, prefix=False)
+    assert not loaded._base_in_trie
+
+
+def test_background_load_is_adopted(engines):
+    corpus, loaded, reference = engines
+    loaded.load_vocabulary(background=True)
+    loaded._vocabulary_loader.join()
+    loaded.add_page(Page('nova', 'nova', 'palavrainedita'), ['palavrainedita']) # Escrita antes da adoção
+    reference.add_page(Page('nova', 'nova', 'palavrainedita'), ['palavrainedita'])
+
+    for prefix in prefixes(corpus) + ['pala']:
+        assert loaded.suggest(prefix, 10) == reference.suggest(prefix, 10), prefix
+    assert loaded._base_in_trie
+    assert loaded.vocabulary() == reference.vocabulary()
+    assert loaded.fuzzy_expand('palavrainedta') == [('palavrainedita', 1)]
+
+
+def test_snapshot_fuzzy_matches_trie(tmp_path):
+    corpus, batch = documents(200, seed=9)
+    engine = SearchEngine()
+    engine.add_documents(batch)
+    path = str(tmp_path / 'indice.bwi')
+    save_index(engine, path)
+    base = load_index(path).base
+
+    rng = random.Random(2)
+    for word in rng.sample(corpus.vocabulary, 150):
+        typo = edit(edit(word, rng), rng)
+        for distance in (1, 2):
+            assert base.fuzzy(typo, distance) == engine.trie.fuzzy(typo, distance), (typo, distance)
+
+
+def test_suggestions_show_words_as_written(tmp_path):
+    texts = ['A árvore binária e as árvores de busca: toda árvore tem raiz.',
+             'Dados, dados e mais dados sobre o dado.',
+             'Árvore de dados.']
+    engine = SearchEngine()
+    engine.add_documents([(Page(f'doc{i}', f'doc{i}', text), term_positions(tokenize(text))) for i, text in enumerate(texts)])
+    expected = [('árvore', 2)]
+    assert engine.suggest('arv') == expected
+    assert engine.suggest('ÁRV') == expected
+    assert engine.suggest('dad') == [('dados', 2)]
+
+    path = str(tmp_path / 'indice.bwi')
+    save_index(engine, path)
+    loaded = load_index(path)
+    assert loaded.suggest('arv') == expected # Lido do snapshot
+    loaded.remove_page('doc0')
+    assert loaded.suggest('arv') == [('árvore', 1)]
+    assert loaded.ranked_search(loaded.suggest('dad')[0][0])[0][0].url == 'doc1'
+
+
+def test_whole_words_suggest_their_own_term(tmp_path):
+    # "dados" e "arvore" são mais longos que os radicais do índice ("dado", "arvor")
+    texts = ['Estrutura de dados: árvore e dados.', 'A árvore de dados.', 'Dadosfera e arvoredo.']
+    engine = SearchEngine()
+    engine.add_documents([(Page(f'doc{i}', f'doc{i}', text), term_positions(tokenize(text))) for i, text in enumerate(texts)])
+    path = str(tmp_path / 'indice.bwi')
+    save_index(engine, path)
+    loaded = load_index(path) # Snapshot lido direto do arquivo, sem a Trie
+
+    for candidate in (engine, loaded):
+        assert candidate.suggest('dados') == [('dados', 2), ('dadosfera', 1)]
+        assert candidate.suggest('Árvore') == [('árvore', 2), ('arvoredo', 1)]
+        assert candidate.suggest('arvores') == [('árvore', 2), ('arvoredo', 1)] # Pelo radical "arvor"
+
+
+def test_surface_forms_are_recorded_at_index_time(tmp_path, monkeypatch):
+    texts = ['Árvores e dados.', 'Mais árvores de busca.']
+    engine = SearchEngine()
+    engine.add_documents([(Page(f'doc{i}', f'doc{i}', text), term_positions(tokenize(text))) for i, text in enumerate(texts)])
+    path = str(tmp_path / 'indice.bwi')
+    save_index(engine, path)
+    loaded = load_index(path)
+    loaded.add_page(Page('doc2', 'doc2', 'Buscas binárias'), tokenize('Buscas binárias'))
+
+    # Autocompletar não relê nem re-tokeniza o conteúdo das páginas
+    monkeypatch.setattr(type(engine.docs), 'content', lambda self, doc_id: pytest.fail('conteudo relido'))
+    assert engine.suggest('arv') == [('árvores', 2)]
+    assert loaded.suggest('arv') == [('árvores', 2)] # Forma gravada no snapshot
+    assert loaded.suggest('bin') == [('binárias', 1)]
+    assert loaded.surface_form('busca') == 'busca' # Já estava no snapshot, com a primeira forma vista
+
+
+def test_batch_indexing_matches_page_by_page(tmp_path):
+    corpus, batch = documents(300, seed=5)
+    path = str(tmp_path / 'indice.bwi')
+    saved = SearchEngine()
+    saved.add_documents(batch[:100])
+    save_index(saved, path)
+    batched, single = load_index(path), load_index(path)
+    for engine in (batched, single):
+        engine.load_vocabulary()
+    prefixes = sorted({word[:2] for word in corpus.vocabulary[:300]})
+
+    pages = batch[100:] + batch[150:160] # Páginas reindexadas no meio do lote
+    for start in range(0, len(pages), 70):
+        batched.add_documents(pages[start:start + 70])
+        for page, positions in pages[start:start + 70]:
+            single.add_document(page, {term: len(p) for term, p in positions.items()}, positions)
+        # Sugestões calculadas entre os lotes: o lote seguinte precisa invalidá-las
+        for prefix in prefixes:
+            assert batched.suggest(prefix, 5) == single.suggest(prefix, 5), prefix
+
+    assert batched.vocabulary() == single.vocabulary()
+    for term in batched.vocabulary():
+        assert list(batched.get_postings(term).entries()) == list(single.get_postings(term).entries()), term
+    assert batched.trie.root.word_count == single.trie.root.word_count